@@ -10,6 +10,7 @@
 # --------------------------------------------------------------------------
 import os
 from flask import Flask
+from werkzeug.middleware.proxy_fix import ProxyFix
 from app.config import config_dict 
 from app.extensions import db, login_manager, migrate, mail, csrf
 from app.models import User 
@@ -21,6 +22,12 @@ def create_app(config_name='development'):
     config_class = config_dict.get(config_name, config_dict['development'])
     app.config.from_object(config_class)
 
+    # IP real do cliente atrás do proxy: só os últimos N saltos do X-Forwarded-For
+    # são confiáveis (o resto é escrito pelo próprio cliente)
+    hops = app.config.get('TRUSTED_PROXY_HOPS', 0)
+    if hops:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops)
+
     # Inicialização das Extensões
     db.init_app(app)
     
@@ -29,9 +36,13 @@ def create_app(config_name='development'):
     login_manager.login_message = "Acesso restrito. Por favor, faça login."
     login_manager.login_message_category = "info"
 
+    # Identidade em cache (TTL curto + invalidação nos commits de User)
+    from app.utils.user_cache import init_user_cache, load_cached_user
+    init_user_cache(app)
+
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        return load_cached_user(int(user_id))
     
     # AJUSTE SÊNIOR: render_as_batch só é True se o banco for SQLite
     # Isso evita conflitos em bancos profissionais como PostgreSQL
@@ -41,6 +52,39 @@ def create_app(config_name='development'):
     mail.init_app(app)
     csrf.init_app(app)
 
+    # Cache de disponibilidade (invalidação automática via eventos da sessão)
+    from app.utils.availability_cache import init_availability_cache
+    from app.utils.schedule import clear_templates
+    init_availability_cache(app)
+    clear_templates()
+
+    # Rollup diário dos KPIs (registra os eventos da sessão)
+    from app.utils import daily_stats  # noqa: F401
+    # Contador de mudanças da fila do painel TV
+    from app.utils import tv_queue  # noqa: F401
+    # Índice de busca do catálogo (FTS5/tsvector) e autocomplete em memória
+    from app.utils.search import init_search
+    init_search(app)
+    # Cache das páginas públicas (versão do catálogo na tabela counters)
+    from app.utils.page_cache import init_page_cache
+    init_page_cache(app)
+    # ETag/304 nas páginas públicas e assets com impressão digital (static_url)
+    from app.utils.http_cache import init_http_cache
+    init_http_cache(app)
+    # srcset dos derivados WebP (manifesto gerado por `flask images build`)
+    from app.utils.images import init_images
+    init_images(app)
+    # gzip/br das respostas dinâmicas (HTML/JSON), exceto streams SSE
+    from app.utils.compression import init_compression
+    init_compression(app)
+    # Server-Timing e histogramas por endpoint (SQL, templates, tempo total)
+    from app.utils.metrics import init_metrics
+    init_metrics(app)
+
+    # Barramento de eventos de agendamento (entre workers)
+    from app.utils.events import init_event_bus
+    init_event_bus(app)
+
     # Blueprints e CLI
     from app.auth.routes import auth_bp
     from app.main import main_bp
@@ -53,4 +97,14 @@ def create_app(config_name='development'):
     from app.cli import register_commands
     register_commands(app)
 
+    # Sweeper de reservas dentro do processo (opcional; o padrão é o comando CLI)
+    if app.config.get('EXPIRY_THREAD_ENABLED') and not app.config.get('TESTING'):
+        from app.utils.expiry import start_expiry_thread
+        start_expiry_thread(app)
+
+    # Worker do outbox de e-mails dentro do processo (padrão em produção; no desenvolvimento, flask send-emails --loop)
+    if app.config.get('EMAIL_OUTBOX_THREAD_ENABLED') and not app.config.get('TESTING'):
+        from app.utils.email_outbox import start_outbox_thread
+        start_outbox_thread(app)
+
     return app
\ No newline at end of file
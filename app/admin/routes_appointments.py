@@ -8,11 +8,11 @@
 # Desenvolvido para fins acadêmicos - Curso de Engenharia de Software UNINTER.
 # Acadêmica: Eralice de Moraes Baía | RU: 4144099
 # --------------------------------------------------------------------------
-from flask import render_template, request, flash, redirect, url_for, jsonify
+from flask import render_template, request, flash, redirect, url_for, jsonify, current_app, Response
 from flask_login import login_required, current_user
 from app.extensions import db
 from app.admin import admin_bp
-from app.models import Appointment, Service, AuditLog, User
+from app.models import Appointment, Service, AuditLog, User, Resource
 from sqlalchemy import func
 from sqlalchemy.orm import joinedload
 from datetime import datetime, date
@@ -20,23 +20,75 @@ import logging
 
 # AJUSTE: Importação do decorador centralizado
 from app.decorators.admin_required import admin_required
+from app.utils.clock import local_now, local_today
+from app.utils.feed import feed_page, feed_query, parse_feed_filters, serialize
+from app.utils.tv_queue import queue_etag, queue_payload
+from app.utils.tv_stream import broadcaster, event_stream
+
+# Parâmetros de filtro repassados da página para a API do feed
+FILTER_ARGS = ('status', 'service_id', 'resource_id', 'inicio', 'fim')
 
 @admin_bp.route('/all-appointments')
 @login_required
 @admin_required
 def list_all_appointments():
-    all_appts = Appointment.query.options(
-        joinedload(Appointment.user), 
-        joinedload(Appointment.service)
-    ).order_by(Appointment.start_datetime.desc()).all()
-    return render_template('admin/all_appointments.html', appointments=all_appts)
+    return render_appointment_feed()
+
+def render_appointment_feed(filter_user=None):
+    """
+    Primeira página do feed renderizada no servidor; as seguintes chegam pela
+    API /admin/api/agendamentos (cursor) conforme o usuário rola a lista.
+    """
+    try:
+        filtros = parse_feed_filters(request.args)
+    except ValueError as e:
+        flash(str(e), 'warning')
+        filtros = {}
+    if filter_user:
+        filtros['user_id'] = filter_user.id
+
+    appointments, next_cursor = feed_page(filtros)
+    query_args = {k: v for k, v in request.args.items() if k in FILTER_ARGS and v}
+    if filter_user:
+        query_args['user_id'] = filter_user.id
+
+    return render_template(
+        'admin/all_appointments.html',
+        appointments=appointments,
+        next_cursor=next_cursor,
+        feed_url=url_for('admin.api_appointment_feed', **query_args),
+        filtros=request.args,
+        filter_user=filter_user,
+        total_registros=feed_query(filtros).count() if filter_user else None,
+        services=Service.query.order_by(Service.name).all(),
+        resources=Resource.query.order_by(Resource.name).all()
+    )
+
+@admin_bp.route('/api/agendamentos')
+@login_required
+@admin_required
+def api_appointment_feed():
+    """Próxima página do feed: JSON com itens, linhas HTML prontas e o próximo cursor."""
+    try:
+        filtros = parse_feed_filters(request.args)
+        items, next_cursor = feed_page(filtros, request.args.get('cursor'), request.args.get('limit'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    html = render_template('admin/_appointment_rows.html', appointments=items,
+                           show_client='user_id' not in filtros)
+    return jsonify({
+        'items': [serialize(a) for a in items],
+        'html': html,
+        'next_cursor': next_cursor
+    })
 
 @admin_bp.route('/appointment/<int:id>/status/<string:new_status>', methods=['POST'])
 @login_required
 @admin_required
 def update_status(id, new_status):
     appt = Appointment.query.get_or_404(id)
-    hoje = date.today()
+    hoje = local_today()
     
     # 1. Lógica de Conflito para Início de Atendimento
     if new_status == 'in_progress':
@@ -46,7 +98,7 @@ def update_status(id, new_status):
                 Appointment.status == 'in_progress',
                 Service.resource_id == resource_id,
                 Appointment.id != id,
-                db.func.date(Appointment.start_datetime) == hoje 
+                Appointment.on_day(hoje)
             ).first()
             
             if conflito:
@@ -56,7 +108,7 @@ def update_status(id, new_status):
                 flash(f'Bloqueado: {nome_especialista} já está atendendo {nome_paciente_atual}!', 'danger')
                 return redirect(request.referrer or url_for('admin.dashboard'))
         
-        appt.actual_start = datetime.now()
+        appt.actual_start = local_now()
     
     # 2. Dicionário de Mensagens de Feedback
     messages = {
@@ -123,15 +175,15 @@ def delete_appointment(id):
 @login_required
 @admin_required
 def tv_panel():
-    now = datetime.now()
+    now = local_now()
     today = now.date()
     atendimentos_atuais = Appointment.query.filter(
-        func.date(Appointment.start_datetime) == today,
+        Appointment.on_day(today),
         Appointment.status == 'in_progress'
     ).options(joinedload(Appointment.user), joinedload(Appointment.service).joinedload(Service.resource)).all()
 
     fila_espera = Appointment.query.filter(
-        func.date(Appointment.start_datetime) == today,
+        Appointment.on_day(today),
         Appointment.status.in_(['arrived', 'confirmed'])
     ).options(joinedload(Appointment.user), joinedload(Appointment.service).joinedload(Service.resource)).order_by(Appointment.start_datetime.asc()).all()
     
@@ -141,15 +193,46 @@ def tv_panel():
 @login_required
 @admin_required
 def api_atendimentos_tv():
-    now = datetime.now()
-    today = now.date()
-    atendimentos_query = Appointment.query.filter(func.date(Appointment.start_datetime) == today, Appointment.status == 'in_progress').options(joinedload(Appointment.user), joinedload(Appointment.service).joinedload(Service.resource)).all()
-    espera_query = Appointment.query.filter(func.date(Appointment.start_datetime) == today, Appointment.status == 'confirmed').options(joinedload(Appointment.user), joinedload(Appointment.service)).order_by(Appointment.start_datetime.asc()).all()
+    # GET condicional: se a versão da fila não mudou, 304 sem montar o snapshot
+    etag = queue_etag()
+    # Comparação fraca: com gzip o ETag volta como W/"..." (ver compression)
+    if request.if_none_match.contains_weak(etag):
+        resp = Response(status=304)
+    else:
+        resp = jsonify(queue_payload())
+    resp.set_etag(etag)
+    resp.headers['Cache-Control'] = 'no-cache'
+    return resp
 
-    return jsonify({
-        'atendimentos': [{'paciente': (a.user.name or a.user.username) if a.user else "Sem Nome", 'sala': f"SALA {atendimentos_query.index(a) + 1}", 'especialista': a.service.resource.name if (a.service and a.service.resource) else 'Equipe'} for a in atendimentos_query],
-        'espera': [{'paciente': (e.user.name or e.user.username) if e.user else "Paciente Externo", 'servico': e.service.name if e.service else 'Consulta', 'horario': e.start_datetime.strftime('%H:%M') if e.start_datetime else '--:--'} for e in espera_query]
-    })
+@admin_bp.route('/api/atendimentos_tv/stream')
+@login_required
+@admin_required
+def api_atendimentos_tv_stream():
+    """
+    SSE do painel TV: envia a fila só quando ela muda (contador 'tv_queue'),
+    com heartbeat e retomada pelo Last-Event-ID que o EventSource reenvia ao reconectar.
+    """
+    app = current_app._get_current_object()
+    if app.config.get('TESTING') or broadcaster.current()[0] is None:
+        broadcaster.refresh()
+    if not app.config.get('TESTING'):
+        broadcaster.start(app)
+
+    # Cada conexão prende uma thread do worker: acima do limite, 503 e o painel
+    # passa a usar o polling do endpoint JSON
+    if not broadcaster.open_stream(app.config.get('SSE_MAX_STREAMS', 4)):
+        return Response(status=503, headers={'Retry-After': '30', 'Cache-Control': 'no-store'})
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('lastEventId')
+    heartbeat = app.config.get('SSE_HEARTBEAT_SECONDS', 15)
+    resp = Response(
+        event_stream(last_event_id, heartbeat),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    # Roda mesmo se o cliente cair antes do primeiro byte (o gerador nem chega a iniciar)
+    resp.call_on_close(broadcaster.close_stream)
+    return resp
 
 @admin_bp.route('/testar-chamada-agora')
 @login_required
@@ -158,7 +241,7 @@ def testar_chamada_agora():
     user = User.query.first()
     service = Service.query.first()
     if not user or not service: return "Erro: Cadastre usuário e serviço."
-    novo_teste = Appointment(user_id=user.id, service_id=service.id, start_datetime=datetime.now(), status='in_progress')
+    novo_teste = Appointment(user_id=user.id, service_id=service.id, start_datetime=local_now(), status='in_progress')
     db.session.add(novo_teste)
     db.session.commit()
     return f"Sucesso! O paciente {user.name} está em atendimento."
\ No newline at end of file
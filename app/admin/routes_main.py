@@ -19,56 +19,45 @@ from datetime import datetime, timedelta
 
 # AJUSTE: Importação do decorador centralizado conforme sua estrutura de pastas
 from app.decorators.admin_required import admin_required
+from app.utils.clock import local_now
+from app.utils import daily_stats
 
 @admin_bp.route('/dashboard')
 @login_required
 @admin_required
 def dashboard():
-    from datetime import datetime, timedelta
-    now = datetime.now()
+    now = local_now()
     today = now.date()
 
     # 1. PEGAR TODOS OS AGENDAMENTOS DE HOJE
     services_today = Appointment.query.filter(
-        db.func.date(Appointment.start_datetime) == today,
+        Appointment.on_day(today),
         Appointment.status != 'cancelled'
-    ).order_by(Appointment.start_datetime.asc()).all()
+    ).options(joinedload(Appointment.user), joinedload(Appointment.service))\
+     .order_by(Appointment.start_datetime.asc()).all()
 
-    # 2. PEGAR O FEED GERAL
-    all_appointments = Appointment.query.order_by(Appointment.start_datetime.desc()).all()
+    # 2. KPIs VIA ROLLUP DIÁRIO (daily_stats): soma de poucas linhas no banco,
+    #    sem carregar o histórico de agendamentos para a memória
+    revenue_today = daily_stats.revenue_cents(daily_stats.REVENUE_STATUSES_TODAY, day=today) / 100
+    total_revenue = daily_stats.revenue_cents(daily_stats.REVENUE_STATUSES_TOTAL) / 100
+    total_appointments = daily_stats.appointment_count()
+    pending_count = daily_stats.appointment_count(status='pending')
 
-    # 3. CÁLCULO DE FATURAMENTO HOJE
-    revenue_today = sum((a.service.price_cents if a.service else 0) for a in services_today 
-                        if a.status in ['confirmed', 'completed', 'in_progress', 'arrived']) / 100
-
-    # 4. CÁLCULO TOTAL HISTÓRICO
-    total_revenue = sum((a.service.price_cents if a.service else 0) for a in all_appointments 
-                        if a.status in ['confirmed', 'completed', 'in_progress']) / 100
-
-    # 5. LÓGICA DO GRÁFICO
+    # 3. LÓGICA DO GRÁFICO
     seven_days_ago = today - timedelta(days=7)
-    stats_7_days = db.session.query(
-        func.date(Appointment.start_datetime),
-        func.count(Appointment.id)
-    ).filter(Appointment.start_datetime >= seven_days_ago)\
-     .group_by(func.date(Appointment.start_datetime)).all()
-
     chart_labels = []
     chart_data = []
-    for row in stats_7_days:
-        d = row[0]
-        if isinstance(d, str):
-            d = datetime.strptime(d, '%Y-%m-%d')
-        chart_labels.append(d.strftime('%d/%m'))
-        chart_data.append(row[1])
+    for day, total in daily_stats.counts_by_day(seven_days_ago):
+        chart_labels.append(day.strftime('%d/%m'))
+        chart_data.append(total)
 
     return render_template(
         'admin/dashboard.html', 
         services_today=services_today,
-        appointments=all_appointments,
+        pending_count=pending_count,
         revenue_today=revenue_today,
         total_revenue=total_revenue,
-        total_appointments=len(all_appointments),
+        total_appointments=total_appointments,
         chart_labels=chart_labels,
         chart_data=chart_data,
         now=now
@@ -78,17 +67,33 @@ def dashboard():
 @login_required
 @admin_required
 def occupation_dashboard():
-    now = datetime.now()
+    now = local_now()
     hoje = now.date()
     
     appts_hoje = Appointment.query.filter(
-        db.func.date(Appointment.start_datetime) == hoje
+        Appointment.on_day(hoje)
     ).options(joinedload(Appointment.user), joinedload(Appointment.service)).all()
 
     return render_template('admin/occupation_dashboard.html', 
                            appointments=appts_hoje,
                            now=now)
 
+@admin_bp.route('/api/cache/disponibilidade')
+@login_required
+@admin_required
+def availability_cache_stats():
+    """Contadores de hit/miss do cache de disponibilidade (monitoramento sob carga)."""
+    from app.utils.availability_cache import availability_cache
+    return jsonify(availability_cache.stats())
+
+@admin_bp.route('/metrics')
+@login_required
+@admin_required
+def metrics():
+    """Histogramas de latência/SQL/templates por endpoint (texto Prometheus, por worker)."""
+    from app.utils.metrics import render_prometheus
+    return render_prometheus(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
 @admin_bp.route('/logs/deletados')
 @login_required
 @admin_required
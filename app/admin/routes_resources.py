@@ -12,7 +12,7 @@ from flask import render_template, request, flash, redirect, url_for
 from flask_login import login_required
 from app.extensions import db
 from app.admin import admin_bp
-from app.models import Resource, Service
+from app.models import Resource, Service, StaffProfile, User
 
 # AJUSTE: Importação do decorador centralizado conforme sua estrutura de pastas
 from app.decorators.admin_required import admin_required
@@ -24,6 +24,19 @@ def list_resources():
     resources = Resource.query.all()
     return render_template('admin/resources_list.html', resources=resources)
 
+def _staff_options():
+    """Profissionais que podem ser vinculados a um recurso (define o horário de trabalho)."""
+    return StaffProfile.query.join(User).filter(User.deleted_at == None).order_by(User.name).all()
+
+def _staff_profile_id_from_form():
+    """Valida o profissional escolhido (o SQLite não garante a FK). Levanta ValueError se inválido."""
+    raw = (request.form.get('staff_profile_id') or '').strip()
+    if not raw:
+        return None
+    if not raw.isdigit() or db.session.get(StaffProfile, int(raw)) is None:
+        raise ValueError('Profissional responsável inválido.')
+    return int(raw)
+
 @admin_bp.route('/resources/new', methods=['GET', 'POST'])
 @login_required
 @admin_required
@@ -34,10 +47,16 @@ def new_resource():
         
         if not name:
             flash('O nome é obrigatório.', 'warning')
-            return render_template('admin/resource_form.html', resource=None)
+            return render_template('admin/resource_form.html', resource=None, staff_profiles=_staff_options())
+
+        try:
+            staff_profile_id = _staff_profile_id_from_form()
+        except ValueError as e:
+            flash(str(e), 'warning')
+            return render_template('admin/resource_form.html', resource=None, staff_profiles=_staff_options())
 
         try:
-            new_res = Resource(name=name, category=category)
+            new_res = Resource(name=name, category=category, staff_profile_id=staff_profile_id)
             db.session.add(new_res)
             db.session.commit()
             flash(f'Especialista {name} cadastrado com sucesso!', 'success')
@@ -46,7 +65,7 @@ def new_resource():
             db.session.rollback()
             flash('Erro ao cadastrar recurso. Tente novamente.', 'danger')
             
-    return render_template('admin/resource_form.html', resource=None)
+    return render_template('admin/resource_form.html', resource=None, staff_profiles=_staff_options())
 
 @admin_bp.route('/resource/edit/<int:id>', methods=['GET', 'POST'])
 @login_required
@@ -54,8 +73,15 @@ def new_resource():
 def edit_resource(id):
     resource = Resource.query.get_or_404(id)
     if request.method == 'POST':
+        try:
+            staff_profile_id = _staff_profile_id_from_form()
+        except ValueError as e:
+            flash(str(e), 'warning')
+            return render_template('admin/resource_form.html', resource=resource, staff_profiles=_staff_options())
+
         resource.name = request.form.get('name', '').strip()
         resource.category = request.form.get('category', '').strip()
+        resource.staff_profile_id = staff_profile_id
         try:
             db.session.commit()
             flash(f'Dados de {resource.name} atualizados!', 'success')
@@ -64,7 +90,7 @@ def edit_resource(id):
             db.session.rollback()
             flash('Erro ao atualizar os dados.', 'danger')
             
-    return render_template('admin/resource_form.html', resource=resource)
+    return render_template('admin/resource_form.html', resource=resource, staff_profiles=_staff_options())
 
 @admin_bp.route('/services')
 @login_required
@@ -13,10 +13,12 @@ from flask_login import login_required, current_user
 from app.extensions import db
 from app.admin import admin_bp
 from app.models import User, Appointment
+import json
 from datetime import datetime # Necessário para o Soft Delete
 
 # AJUSTE: Importação do decorador centralizado conforme sua estrutura de pastas
 from app.decorators.admin_required import admin_required
+from app.utils.schedule import parse_work_hours
 
 @admin_bp.route('/users')
 @login_required
@@ -105,6 +107,18 @@ def edit_user(id):
             user.staff_profile.specialty = request.form.get('specialty')
             user.staff_profile.bio = request.form.get('notes_bio')
 
+            # Horário de trabalho (JSON) validado antes de salvar
+            work_hours_raw = (request.form.get('work_hours') or '').strip()
+            try:
+                work_hours = json.loads(work_hours_raw) if work_hours_raw else None
+                if work_hours is not None:
+                    parse_work_hours(work_hours)
+                user.staff_profile.work_hours = work_hours
+            except (ValueError, KeyError, TypeError) as e:
+                db.session.rollback()
+                flash(f'Horário de trabalho inválido: {str(e)}', 'danger')
+                return render_template('admin/edit_user.html', user=user)
+
         try:
             db.session.commit()
             flash(f'Perfil de {user.name} atualizado com sucesso!', 'success')
@@ -160,5 +174,6 @@ def unlock_user(id): # Mantive o nome da função para não quebrar seus links
 @admin_required
 def user_history(id):
     user = User.query.get_or_404(id)
-    appointments = Appointment.query.filter_by(user_id=id).order_by(Appointment.start_datetime.desc()).all()
-    return render_template('admin/all_appointments.html', appointments=appointments, filter_user=user)
\ No newline at end of file
+    # Mesmo feed paginado da agenda global, fixado no cliente
+    from app.admin.routes_appointments import render_appointment_feed
+    return render_appointment_feed(filter_user=user)
\ No newline at end of file
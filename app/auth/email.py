@@ -1,40 +1,20 @@
-import requests
-import os
-from flask import current_app, url_for
+from flask import url_for
+from app.utils.email_outbox import enqueue_email
 
 def send_password_reset_email(user):
+    """
+    Coloca o e-mail de redefinição na fila (email_outbox). O envio ao Resend é feito
+    pelo worker (flask send-emails), então a requisição não espera o provedor.
+    O commit fica com a rota.
+    """
     token = user.get_reset_password_token()
     reset_url = url_for('auth.reset_password', token=token, _external=True)
-    
-    # Dados da API do Resend
-    api_key = os.environ.get('MAIL_PASSWORD') # Sua chave re_...
-    sender = os.environ.get('MAIL_DEFAULT_SENDER', 'onboarding@resend.dev')
 
-    try:
-        response = requests.post(
-            "https://api.resend.com/emails",
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            },
-            json={
-                "from": sender,
-                "to": user.email,
-                "subject": "[Smart Agenda] Redefinição de Senha",
-                "html": f"""
+    return enqueue_email(
+        to_email=user.email,
+        subject="[Smart Agenda] Redefinição de Senha",
+        html=f"""
                 <p>Olá, <strong>{user.name}</strong>,</p>
                 <p>Clique no link para redefinir sua senha: <a href="{reset_url}">{reset_url}</a></p>
                 """
-            },
-            timeout=10 # Evita que o Gunicorn mate o processo
-        )
-        
-        if response.status_code in [200, 201, 202]:
-            return True
-        else:
-            current_app.logger.error(f"Erro Resend API: {response.text}")
-            return False
-            
-    except Exception as e:
-        current_app.logger.error(f"Erro de Conexão API: {e}")
-        return False
\ No newline at end of file
+    )
@@ -1,11 +1,12 @@
 # -*- coding: utf-8 -*-
-from flask import render_template, redirect, url_for, flash, request
+from flask import render_template, redirect, url_for, flash, request, current_app
 from flask_login import login_user, logout_user, current_user
 from app import db
 from app.auth import auth_bp 
 from app.models import User
 from app.auth.forms import LoginForm, RegistrationForm, ResetPasswordRequestForm, ResetPasswordForm
 from app.auth.email import send_password_reset_email
+from app.utils.throttle import get_login_throttle
 
 @auth_bp.route('/register', methods=['GET', 'POST'])
 def register():
@@ -28,6 +29,14 @@ def login():
     
     form = LoginForm()
     if form.validate_on_submit():
+        # Limitador por IP/e-mail ANTES de consultar o banco e de calcular o hash
+        throttle = get_login_throttle(current_app)
+        if throttle:
+            espera = throttle.check(request.remote_addr, form.email.data)
+            if espera:
+                flash(f'Muitas tentativas de login. Aguarde {espera} segundos e tente novamente.', 'danger')
+                return render_template('auth/login.html', title='Entrar', form=form), 429
+
         user = User.query.filter_by(email=form.email.data.lower().strip()).first()
         
         if user:
@@ -72,14 +81,13 @@ def reset_password_request():
         user = User.query.filter_by(email=form.email.data).first()
         if user:
             try:
-                # O status agora é síncrono para evitar erros silenciosos
-                status = send_password_reset_email(user)
-                if status:
-                    flash('Sucesso! Verifique sua caixa de entrada.', 'success')
-                else:
-                    flash('O servidor de e-mail recusou a conexão. Tente novamente mais tarde.', 'warning')
+                # Só enfileira: o worker do outbox entrega (com retentativas) em segundo plano
+                send_password_reset_email(user)
+                db.session.commit()
+                flash('Sucesso! Verifique sua caixa de entrada.', 'success')
             except Exception as e:
-                print(f"--- 🚨 ERRO FATAL NO SMTP: {e} ---")
+                db.session.rollback()
+                current_app.logger.error(f"Erro ao enfileirar e-mail de redefinição: {e}")
                 flash('Erro técnico no envio. O suporte foi notificado.', 'danger')
         else:
             flash('Se o e-mail existir, você receberá instruções.', 'info')
@@ -8,6 +8,7 @@
 # Desenvolvido para fins acadêmicos - Curso de Engenharia de Software UNINTER.
 # Acadêmica: Eralice de Moraes Baía | RU: 4144099
 # --------------------------------------------------------------------------
+import threading
 import click
 from flask.cli import with_appcontext
 from app.extensions import db
@@ -109,6 +110,115 @@ def register_commands(app):
         db.session.commit()
         click.echo(f"Finalizado! {count} serviços de saúde/estética foram adicionados.")
 
+    @app.cli.command("expire-holds")
+    @click.option("--loop", is_flag=True, help="Continua rodando como worker dedicado.")
+    @click.option("--interval", default=None, type=int, help="Segundos entre varreduras (modo --loop).")
+    @click.option("--batch-size", default=None, type=int, help="Reservas por lote/commit.")
+    @with_appcontext
+    def expire_holds(loop, interval, batch_size):
+        """Cancela reservas pendentes vencidas em lotes pequenos."""
+        from app.utils.expiry import expire_pending_holds, run_expiry_loop
+
+        if not loop:
+            total = expire_pending_holds(batch_size=batch_size)
+            click.echo(f"{total} reserva(s) pendente(s) expirada(s).")
+            return
+
+        # Worker dedicado: mesmo laço da thread (rollback + log + continua em caso de erro)
+        interval = interval or app.config.get('EXPIRY_SWEEP_INTERVAL_SECONDS', 60)
+        click.echo(f"Sweeper de reservas rodando a cada {interval}s (Ctrl+C para sair).")
+        try:
+            run_expiry_loop(app, interval, threading.Event(), batch_size=batch_size)
+        except KeyboardInterrupt:
+            click.echo("Sweeper encerrado.")
+
+    @app.cli.command("send-emails")
+    @click.option("--loop", is_flag=True, help="Continua rodando como worker dedicado.")
+    @click.option("--interval", default=None, type=int, help="Segundos entre varreduras da fila (modo --loop).")
+    @click.option("--batch-size", default=None, type=int, help="Mensagens por lote.")
+    @with_appcontext
+    def send_emails(loop, interval, batch_size):
+        """Entrega os e-mails pendentes do outbox (retentativas com backoff)."""
+        from app.utils.email_outbox import deliver_pending, purge_outbox, run_outbox_loop
+
+        if not loop:
+            enviados, erros = deliver_pending(batch_size=batch_size)
+            removidas = purge_outbox()
+            click.echo(f"{enviados} e-mail(s) enviado(s), {erros} com erro, {removidas} antigo(s) removido(s).")
+            return
+
+        interval = interval or app.config.get('EMAIL_OUTBOX_INTERVAL_SECONDS', 5)
+        click.echo(f"Worker de e-mails rodando a cada {interval}s (Ctrl+C para sair).")
+        try:
+            run_outbox_loop(app, interval, threading.Event(), batch_size=batch_size)
+        except KeyboardInterrupt:
+            click.echo("Worker de e-mails encerrado.")
+
+    @app.cli.command("stats-rebuild")
+    @click.option("--since", default=None, help="Primeiro dia (AAAA-MM-DD); padrão: todo o histórico.")
+    @click.option("--until", default=None, help="Dia final exclusivo (AAAA-MM-DD).")
+    @with_appcontext
+    def stats_rebuild(since, until):
+        """Backfill/reconstrução do rollup diário (daily_stats) a partir dos agendamentos."""
+        from datetime import datetime
+        from app.utils.daily_stats import rebuild_daily_stats
+
+        try:
+            start = datetime.strptime(since, '%Y-%m-%d').date() if since else None
+            end = datetime.strptime(until, '%Y-%m-%d').date() if until else None
+        except ValueError:
+            click.echo("Erro: use datas no formato AAAA-MM-DD.")
+            return
+
+        total = rebuild_daily_stats(start, end)
+        db.session.commit()
+        click.echo(f"Rollup reconstruído: {total} linha(s) em daily_stats.")
+
+    @app.cli.command("search-reindex")
+    @with_appcontext
+    def search_reindex():
+        """Reconstrói o índice de busca do catálogo (FTS5 no SQLite, tsvector no PostgreSQL)."""
+        from app.utils.search import rebuild_search_index
+
+        total = rebuild_search_index()
+        db.session.commit()
+        click.echo(f"Índice de busca reconstruído: {total} serviço(s).")
+
+    @app.cli.group("images")
+    def images():
+        """Derivados WebP responsivos das imagens estáticas."""
+
+    @images.command("build")
+    @click.option("--force", is_flag=True, help="Reprocessa tudo, ignorando o manifesto.")
+    @click.option("--workers", default=None, type=int, help="Processos em paralelo (padrão: núcleos da CPU).")
+    @with_appcontext
+    def images_build(force, workers):
+        """Gera variantes WebP (IMAGE_WIDTHS) só das imagens novas ou alteradas."""
+        from app.utils.images import build_images
+
+        try:
+            import PIL  # noqa: F401
+        except ImportError:
+            click.echo("Erro: o build de imagens requer Pillow (pip install Pillow).")
+            return
+
+        processadas, inalteradas, removidas = build_images(app, force=force, workers=workers, log=click.echo)
+        click.echo(f"Imagens: {processadas} processada(s), {inalteradas} sem mudança, "
+                   f"{removidas} variante(s) antiga(s) removida(s).")
+
+    @app.cli.group("assets")
+    def assets():
+        """Build dos arquivos estáticos."""
+
+    @assets.command("compress")
+    @with_appcontext
+    def assets_compress():
+        """Gera irmãos .gz/.br (CSS, JS, SVG...) para o static servir já comprimido."""
+        from app.utils.compression import precompress_static, available_encodings
+
+        total = precompress_static(app.static_folder, log=click.echo)
+        click.echo(f"Pré-compressão ({', '.join(available_encodings())}): {total} arquivo(s) gravado(s).")
+
     @app.cli.command("db-reset")
     @with_appcontext
     def db_reset():
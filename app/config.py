@@ -28,6 +28,112 @@ class Config:
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
     MAIL_DEFAULT_SENDER = os.environ.get('MAIL_USERNAME')
 
+    # Cache de disponibilidade (quantidade máxima de pares agenda/dia em memória)
+    AVAILABILITY_CACHE_SIZE = int(os.environ.get('AVAILABILITY_CACHE_SIZE') or 512)
+    # Idade máxima (s) de uma entrada: escritas feitas por OUTRO worker só
+    # invalidam o cache deste processo depois desse prazo (0 = sem limite)
+    AVAILABILITY_CACHE_MAX_AGE = int(os.environ.get('AVAILABILITY_CACHE_MAX_AGE') or 15)
+
+    # Horário padrão dos recursos sem StaffProfile.work_hours (None = grade 24h de hora em hora)
+    DEFAULT_WORK_HOURS = None
+    # Idade máxima (s) dos templates compilados: edições feitas em OUTRO worker
+    # chegam a este processo depois desse prazo (0 = sem limite)
+    SCHEDULE_CACHE_MAX_AGE = int(os.environ.get('SCHEDULE_CACHE_MAX_AGE') or 60)
+
+    # Expiração de reservas 'pending' (sweeper: flask expire-holds)
+    PENDING_HOLD_TTL_MINUTES = int(os.environ.get('PENDING_HOLD_TTL_MINUTES') or 15)
+    EXPIRY_BATCH_SIZE = int(os.environ.get('EXPIRY_BATCH_SIZE') or 100)
+    EXPIRY_SWEEP_INTERVAL_SECONDS = int(os.environ.get('EXPIRY_SWEEP_INTERVAL_SECONDS') or 60)
+    EXPIRY_THREAD_ENABLED = os.environ.get('EXPIRY_THREAD_ENABLED', 'false').lower() in ['true', 'on', '1']
+
+    # Feed paginado por cursor (listas de agendamentos do admin)
+    FEED_PAGE_SIZE = int(os.environ.get('FEED_PAGE_SIZE') or 25)
+    FEED_MAX_PAGE_SIZE = int(os.environ.get('FEED_MAX_PAGE_SIZE') or 100)
+
+    # Painel TV via SSE: intervalo do observador do contador e heartbeat das conexões
+    # (o barramento de eventos acorda o observador na hora; o intervalo é só a rede de segurança)
+    TV_WATCH_INTERVAL_SECONDS = float(os.environ.get('TV_WATCH_INTERVAL_SECONDS') or 5)
+    SSE_HEARTBEAT_SECONDS = int(os.environ.get('SSE_HEARTBEAT_SECONDS') or 15)
+    # Conexões SSE simultâneas por processo; precisa ficar abaixo de GUNICORN_THREADS
+    # (gunicorn.conf.py) para sobrar thread para as outras requisições
+    SSE_MAX_STREAMS = int(os.environ.get('SSE_MAX_STREAMS') or 4)
+
+    # Barramento de eventos entre workers: 'memory', 'postgres' (LISTEN/NOTIFY) ou 'file'.
+    # Vazio = 'postgres' com PostgreSQL e 'memory' nos demais bancos.
+    EVENT_BUS_BACKEND = os.environ.get('EVENT_BUS_BACKEND') or ''
+    EVENT_BUS_CHANNEL = os.environ.get('EVENT_BUS_CHANNEL') or 'agendamentos'
+    EVENT_BUS_FILE = os.environ.get('EVENT_BUS_FILE')  # padrão: instance/events.log
+    EVENT_BUS_FILE_MAX_BYTES = int(os.environ.get('EVENT_BUS_FILE_MAX_BYTES') or 1 << 20)
+
+    # Política de hash de senhas (formato werkzeug: 'scrypt:N:r:p' ou 'pbkdf2:sha256:iterações').
+    # Hashes antigos são refeitos no login; PASSWORD_HASH_WORKERS limita hashes simultâneos
+    # por processo (benchmarks/bench_password_hash.py ajuda a escolher o custo)
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD') or 'scrypt:32768:8:1'
+    PASSWORD_SALT_LENGTH = int(os.environ.get('PASSWORD_SALT_LENGTH') or 16)
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS') or 2)
+
+    # Cache do user_loader: outros workers enxergam edições de usuário após este prazo (s)
+    USER_CACHE_TTL_SECONDS = int(os.environ.get('USER_CACHE_TTL_SECONDS') or 30)
+
+    # Outbox de e-mails (Resend): worker 'flask send-emails --loop' ou thread opcional
+    EMAIL_API_URL = os.environ.get('EMAIL_API_URL') or 'https://api.resend.com/emails'
+    EMAIL_API_KEY = os.environ.get('MAIL_PASSWORD')  # chave re_...
+    EMAIL_SENDER = os.environ.get('MAIL_DEFAULT_SENDER') or 'onboarding@resend.dev'
+    EMAIL_HTTP_TIMEOUT = int(os.environ.get('EMAIL_HTTP_TIMEOUT') or 10)
+    EMAIL_HTTP_POOL_SIZE = int(os.environ.get('EMAIL_HTTP_POOL_SIZE') or 4)
+    EMAIL_RATE_PER_SECOND = float(os.environ.get('EMAIL_RATE_PER_SECOND') or 2)
+    EMAIL_BATCH_SIZE = int(os.environ.get('EMAIL_BATCH_SIZE') or 20)
+    EMAIL_MAX_ATTEMPTS = int(os.environ.get('EMAIL_MAX_ATTEMPTS') or 5)
+    EMAIL_RETRY_BASE_SECONDS = int(os.environ.get('EMAIL_RETRY_BASE_SECONDS') or 30)
+    EMAIL_RETRY_MAX_SECONDS = int(os.environ.get('EMAIL_RETRY_MAX_SECONDS') or 3600)
+    EMAIL_CLAIM_TIMEOUT_SECONDS = int(os.environ.get('EMAIL_CLAIM_TIMEOUT_SECONDS') or 300)
+    EMAIL_OUTBOX_INTERVAL_SECONDS = int(os.environ.get('EMAIL_OUTBOX_INTERVAL_SECONDS') or 5)
+    EMAIL_OUTBOX_THREAD_ENABLED = os.environ.get('EMAIL_OUTBOX_THREAD_ENABLED', 'false').lower() in ['true', 'on', '1']
+    # Mensagens enviadas/falhas (já sem corpo) ficam esse tempo para auditoria
+    EMAIL_RETENTION_DAYS = int(os.environ.get('EMAIL_RETENTION_DAYS') or 7)
+
+    # Limitador de login (janela deslizante por IP e por e-mail, antes do lockout da conta).
+    # Backend: 'memory', 'sqlite' (arquivo compartilhado na máquina) ou 'postgres'.
+    # Vazio = 'postgres' com PostgreSQL, 'memory' nos testes e 'sqlite' nos demais casos.
+    # Proxies reversos confiáveis na frente da aplicação (X-Forwarded-For/-Proto).
+    # Sem isso request.remote_addr é o IP do balanceador e o limitador de login
+    # bloqueia todos os clientes juntos. 0 = acesso direto (desenvolvimento)
+    TRUSTED_PROXY_HOPS = int(os.environ.get('TRUSTED_PROXY_HOPS') or 0)
+
+    LOGIN_THROTTLE_ENABLED = os.environ.get('LOGIN_THROTTLE_ENABLED', 'true').lower() in ['true', 'on', '1']
+    LOGIN_THROTTLE_BACKEND = os.environ.get('LOGIN_THROTTLE_BACKEND') or ''
+    LOGIN_THROTTLE_FILE = os.environ.get('LOGIN_THROTTLE_FILE')  # padrão: instance/login_throttle.db
+    LOGIN_THROTTLE_WINDOW_SECONDS = int(os.environ.get('LOGIN_THROTTLE_WINDOW_SECONDS') or 300)
+    LOGIN_THROTTLE_IP_LIMIT = int(os.environ.get('LOGIN_THROTTLE_IP_LIMIT') or 20)
+    # Acima do lockout (5 falhas), para não mudar a semântica de is_locked
+    LOGIN_THROTTLE_EMAIL_LIMIT = int(os.environ.get('LOGIN_THROTTLE_EMAIL_LIMIT') or 10)
+
+    # Busca do catálogo: máximo de resultados e validade do índice de autocomplete
+    # em memória (mudanças feitas em outro worker aparecem após o TTL)
+    SEARCH_MAX_RESULTS = int(os.environ.get('SEARCH_MAX_RESULTS') or 50)
+    SEARCH_AUTOCOMPLETE_TTL_SECONDS = int(os.environ.get('SEARCH_AUTOCOMPLETE_TTL_SECONDS') or 60)
+
+    # Cache de páginas públicas do catálogo (HTML para anônimos + resultados de consulta)
+    PAGE_CACHE_ENABLED = os.environ.get('PAGE_CACHE_ENABLED', 'true').lower() in ['true', 'on', '1']
+    PAGE_CACHE_MAX_ENTRIES = int(os.environ.get('PAGE_CACHE_MAX_ENTRIES') or 256)
+    # static_url(): hash do conteúdo no nome do arquivo + cache imutável de 1 ano
+    STATIC_FINGERPRINT_ENABLED = os.environ.get('STATIC_FINGERPRINT_ENABLED', 'true').lower() in ['true', 'on', '1']
+
+    # Pipeline de imagens (flask images build): larguras das variantes WebP e pastas (relativas a static/)
+    IMAGE_WIDTHS = tuple(int(w) for w in (os.environ.get('IMAGE_WIDTHS') or '320,640,960,1280').split(','))
+    IMAGE_WEBP_QUALITY = int(os.environ.get('IMAGE_WEBP_QUALITY') or 80)
+    IMAGE_SOURCE_DIRS = ('assets/img/services', 'assets/img/professionals')
+    IMAGE_OUTPUT_DIR = 'assets/img/derived'
+
+    # Compressão das respostas dinâmicas (br requer o pacote opcional `brotli`)
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', 'true').lower() in ['true', 'on', '1']
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE') or 500)
+    COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL') or 6)
+    COMPRESS_BROTLI_QUALITY = int(os.environ.get('COMPRESS_BROTLI_QUALITY') or 5)
+
+    # Instrumentação por requisição (Server-Timing + /admin/metrics em formato Prometheus)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() in ['true', 'on', '1']
+
 import os
 
 import os
@@ -63,6 +169,12 @@ class ProductionConfig(Config):
     if SQLALCHEMY_DATABASE_URI and SQLALCHEMY_DATABASE_URI.startswith("postgres://"):
         SQLALCHEMY_DATABASE_URI = SQLALCHEMY_DATABASE_URI.replace("postgres://", "postgresql://", 1)
         
+    # Sem serviço de worker separado no Render: cada processo web entrega a fila
+    EMAIL_OUTBOX_THREAD_ENABLED = os.environ.get('EMAIL_OUTBOX_THREAD_ENABLED', 'true').lower() in ['true', 'on', '1']
+
+    # Render: um balanceador na frente do gunicorn
+    TRUSTED_PROXY_HOPS = int(os.environ.get('TRUSTED_PROXY_HOPS') or 1)
+
     SESSION_COOKIE_SECURE = True
     REMEMBER_COOKIE_SECURE = True
     REMEMBER_COOKIE_HTTPONLY = True
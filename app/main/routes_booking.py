@@ -8,21 +8,28 @@
 # Desenvolvido para fins acadêmicos - Curso de Engenharia de Software UNINTER.
 # Acadêmica: Eralice de Moraes Baía | RU: 4144099
 # --------------------------------------------------------------------------
-from flask import render_template, request, flash, redirect, url_for, abort
+import logging
+from flask import render_template, request, flash, redirect, url_for, abort, jsonify
 from flask_login import login_required, current_user
 from app.extensions import db
 from app.main import main_bp
 from app.models import Service, Appointment,AuditLog
+from app.utils.availability import day_busy_intervals, month_availability, earliest_available
+from app.utils.schedule import day_slot_starts
+from app.utils.clock import local_now
+from app.utils.booking import book_series, reserve_slot, confirm_hold, SlotConflictError, SERIES_FREQUENCIES
 from datetime import datetime, timedelta
+from sqlalchemy.orm import joinedload
+
+logger = logging.getLogger(__name__)
 
 @main_bp.route('/book/<int:service_id>', methods=['GET', 'POST'])
 @login_required
 def book_service(service_id):
-    # 1. LIMPEZA INICIAL
-    limpar_agendamentos_expirados()
-    
+    # SÊNIOR: nenhuma escrita no GET. Reservas vencidas já são tratadas como livres
+    # nas checagens de conflito e o status é atualizado pelo sweeper (flask expire-holds)
     service = Service.query.get_or_404(service_id)
-    now = datetime.now()
+    now = local_now()
 
     # Tratamento de Data
     date_str = request.form.get('date') or request.args.get('date') or now.strftime('%Y-%m-%d')
@@ -32,14 +39,10 @@ def book_service(service_id):
         selected_date = now.date()
         date_str = selected_date.strftime('%Y-%m-%d')
 
-    # --- LÓGICA GERAÇÃO DINÂMICA 24H ---
-    working_hours = []
-    current_time_iterator = datetime.combine(selected_date, datetime.min.time()) 
-    end_of_day = datetime.combine(selected_date, datetime.max.time())
-
-    while current_time_iterator + timedelta(minutes=service.duration_minutes) <= end_of_day:
-        working_hours.append(current_time_iterator.strftime('%H:%M'))
-        current_time_iterator += timedelta(hours=1) 
+    # --- GRADE DO DIA ---
+    # Template semanal compilado do work_hours do profissional (padrão: 24h de hora em hora).
+    # A mesma grade alimenta o calendário mensal (/api/disponibilidade).
+    day_slots = day_slot_starts(service, selected_date)
 
     if request.method == 'POST':
         time_str = request.form.get('slot')
@@ -54,44 +57,60 @@ def book_service(service_id):
             return redirect(url_for('main.book_service', service_id=service.id, date=date_str))
 
         clean_time = time_str.strip()[:5]
-        start_dt = datetime.combine(selected_date, datetime.strptime(clean_time, '%H:%M').time())
-        end_dt = start_dt + timedelta(minutes=service.duration_minutes)
-
-        if Appointment.check_resource_conflict(service.id, start_dt, end_dt):
-            flash('Este horário acabou de ser ocupado. Escolha outro.', 'danger')
-            return redirect(url_for('main.book_service', service_id=service.id, date=date_str))
-
-        if Appointment.check_user_conflict(current_user.id, start_dt, end_dt):
-            flash('Você já tem um compromisso neste horário.', 'warning')
+        try:
+            start_dt = datetime.combine(selected_date, datetime.strptime(clean_time, '%H:%M').time())
+        except ValueError:
+            start_dt = None
+        if start_dt not in day_slots:
+            flash('Horário fora da agenda do profissional.', 'warning')
             return redirect(url_for('main.book_service', service_id=service.id, date=date_str))
 
-        try:
-            new_appt = Appointment(
-                start_datetime=start_dt,
-                end_datetime=end_dt,
-                service_id=service.id,
-                resource_id=service.resource_id, 
-                user_id=current_user.id,
+        # Pacote de sessões recorrentes (ex.: fisioterapia semanal)
+        frequency = request.form.get('repeat')
+        if frequency in SERIES_FREQUENCIES:
+            created, clashes = book_series(
+                service, current_user.id, start_dt,
+                occurrences=request.form.get('occurrences', 1, type=int) or 1,
+                frequency=frequency,
                 phone=user_phone,
-                status='pending'
+                skip_conflicts=bool(request.form.get('skip_conflicts'))
             )
-            db.session.add(new_appt)
-            db.session.commit()
-            
+            if clashes:
+                datas = ', '.join(f"{dt.strftime('%d/%m %H:%M')} ({motivo})" for dt, motivo in sorted(clashes.items()))
+                if not created:
+                    flash(f'Nenhuma sessão foi reservada. Conflitos em: {datas}', 'danger')
+                    return redirect(url_for('main.book_service', service_id=service.id, date=date_str))
+                flash(f'Datas não reservadas: {datas}', 'warning')
+            flash(f'{len(created)} sessão(ões) reservada(s)! Confirme o pagamento para garantir suas vagas.', 'success')
+            return redirect(url_for('main.my_appointments'))
+
+        try:
+            # SÊNIOR: checagem + insert sob lock (advisory lock no PostgreSQL,
+            # BEGIN IMMEDIATE no SQLite): dois workers não reservam o mesmo horário
+            reserve_slot(service, current_user.id, start_dt, phone=user_phone)
             flash('Reserva realizada! Confirme o pagamento para garantir sua vaga.', 'success')
             return redirect(url_for('main.my_appointments'))
+        except SlotConflictError as conflito:
+            if conflito.reason == 'user':
+                flash('Você já tem um compromisso neste horário.', 'warning')
+            else:
+                flash('Este horário acabou de ser ocupado. Escolha outro.', 'danger')
+            return redirect(url_for('main.book_service', service_id=service.id, date=date_str))
         except Exception as e:
             db.session.rollback()
             flash('Erro sistêmico ao processar agendamento.', 'danger')
 
     # --- GERAÇÃO DE SLOTS (Visualização) ---
+    # SÊNIOR: uma única query carrega os intervalos ocupados do dia;
+    # cada slot é respondido em memória (antes era 1 query por slot).
+    busy = day_busy_intervals(service, selected_date)
+
+    duration = timedelta(minutes=service.duration_minutes)
     slots = []
-    for h in working_hours:
-        slot_time_obj = datetime.strptime(h, '%H:%M').time()
-        slot_start = datetime.combine(selected_date, slot_time_obj)
-        slot_end = slot_start + timedelta(minutes=service.duration_minutes)
+    for slot_start in day_slots:
+        slot_end = slot_start + duration
         
-        is_resource_free = not Appointment.check_resource_conflict(service.id, slot_start, slot_end)
+        is_resource_free = busy.is_free(slot_start, slot_end)
         
         if current_user.is_admin:
             is_future = True
@@ -105,6 +124,59 @@ def book_service(service_id):
 
     return render_template('main/book.html', service=service, slots=slots, date=date_str)
 
+@main_bp.route('/api/disponibilidade/<int:service_id>')
+@login_required
+def availability_calendar(service_id):
+    """Calendário do mês (?month=AAAA-MM): slots livres e primeiro horário por dia."""
+    service = Service.query.get_or_404(service_id)
+    month_str = request.args.get('month') or local_now().strftime('%Y-%m')
+    try:
+        month_ref = datetime.strptime(month_str, '%Y-%m')
+    except ValueError:
+        return jsonify({'error': 'Parâmetro month inválido. Use AAAA-MM.'}), 400
+
+    days = month_availability(service, month_ref.year, month_ref.month)
+    return jsonify({
+        'service_id': service.id,
+        'month': month_ref.strftime('%Y-%m'),
+        'days': days
+    })
+
+@main_bp.route('/api/proximos-horarios')
+@login_required
+def earliest_slots():
+    """
+    Próximos horários livres com QUALQUER profissional de uma categoria
+    (?category=Dermatologia) ou de serviços específicos (?service_id=1&service_id=2).
+    """
+    category = request.args.get('category', '').strip()
+    service_ids = request.args.getlist('service_id', type=int)
+    limit = min(request.args.get('n', 3, type=int) or 3, 20)
+    horizon = min(request.args.get('days', 60, type=int) or 60, 90)
+
+    if not category and not service_ids:
+        return jsonify({'error': 'Informe category ou service_id.'}), 400
+
+    query = Service.query.options(joinedload(Service.resource)).filter(Service.active == True)
+    if service_ids:
+        query = query.filter(Service.id.in_(service_ids))
+    else:
+        query = query.filter(Service.category == category)
+
+    results = earliest_available(query.all(), limit=limit, horizon_days=horizon)
+    return jsonify({
+        'slots': [{
+            'start': slot.isoformat(),
+            'date': slot.strftime('%Y-%m-%d'),
+            'time': slot.strftime('%H:%M'),
+            'service_id': service.id,
+            'service': service.name,
+            'resource_id': service.resource_id,
+            'resource': service.resource.name if service.resource else None,
+            'book_url': url_for('main.book_service', service_id=service.id, date=slot.strftime('%Y-%m-%d'))
+        } for slot, service in results]
+    })
+
 @main_bp.route('/my-appointments')
 @login_required
 def my_appointments():
@@ -123,7 +195,7 @@ def cancel_appointment(appt_id):
     if appt.user_id != current_user.id: 
         abort(403)
     
-    if appt.start_datetime < datetime.now():
+    if appt.start_datetime < local_now():
         flash('Consultas passadas não podem ser canceladas.', 'warning')
         return redirect(url_for('main.my_appointments'))
 
@@ -150,8 +222,8 @@ def cancel_appointment(appt_id):
         flash('Sua consulta foi cancelada com sucesso.', 'success')
     except Exception as e:
         db.session.rollback()
-        # DICA SÊNIOR: Imprima o erro no terminal local para debug
-        print(f"ERRO TÉCNICO: {str(e)}") 
+        # SÊNIOR: vai para o log da aplicação (com traceback), não para o stdout
+        logger.error(f"Erro ao cancelar o agendamento {appt_id}: {str(e)}", exc_info=True)
         flash('Erro sistêmico ao processar o cancelamento.', 'danger')
 
     return redirect(url_for('main.my_appointments'))
@@ -163,10 +235,11 @@ def simulate_payment(appt_id):
     if appt.user_id != current_user.id: abort(403)
 
     if appt.status == 'pending':
-        appt.status = 'confirmed'
-        appt.payment_status = 'paid'
-        db.session.commit()
-        flash("Pagamento aprovado! Consulta confirmada.", "success")
+        if confirm_hold(appt):
+            flash("Pagamento aprovado! Consulta confirmada.", "success")
+        else:
+            flash("O prazo de pagamento desta reserva expirou e o horário foi liberado. "
+                  "Escolha um novo horário.", "warning")
     
     return redirect(url_for('main.my_appointments'))
 
@@ -181,12 +254,4 @@ def complete_appointment(appt_id):
     db.session.commit()
     
     flash(f'Atendimento de {appt.user.name} concluído com sucesso!', 'success')
-    return redirect(request.referrer or url_for('admin.dashboard_ocupacao'))
-
-def limpar_agendamentos_expirados():
-    limite = datetime.now() - timedelta(minutes=15)
-    Appointment.query.filter(
-        Appointment.status == 'pending',
-        Appointment.created_at <= limite
-    ).update({Appointment.status: 'cancelled'}, synchronize_session=False)
-    db.session.commit()
\ No newline at end of file
+    return redirect(request.referrer or url_for('admin.dashboard_ocupacao'))
\ No newline at end of file
@@ -8,34 +8,36 @@
 # Desenvolvido para fins acadêmicos - Curso de Engenharia de Software UNINTER.
 # Acadêmica: Eralice de Moraes Baía | RU: 4144099
 # --------------------------------------------------------------------------
-from flask import render_template, request
+from flask import render_template, request, jsonify, current_app
 from app.extensions import db
 from app.main import main_bp
 from app.models import Service, Resource
+from app.utils.search import search_services, autocomplete
+from app.utils.page_cache import cached_page, active_categories
+from app.utils.http_cache import conditional_page
 
 # --- ROTA: HOME (INDEX) ---
 @main_bp.route('/')
+@conditional_page('q', 'category')
+@cached_page('q', 'category')
 def index():
     # 1. Pegamos os parâmetros da URL
     query_param = request.args.get('q', '')
     category_param = request.args.get('category', '')
 
-    # 2. Categorias para o menu
-    categories_raw = db.session.query(Service.category).filter(Service.active==True).distinct().all()
-    categories = [c[0] for c in categories_raw]
+    # 2. Categorias para o menu (cache por versão do catálogo)
+    categories = active_categories()
 
-    # 3. Base da busca de serviços
-    services_query = Service.query.filter_by(active=True)
-
-    # 4. Aplicação dos filtros
+    # 3. Busca: índice textual ranqueado (nome, descrição, categoria, conteúdo...)
+    category_filter = category_param if category_param and category_param != 'Todos' else None
     if query_param:
-        services_query = services_query.filter(Service.name.ilike(f'%{query_param}%'))
-
-    if category_param and category_param != 'Todos':
-        services_query = services_query.filter_by(category=category_param)
-
-    # 5. Executa a busca
-    services = services_query.all()
+        services = search_services(query_param, category=category_filter,
+                                   limit=current_app.config.get('SEARCH_MAX_RESULTS', 50))
+    else:
+        services_query = Service.query.filter_by(active=True)
+        if category_filter:
+            services_query = services_query.filter_by(category=category_filter)
+        services = services_query.all()
 
     return render_template('main/index.html', 
                            services=services, 
@@ -43,8 +45,18 @@ def index():
                            active_category=category_param,
                            search_query=query_param)
 
+# --- API: AUTOCOMPLETE DA BUSCA (ÍNDICE EM MEMÓRIA, SEM CONSULTA AO BANCO) ---
+@main_bp.route('/api/servicos/sugestoes')
+def service_suggestions():
+    prefix = request.args.get('q', '')[:100]
+    response = jsonify({'q': prefix, 'suggestions': autocomplete.suggest(prefix)})
+    response.headers['Cache-Control'] = 'public, max-age=60'
+    return response
+
 # --- ROTA: EXPLORAR POR CATEGORIA ---
 @main_bp.route('/explorar/<category_name>')
+@conditional_page()
+@cached_page()
 def explore_category(category_name):
     services = Service.query.filter_by(category=category_name, active=True).all()
     return render_template('main/category_explore.html', 
@@ -53,11 +65,11 @@ def explore_category(category_name):
 
 # --- ROTA: CATÁLOGO DE SERVIÇOS ---
 @main_bp.route('/servicos')
+@conditional_page()
+@cached_page()
 def list_services():
     services = Service.query.filter_by(active=True).order_by(Service.category).all()
-    
-    categories_query = db.session.query(Service.category).filter_by(active=True).distinct().all()
-    categories = sorted([c[0] for c in categories_query])
+    categories = active_categories()
     
     return render_template('main/services_catalog.html', 
                            services=services, 
@@ -66,12 +78,15 @@ def list_services():
 
 # --- ROTA: DETALHE DO SERVIÇO ---
 @main_bp.route('/servico/<int:service_id>')
+@conditional_page()
 def service_detail(service_id):
     service = Service.query.get_or_404(service_id)
     return render_template('main/service_detail.html', service=service)
 
 # --- ROTA: ESPECIALISTAS PÚBLICOS ---
 @main_bp.route('/especialistas')
+@conditional_page()
+@cached_page()
 def public_professionals():
     professionals = Resource.query.all()
     return render_template('main/professionals.html', professionals=professionals)
\ No newline at end of file
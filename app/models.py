@@ -8,8 +8,7 @@
 # Desenvolvido para fins acadêmicos - Curso de Engenharia de Software UNINTER.
 # Acadêmica: Eralice de Moraes Baía | RU: 4144099
 # --------------------------------------------------------------------------
-from datetime import datetime, timezone
-from werkzeug.security import generate_password_hash, check_password_hash
+from datetime import datetime, timedelta, timezone
 from flask import current_app
 from flask_login import UserMixin
 from itsdangerous import URLSafeTimedSerializer as Serializer
@@ -68,13 +67,20 @@ class User(UserMixin, db.Model):
         return self.role in ['admin', 'staff'] or self.is_admin
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        from app.utils.passwords import hash_password
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
+        from app.utils.passwords import verify_password, needs_rehash, hash_password
         # Programação defensiva: se não houver hash, nunca autoriza
         if not self.password_hash:
             return False
-        return check_password_hash(self.password_hash, password)
+        if not verify_password(self.password_hash, password):
+            return False
+        # Hash com algoritmo/custo antigo: regrava com a política atual (commit fica com a rota)
+        if needs_rehash(self.password_hash):
+            self.password_hash = hash_password(password)
+        return True
 
     def get_reset_password_token(self):
         s = Serializer(current_app.config['SECRET_KEY'])
@@ -112,7 +118,7 @@ class StaffProfile(db.Model):
     professional_reg = db.Column(db.String(50)) # CRM, CREFITO, etc
     specialty = db.Column(db.String(100))
     bio = db.Column(db.Text)
-    work_hours = db.Column(db.JSON) # Opcional: para guardar horários complexos
+    work_hours = db.Column(db.JSON) # Horários semanais com pausas (ver app/utils/schedule.py)
 
 class Resource(db.Model):
     __tablename__ = 'resource'
@@ -121,6 +127,9 @@ class Resource(db.Model):
     category = db.Column(db.String(50))  # Ex: 'Cardiologista', 'Sala 01', 'Dentista'
     # Foto do Especialista
     profile_image = db.Column(db.String(255), nullable=True, default='default-doctor.webp')
+    # Profissional responsável: a agenda segue o StaffProfile.work_hours dele
+    staff_profile_id = db.Column(db.Integer, db.ForeignKey('staff_profile.id'), nullable=True)
+    staff_profile = db.relationship('StaffProfile', backref='resources')
     
     services = db.relationship('Service', back_populates='resource', lazy=True)
 
@@ -157,20 +166,53 @@ class Service(db.Model):
     def __repr__(self):
         return f'<Service {self.name}>'
 
+# Status que NÃO ocupam mais a agenda (usado nos filtros e no índice parcial)
+INACTIVE_STATUSES = ('cancelled', 'completed')
+
+def _service_price_default(context):
+    """Preço vigente do serviço no momento da reserva (valor combinado com o paciente)."""
+    service_id = context.get_current_parameters().get('service_id')
+    return context.connection.execute(
+        db.select(Service.price_cents).where(Service.id == service_id)
+    ).scalar()
+
+
 class Appointment(db.Model):
     __tablename__ = 'appointment'
+    # SÊNIOR: índices compostos para os caminhos quentes (conflito por recurso/serviço,
+    # "meus agendamentos" por usuário) e, no PostgreSQL, um índice parcial só com
+    # os agendamentos ativos (painel TV, dashboards e checagens de conflito).
+    __table_args__ = (
+        db.Index('ix_appointment_resource_id_start_datetime', 'resource_id', 'start_datetime'),
+        db.Index('ix_appointment_service_id_start_datetime', 'service_id', 'start_datetime'),
+        db.Index('ix_appointment_user_id_start_datetime', 'user_id', 'start_datetime'),
+        db.Index(
+            'ix_appointment_active_start_datetime', 'start_datetime', 'resource_id',
+            postgresql_where=db.text("status NOT IN ('cancelled', 'completed')")
+        ).ddl_if(dialect='postgresql'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
+    # active_history: o valor antigo é carregado mesmo com o objeto expirado, para
+    # que o rollup diário e o cache de disponibilidade saibam de onde o registro saiu
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    service_id = db.Column(db.Integer, db.ForeignKey('service.id'), nullable=False)
+    service_id = db.column_property(
+        db.Column(db.Integer, db.ForeignKey('service.id'), nullable=False), active_history=True)
     # SÊNIOR: Importante para isolar as agendas por médico/sala
-    resource_id = db.Column(db.Integer, db.ForeignKey('resource.id'), nullable=True)
+    resource_id = db.column_property(
+        db.Column(db.Integer, db.ForeignKey('resource.id'), nullable=True), active_history=True)
     
-    start_datetime = db.Column(db.DateTime, nullable=False, index=True)
+    start_datetime = db.column_property(db.Column(db.DateTime, nullable=False, index=True), active_history=True)
     actual_start = db.Column(db.DateTime) 
-    end_datetime = db.Column(db.DateTime, nullable=False)
+    end_datetime = db.column_property(db.Column(db.DateTime, nullable=False), active_history=True)
     
-    status = db.Column(db.String(20), default='pending')
+    status = db.column_property(db.Column(db.String(20), default='pending'), active_history=True)
+    # Pacotes de sessões recorrentes compartilham o mesmo series_id
+    series_id = db.Column(db.String(32), nullable=True, index=True)
     payment_status = db.Column(db.String(20), default='pending')
+    # Cópia do preço do serviço na criação: mudanças posteriores de preço não alteram
+    # o faturamento já registrado (o rollup diário soma este valor)
+    price_cents = db.column_property(db.Column(db.Integer, default=_service_price_default), active_history=True)
     phone = db.Column(db.String(20))
     
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
@@ -192,6 +234,53 @@ class Appointment(db.Model):
         }
         return status_map.get(self.status, self.status.capitalize())
 
+    @staticmethod
+    def between(start_dt, end_dt):
+        """Filtro semiaberto em start_datetime: usa o índice (sem função sobre a coluna)."""
+        return db.and_(Appointment.start_datetime >= start_dt, Appointment.start_datetime < end_dt)
+
+    @staticmethod
+    def on_day(day=None):
+        """
+        Agendamentos que começam no dia informado (padrão: hoje no fuso Config.TIMEZONE).
+        Substitui func.date(start_datetime) == dia, que obrigava full scan.
+        """
+        from app.utils.clock import local_today, day_bounds
+        return Appointment.between(*day_bounds(day or local_today()))
+
+    @staticmethod
+    def hold_cutoff(now=None):
+        """
+        Limite de validade das reservas 'pending' (PENDING_HOLD_TTL_MINUTES).
+        created_at é gravado em UTC, então a comparação também é feita em UTC.
+        """
+        now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+        ttl = current_app.config.get('PENDING_HOLD_TTL_MINUTES', 15)
+        return now - timedelta(minutes=ttl)
+
+    @staticmethod
+    def live_hold_filter(now=None):
+        """Reservas 'pending' vencidas não ocupam mais a agenda, mesmo antes do sweeper rodar."""
+        return db.or_(
+            Appointment.status != 'pending',
+            Appointment.created_at > Appointment.hold_cutoff(now)
+        )
+
+    @staticmethod
+    def blocking_query(service, now=None):
+        """
+        Query base dos agendamentos que ocupam a agenda de um serviço.
+        Ignora 'cancelled', 'completed' e reservas vencidas, e isola por médico/sala
+        quando houver recurso vinculado; sem recurso, o serviço é travado globalmente.
+        """
+        query = Appointment.query.filter(
+            Appointment.status.notin_(INACTIVE_STATUSES),
+            Appointment.live_hold_filter(now)
+        )
+        if service.resource_id:
+            return query.filter(Appointment.resource_id == service.resource_id)
+        return query.filter(Appointment.service_id == service.id)
+
     @staticmethod
     def check_resource_conflict(service_id, start_dt, end_dt):
         """
@@ -199,26 +288,16 @@ class Appointment(db.Model):
         Ignora agendamentos 'cancelled' e 'completed' para liberar o recurso
         imediatamente após a conclusão do atendimento.
         """
-        from app.models import Service, Appointment
+        from app.models import Service
         service = db.session.get(Service, service_id)
         if not service:
             return False
 
-        # AJUSTE AQUI: O conflito só existe se o status NÃO for 'cancelled' NEM 'completed'
-        query = Appointment.query.filter(
-            Appointment.status.notin_(['cancelled', 'completed']),
+        # O conflito só existe se houver sobreposição na agenda do recurso/serviço
+        conflict = Appointment.blocking_query(service).filter(
             Appointment.start_datetime < end_dt,
             Appointment.end_datetime > start_dt
-        )
-
-        # Se o serviço tem um médico/sala vinculado, checamos apenas a agenda dele
-        if service.resource_id:
-            query = query.filter(Appointment.resource_id == service.resource_id)
-        else:
-            # Se não tem recurso, trava o serviço globalmente
-            query = query.filter(Appointment.service_id == service_id)
-
-        conflict = query.first()
+        ).first()
         return conflict is not None
 
     @staticmethod
@@ -228,11 +307,86 @@ class Appointment(db.Model):
         conflict = Appointment.query.filter(
             Appointment.user_id == user_id,
             Appointment.status != 'cancelled',
+            Appointment.live_hold_filter(),
             Appointment.start_datetime < end_dt,
             Appointment.end_datetime > start_dt
         ).first()
         return conflict is not None
     
+class DailyStat(db.Model):
+    """
+    Rollup diário por (dia, serviço, status), mantido no mesmo commit dos agendamentos
+    (app/utils/daily_stats.py). Os KPIs do dashboard leem daqui em vez de varrer a
+    tabela de agendamentos inteira.
+    """
+    __tablename__ = 'daily_stats'
+    __table_args__ = (
+        db.UniqueConstraint('day', 'service_id', 'status', name='uq_daily_stats_day_service_status'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False, index=True)
+    service_id = db.Column(db.Integer, db.ForeignKey('service.id', ondelete='CASCADE'), nullable=False)
+    status = db.Column(db.String(20), nullable=False)
+    appointment_count = db.Column(db.Integer, nullable=False, default=0)
+    # Receita no preço vigente quando o agendamento entrou no status
+    revenue_cents = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<DailyStat {self.day} {self.service_id} {self.status}>'
+
+class Counter(db.Model):
+    """
+    Contadores de mudança (ex.: 'tv_queue'). Incrementados na mesma transação da
+    alteração; quem observa compara só este número em vez de refazer as consultas.
+    """
+    __tablename__ = 'counters'
+
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+    # Momento (UTC) do último incremento: vira Last-Modified nas páginas públicas
+    updated_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<Counter {self.name}={self.value}>'
+
+class EmailOutbox(db.Model):
+    """
+    Fila persistente de e-mails. As rotas só inserem aqui; o envio ao provedor é
+    feito pelo worker (flask send-emails / thread opcional) em app/utils/email_outbox.py.
+    """
+    __tablename__ = 'email_outbox'
+    __table_args__ = (
+        db.Index('ix_email_outbox_status_next_attempt_at', 'status', 'next_attempt_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    provider = db.Column(db.String(30), nullable=False, default='resend')
+    to_email = db.Column(db.String(120), nullable=False)
+    subject = db.Column(db.String(200), nullable=False)
+    html = db.Column(db.Text, nullable=False)
+    # pending -> sending -> sent | failed (após EMAIL_MAX_ATTEMPTS)
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text)
+    # Datas em UTC (naive), como created_at dos agendamentos
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
+    claimed_at = db.Column(db.DateTime)
+    sent_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f'<EmailOutbox {self.id} {self.to_email} {self.status}>'
+
+class LoginThrottle(db.Model):
+    """Janelas do limitador de login quando LOGIN_THROTTLE_BACKEND='postgres' (app/utils/throttle.py)."""
+    __tablename__ = 'login_throttle'
+
+    key = db.Column(db.String(200), primary_key=True)
+    window_start = db.Column(db.Integer, nullable=False)
+    curr = db.Column(db.Integer, nullable=False)
+    prev = db.Column(db.Integer, nullable=False)
+
 class AuditLog(db.Model):
     __tablename__ = 'audit_logs'
     id = db.Column(db.Integer, primary_key=True)
@@ -8,50 +8,204 @@
 # Desenvolvido para fins acadêmicos - Curso de Engenharia de Software UNINTER.
 # Acadêmica: Eralice de Moraes Baía | RU: 4144099
 # --------------------------------------------------------------------------
-from datetime import datetime, timedelta
+import calendar
+import heapq
+from bisect import bisect_left
+from datetime import date as date_cls, datetime, timedelta
+from flask import current_app
+from app.extensions import db
 from app.models import Appointment, Service
+from app.utils.availability_cache import availability_cache, agenda_key
+from app.utils.schedule import day_slot_starts
+from app.utils.clock import local_now
+
+
+class BusyIntervals:
+    """
+    Índice em memória dos intervalos ocupados de uma agenda.
+    Os intervalos ficam ordenados pelo início e guardamos o maior 'fim' acumulado,
+    assim cada pergunta "este slot conflita?" custa O(log n) e nenhuma query.
+    """
+
+    def __init__(self, intervals, valid_until=None):
+        # valid_until: quando a reserva 'pending' mais próxima vence (em UTC),
+        # a partir daí o resultado muda mesmo sem nenhuma escrita no banco
+        self.valid_until = valid_until
+        ordered = sorted(intervals)
+        self._starts = [start for start, _ in ordered]
+        self._max_ends = []
+        maior_fim = None
+        for _, end in ordered:
+            maior_fim = end if maior_fim is None or end > maior_fim else maior_fim
+            self._max_ends.append(maior_fim)
+
+    def __len__(self):
+        return len(self._starts)
+
+    def overlaps(self, start_dt, end_dt):
+        """Mesma regra do check_resource_conflict: início < fim_slot E fim > início_slot."""
+        # Candidatos são apenas os intervalos que começam antes do fim do slot
+        idx = bisect_left(self._starts, end_dt)
+        if idx == 0:
+            return False
+        return self._max_ends[idx - 1] > start_dt
+
+    def is_free(self, start_dt, end_dt):
+        return not self.overlaps(start_dt, end_dt)
+
+
+def load_busy_intervals(service, window_start, window_end):
+    """
+    Carrega em UMA query (range no índice de start_datetime) todos os intervalos
+    que bloqueiam a agenda do serviço dentro da janela informada.
+    """
+    rows = Appointment.blocking_query(service).filter(
+        Appointment.start_datetime < window_end,
+        Appointment.end_datetime > window_start
+    ).with_entities(
+        Appointment.start_datetime, Appointment.end_datetime,
+        Appointment.status, Appointment.created_at
+    ).all()
+
+    ttl = timedelta(minutes=current_app.config.get('PENDING_HOLD_TTL_MINUTES', 15))
+    holds = [row[3] + ttl for row in rows if row[2] == 'pending' and row[3] is not None]
+    return BusyIntervals(((row[0], row[1]) for row in rows), valid_until=min(holds) if holds else None)
+
+
+def day_busy_intervals(service, day):
+    """
+    Intervalos ocupados dos slots de um dia: de 00:00 até 00:00 do dia seguinte MAIS
+    a duração do serviço (o último slot pode atravessar a meia-noite).
+    O resultado é cacheado por (agenda, dia) e invalidado a cada escrita em Appointment.
+    """
+    day_start = datetime.combine(day, datetime.min.time())
+    window_end = day_start + timedelta(days=1, minutes=service.duration_minutes)
+    key = agenda_key(service.resource_id, service.id) + (day,)
+    return availability_cache.get_or_compute(
+        key, lambda: load_busy_intervals(service, day_start, window_end)
+    )
+
+
+def month_availability(service, year, month, now=None):
+    """
+    Resumo do mês para o calendário: por dia, quantos slots livres restam
+    e qual o primeiro horário livre.
+
+    SÊNIOR: uma única varredura por range em start_datetime para o mês todo
+    e depois um 'sweep' linear (slots e intervalos já ordenados), sem query por dia.
+    """
+    now = now or local_now()
+    first_day = date_cls(year, month, 1)
+    last_day = date_cls(year, month, calendar.monthrange(year, month)[1])
+    duration = timedelta(minutes=service.duration_minutes)
+    window_start = datetime.combine(first_day, datetime.min.time())
+    # Slots do último dia podem terminar no mês seguinte
+    window_end = datetime.combine(last_day + timedelta(days=1), datetime.min.time()) + duration
+
+    rows = Appointment.blocking_query(service).filter(
+        Appointment.start_datetime < window_end,
+        Appointment.end_datetime > window_start
+    ).with_entities(Appointment.start_datetime, Appointment.end_datetime)\
+     .order_by(Appointment.start_datetime.asc()).all()
+
+    idx = 0
+    maior_fim = None
+    days = []
+    day = first_day
+    while day <= last_day:
+        free_count = 0
+        first_free = None
+        for slot_start in day_slot_starts(service, day):
+            slot_end = slot_start + duration
+            # Avança o ponteiro: entram todos os intervalos que começam antes do fim do slot
+            while idx < len(rows) and rows[idx][0] < slot_end:
+                if maior_fim is None or rows[idx][1] > maior_fim:
+                    maior_fim = rows[idx][1]
+                idx += 1
+            ocupado = maior_fim is not None and maior_fim > slot_start
+            if slot_start > now and not ocupado:
+                free_count += 1
+                if first_free is None:
+                    first_free = slot_start
+        days.append({
+            'date': day.isoformat(),
+            'free_slots': free_count,
+            'first_free': first_free.strftime('%H:%M') if first_free else None
+        })
+        day += timedelta(days=1)
+    return days
+
+
+def free_slot_stream(service, start_day, horizon_days, now, chunk_days=7):
+    """
+    Gerador preguiçoso dos slots livres de UM serviço, em ordem cronológica.
+    Carrega os intervalos ocupados em blocos de 'chunk_days' (uma query por bloco),
+    então quem consome só paga pelas semanas que realmente percorreu.
+    """
+    duration = timedelta(minutes=service.duration_minutes)
+    last_day = start_day + timedelta(days=horizon_days - 1)
+    chunk_start = start_day
+    while chunk_start <= last_day:
+        chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), last_day)
+        busy = load_busy_intervals(
+            service,
+            datetime.combine(chunk_start, datetime.min.time()),
+            datetime.combine(chunk_end + timedelta(days=1), datetime.min.time()) + duration
+        )
+        day = chunk_start
+        while day <= chunk_end:
+            for slot in day_slot_starts(service, day):
+                if slot > now and busy.is_free(slot, slot + duration):
+                    yield slot, service.id, service
+            day += timedelta(days=1)
+        chunk_start = chunk_end + timedelta(days=1)
+
+
+def earliest_available(services, limit=3, horizon_days=60, now=None):
+    """
+    Os 'limit' primeiros horários livres entre TODOS os serviços/recursos informados.
+
+    SÊNIOR: merge por fila de prioridade (heapq.merge) sobre os streams de cada
+    serviço. O merge é preguiçoso, então a busca para assim que encontra 'limit'
+    resultados, sem varrer os 60 dias de todos os recursos.
+    """
+    now = now or local_now()
+    streams = [free_slot_stream(service, now.date(), horizon_days, now) for service in services]
+    merged = heapq.merge(*streams, key=lambda item: (item[0], item[1]))
+
+    results = []
+    seen = set()
+    for slot, _, service in merged:
+        # Dois serviços do mesmo profissional no mesmo horário contam uma vez só
+        marker = (agenda_key(service.resource_id, service.id), slot)
+        if marker in seen:
+            continue
+        seen.add(marker)
+        results.append((slot, service))
+        if len(results) >= limit:
+            break
+    return results
+
 
 def get_available_slots(date, service_id):
     """
     Retorna slots disponíveis considerando:
-    1. Horário de funcionamento (08:00 - 18:00)
+    1. Horário de trabalho do recurso (StaffProfile.work_hours, com pausas)
     2. Horários que já passaram (se for hoje)
     3. Conflitos de Equipamentos/Salas (RF002)
     """
-    service = Service.query.get(service_id)
+    service = db.session.get(Service, service_id)
     if not service:
         return []
 
-    service_duration = service.duration_minutes
-    
-    # Definição da janela de trabalho
-    start_time = datetime.combine(date, datetime.strptime("08:00", "%H:%M").time())
-    end_time = datetime.combine(date, datetime.strptime("18:00", "%H:%M").time())
-    
-    available_slots = []
-    current_slot = start_time
-    now = datetime.now()
-
-    while current_slot + timedelta(minutes=service_duration) <= end_time:
-        slot_end = current_slot + timedelta(minutes=service_duration)
-        
-        # REGRA 1: Bloquear horários que já passaram hoje
-        if current_slot < now:
-            is_free = False
-        else:
-            # REGRA 2: Verificar conflito de Recurso (Sala/Equipamento)
-            # Usamos o método estático que criamos no Model Appointment
-            has_conflict = Appointment.check_resource_conflict(
-                service_id=service.id,
-                start_dt=current_slot,
-                end_dt=slot_end
-            )
-            is_free = not has_conflict
-        
-        if is_free:
-            available_slots.append(current_slot)
-        
-        # Intervalo entre o início de cada slot (ex: de 30 em 30 min)
-        current_slot += timedelta(minutes=30)
-        
-    return available_slots
\ No newline at end of file
+    service_duration = timedelta(minutes=service.duration_minutes)
+
+    # SÊNIOR: template semanal pré-compilado + uma única query para o dia
+    busy = day_busy_intervals(service, date)
+    now = local_now()
+
+    return [
+        slot for slot in day_slot_starts(service, date)
+        # REGRA 1: Bloquear horários que já passaram | REGRA 2: conflito de recurso
+        if slot >= now and busy.is_free(slot, slot + service_duration)
+    ]
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------
+# Smart Agenda (Agendai Pro)
+# Copyright (c) 2026 Eralice de Moraes Baía. Todos os direitos reservados.
+# 
+# Este código é PROPRIETÁRIO e CONFIDENCIAL. A reprodução, 
+# distribuição ou modificação não autorizada é estritamente proibida.
+# Desenvolvido para fins acadêmicos - Curso de Engenharia de Software UNINTER.
+# Acadêmica: Eralice de Moraes Baía | RU: 4144099
+# --------------------------------------------------------------------------
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import event, inspect
+from app.extensions import db
+from app.models import Appointment
+from app.utils.events import bus
+
+# Campos que mudam a ocupação da agenda quando alterados
+CAMPOS_AGENDA = ('status', 'start_datetime', 'end_datetime', 'resource_id', 'service_id')
+
+
+def agenda_key(resource_id, service_id):
+    """Agendas com médico/sala são isoladas pelo recurso; sem recurso, pelo serviço."""
+    if resource_id:
+        return ('resource', resource_id)
+    return ('service', service_id)
+
+
+class AvailabilityCache:
+    """
+    Cache LRU da disponibilidade calculada por (agenda, dia).
+
+    Cada chave tem uma versão: a invalidação incrementa a versão, então um cálculo
+    que começou antes de uma escrita nunca grava um resultado desatualizado.
+
+    A invalidação por eventos só alcança o processo que fez o commit. Com vários
+    workers do gunicorn, 'max_age' (segundos) limita por quanto tempo os outros
+    processos podem servir uma entrada antiga.
+    """
+
+    def __init__(self, maxsize=512, max_age=15, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.max_age = max_age
+        self._clock = clock
+        self._data = OrderedDict()
+        self._versions = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _version(self, key):
+        return (self._generation, self._versions.get(key, 0))
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._data:
+                value, stored_at = self._data[key]
+                # Entradas com reserva 'pending' perdem a validade quando a reserva vence
+                valid_until = getattr(value, 'valid_until', None)
+                fresh = not self.max_age or self._clock() - stored_at < self.max_age
+                if fresh and (valid_until is None or valid_until > datetime.now(timezone.utc).replace(tzinfo=None)):
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            version = self._version(key)
+
+        value = compute()
+
+        with self._lock:
+            # Só grava se ninguém invalidou a chave durante o cálculo
+            if self._version(key) == version:
+                self._data[key] = (value, self._clock())
+                self._data.move_to_end(key)
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            self._versions[key] = self._versions.get(key, 0) + 1
+            self._data.pop(key, None)
+            self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._versions.clear()
+            self._data.clear()
+            self.invalidations += 1
+
+    def reset(self, maxsize=None, max_age=None):
+        self.clear()
+        with self._lock:
+            if maxsize:
+                self.maxsize = maxsize
+            if max_age is not None:
+                self.max_age = max_age
+            self.hits = self.misses = self.invalidations = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'max_age': self.max_age,
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'hit_ratio': round(self.hits / total, 4) if total else 0.0
+            }
+
+
+availability_cache = AvailabilityCache()
+
+
+def init_availability_cache(app):
+    """Chamado no create_app(): aplica o tamanho configurado e zera o estado."""
+    availability_cache.reset(
+        app.config.get('AVAILABILITY_CACHE_SIZE', 512),
+        app.config.get('AVAILABILITY_CACHE_MAX_AGE', 15)
+    )
+
+
+# --- INVALIDAÇÃO WRITE-THROUGH VIA EVENTOS DA SESSÃO ---
+
+def _days_of(start_dt, end_dt):
+    """
+    Dias afetados pelo intervalo (um atendimento pode virar a meia-noite). Inclui o
+    dia anterior: os últimos slots dele terminam depois da meia-noite e a janela de
+    day_busy_intervals avança sobre o dia seguinte.
+    """
+    if start_dt is None:
+        return []
+    last = (end_dt - timedelta(microseconds=1)).date() if end_dt and end_dt > start_dt else start_dt.date()
+    days = []
+    day = start_dt.date() - timedelta(days=1)
+    while day <= last:
+        days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+def _keys_for(resource_id, service_id, start_dt, end_dt):
+    agenda = agenda_key(resource_id, service_id)
+    return {agenda + (day,) for day in _days_of(start_dt, end_dt)}
+
+
+def _old_value(state, campo):
+    history = state.attrs[campo].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(state.object, campo)
+
+
+@event.listens_for(db.session, 'after_flush')
+def _collect_appointment_changes(session, flush_context):
+    pending = session.info.setdefault('availability_keys', set())
+
+    for obj in session.new:
+        if isinstance(obj, Appointment):
+            pending |= _keys_for(obj.resource_id, obj.service_id, obj.start_datetime, obj.end_datetime)
+
+    for obj in session.deleted:
+        if isinstance(obj, Appointment):
+            pending |= _keys_for(obj.resource_id, obj.service_id, obj.start_datetime, obj.end_datetime)
+
+    for obj in session.dirty:
+        if not isinstance(obj, Appointment):
+            continue
+        state = inspect(obj)
+        if not any(state.attrs[campo].history.has_changes() for campo in CAMPOS_AGENDA):
+            continue
+        # Invalida tanto a agenda/dia antigos quanto os novos
+        pending |= _keys_for(obj.resource_id, obj.service_id, obj.start_datetime, obj.end_datetime)
+        pending |= _keys_for(*(_old_value(state, campo) for campo in
+                               ('resource_id', 'service_id', 'start_datetime', 'end_datetime')))
+
+
+@event.listens_for(db.session, 'do_orm_execute')
+def _collect_bulk_changes(orm_execute_state):
+    # UPDATE/DELETE em massa (ex.: expiração de reservas) não passa pelo flush
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return None
+    if not any(mapper.class_ is Appointment for mapper in orm_execute_state.all_mappers):
+        return None
+    result = orm_execute_state.invoke_statement()
+    # Só descarta o cache se alguma linha foi realmente afetada
+    if result.rowcount:
+        orm_execute_state.session.info['availability_flush_all'] = True
+    return result
+
+
+@event.listens_for(db.session, 'after_commit')
+def _apply_invalidations(session):
+    if session.info.pop('availability_flush_all', False):
+        availability_cache.clear()
+    for key in session.info.pop('availability_keys', ()):
+        availability_cache.invalidate(key)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_invalidations(session):
+    session.info.pop('availability_keys', None)
+    session.info.pop('availability_flush_all', None)
+
+
+@bus.subscribe
+def _invalidate_from_other_workers(evt):
+    # Commits locais já invalidaram no after_commit; aqui só o que veio de outro worker
+    if not evt.is_remote:
+        return
+    for resource_id, service_id, start, end in evt.slots:
+        start = datetime.fromisoformat(start) if start else None
+        end = datetime.fromisoformat(end) if end else None
+        for key in _keys_for(resource_id, service_id, start, end):
+            availability_cache.invalidate(key)
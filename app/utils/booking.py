@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------
+# Smart Agenda (Agendai Pro)
+# Copyright (c) 2026 Eralice de Moraes Baía. Todos os direitos reservados.
+# 
+# Este código é PROPRIETÁRIO e CONFIDENCIAL. A reprodução, 
+# distribuição ou modificação não autorizada é estritamente proibida.
+# Desenvolvido para fins acadêmicos - Curso de Engenharia de Software UNINTER.
+# Acadêmica: Eralice de Moraes Baía | RU: 4144099
+# --------------------------------------------------------------------------
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+from sqlalchemy import text
+from app.extensions import db
+from app.models import Appointment
+from app.utils.availability import BusyIntervals, load_busy_intervals
+from app.utils.schedule import day_slot_starts
+
+# Namespaces dos advisory locks do PostgreSQL (pg_advisory_xact_lock(namespace, id))
+LOCK_RESOURCE = 1
+LOCK_SERVICE = 2
+LOCK_USER = 3
+
+
+class SlotConflictError(Exception):
+    """O horário foi ocupado (reason='resource') ou o paciente já tem compromisso (reason='user')."""
+
+    def __init__(self, reason):
+        super().__init__(reason)
+        self.reason = reason
+
+
+@contextmanager
+def booking_lock(service, user_id=None):
+    """
+    Serializa "checa conflito -> insere" na agenda do recurso (e do paciente).
+
+    - PostgreSQL: advisory locks de transação por recurso/serviço e por paciente,
+      sempre na mesma ordem (sem deadlock) e liberados no commit/rollback.
+    - SQLite: BEGIN IMMEDIATE, que pega o lock de escrita do banco antes da leitura.
+
+    Qualquer exceção dentro do bloco faz rollback (e libera os locks).
+    """
+    conn = db.session.connection()
+    try:
+        if conn.dialect.name == 'postgresql':
+            if service.resource_id:
+                agenda = (LOCK_RESOURCE, service.resource_id)
+            else:
+                agenda = (LOCK_SERVICE, service.id)
+            conn.execute(text("SELECT pg_advisory_xact_lock(:ns, :id)"), {'ns': agenda[0], 'id': agenda[1]})
+            if user_id:
+                conn.execute(text("SELECT pg_advisory_xact_lock(:ns, :id)"), {'ns': LOCK_USER, 'id': user_id})
+        elif conn.dialect.name == 'sqlite':
+            # Com escrita pendente a transação já segura o lock de escrita
+            if not conn.connection.dbapi_connection.in_transaction:
+                conn.exec_driver_sql("BEGIN IMMEDIATE")
+        yield
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def reserve_slot(service, user_id, start_dt, phone=None, status='pending'):
+    """
+    Reserva um horário de forma segura sob concorrência (vários workers do gunicorn).
+    Levanta SlotConflictError se o horário não estiver mais livre.
+    """
+    end_dt = start_dt + timedelta(minutes=service.duration_minutes)
+    with booking_lock(service, user_id):
+        if Appointment.blocking_query(service).filter(
+                Appointment.start_datetime < end_dt,
+                Appointment.end_datetime > start_dt).first() is not None:
+            raise SlotConflictError('resource')
+
+        if Appointment.check_user_conflict(user_id, start_dt, end_dt):
+            raise SlotConflictError('user')
+
+        appt = Appointment(
+            start_datetime=start_dt,
+            end_datetime=end_dt,
+            service_id=service.id,
+            resource_id=service.resource_id,
+            user_id=user_id,
+            phone=phone,
+            status=status
+        )
+        db.session.add(appt)
+        db.session.commit()
+    return appt
+
+
+def confirm_hold(appt, payment_status='paid'):
+    """
+    Confirma o pagamento de uma reserva 'pending'. Retorna False (e cancela a
+    reserva) se o prazo de pagamento venceu ou se o horário foi ocupado por
+    outro agendamento depois que a reserva expirou.
+
+    Roda sob o mesmo lock do reserve_slot e relê a linha com FOR UPDATE: o sweeper
+    (expire_pending_holds) e uma nova reserva não conseguem mudar o horário entre
+    a checagem e o commit.
+    """
+    service = appt.service
+    with booking_lock(service, appt.user_id):
+        appt = Appointment.query.filter_by(id=appt.id).populate_existing().with_for_update().one()
+        if appt.status != 'pending':
+            db.session.rollback()
+            return appt.status == 'confirmed'
+
+        expirada = appt.created_at is None or appt.created_at <= Appointment.hold_cutoff()
+        ocupado = Appointment.blocking_query(service).filter(
+            Appointment.id != appt.id,
+            Appointment.start_datetime < appt.end_datetime,
+            Appointment.end_datetime > appt.start_datetime
+        ).first() is not None
+
+        if expirada or ocupado:
+            appt.status = 'cancelled'
+            db.session.commit()
+            return False
+
+        appt.status = 'confirmed'
+        appt.payment_status = payment_status
+        db.session.commit()
+    return True
+
+
+# Frequências aceitas para pacotes de sessões (em semanas entre ocorrências)
+SERIES_FREQUENCIES = {'weekly': 1, 'biweekly': 2}
+MAX_SERIES_OCCURRENCES = 26
+
+
+def plan_series(first_start, duration_minutes, occurrences, interval_weeks=1):
+    """Lista de (início, fim) de cada sessão do pacote."""
+    duration = timedelta(minutes=duration_minutes)
+    step = timedelta(weeks=interval_weeks)
+    return [(first_start + i * step, first_start + i * step + duration) for i in range(occurrences)]
+
+
+def _user_busy_intervals(user_id, window_start, window_end):
+    """Mesma regra do check_user_conflict, em uma única query para a janela toda."""
+    rows = Appointment.query.filter(
+        Appointment.user_id == user_id,
+        Appointment.status != 'cancelled',
+        Appointment.live_hold_filter(),
+        Appointment.start_datetime < window_end,
+        Appointment.end_datetime > window_start
+    ).with_entities(Appointment.start_datetime, Appointment.end_datetime).all()
+    return BusyIntervals((row[0], row[1]) for row in rows)
+
+
+def find_series_clashes(service, user_id, planned):
+    """
+    Valida TODAS as ocorrências de uma vez: uma query por dimensão (agenda do
+    recurso e agenda do paciente) cobrindo a janela inteira do pacote, e depois
+    cada ocorrência é respondida em memória.
+
+    Retorna {índice: motivo} só com as ocorrências que não podem ser agendadas.
+    """
+    if not planned:
+        return {}
+    window_start = min(start for start, _ in planned)
+    window_end = max(end for _, end in planned)
+
+    resource_busy = load_busy_intervals(service, window_start, window_end)
+    user_busy = _user_busy_intervals(user_id, window_start, window_end)
+
+    clashes = {}
+    for idx, (start, end) in enumerate(planned):
+        if start not in day_slot_starts(service, start.date()):
+            clashes[idx] = 'fora da agenda do profissional'
+        elif resource_busy.overlaps(start, end):
+            clashes[idx] = 'horário ocupado'
+        elif user_busy.overlaps(start, end):
+            clashes[idx] = 'você já tem compromisso'
+    return clashes
+
+
+def book_series(service, user_id, first_start, occurrences, frequency='weekly',
+                phone=None, skip_conflicts=False):
+    """
+    Agenda um pacote de sessões recorrentes em UMA transação, com series_id comum.
+
+    Retorna (agendamentos_criados, conflitos). Com conflitos e skip_conflicts=False
+    nada é gravado: o paciente vê a lista completa de datas problemáticas de uma vez.
+    """
+    occurrences = max(1, min(int(occurrences), MAX_SERIES_OCCURRENCES))
+    planned = plan_series(first_start, service.duration_minutes, occurrences,
+                          SERIES_FREQUENCIES.get(frequency, 1))
+
+    with booking_lock(service, user_id):
+        clashes = find_series_clashes(service, user_id, planned)
+        report = {planned[idx][0]: motivo for idx, motivo in clashes.items()}
+
+        if clashes and not skip_conflicts:
+            db.session.rollback()
+            return [], report
+
+        series_id = uuid.uuid4().hex
+        created = []
+        for idx, (start, end) in enumerate(planned):
+            if idx in clashes:
+                continue
+            created.append(Appointment(
+                start_datetime=start,
+                end_datetime=end,
+                service_id=service.id,
+                resource_id=service.resource_id,
+                user_id=user_id,
+                phone=phone,
+                status='pending',
+                series_id=series_id
+            ))
+
+        db.session.add_all(created)
+        db.session.commit()
+    return created, report
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------
+# Smart Agenda (Agendai Pro)
+# Copyright (c) 2026 Eralice de Moraes Baía. Todos os direitos reservados.
+# 
+# Este código é PROPRIETÁRIO e CONFIDENCIAL. A reprodução, 
+# distribuição ou modificação não autorizada é estritamente proibida.
+# Desenvolvido para fins acadêmicos - Curso de Engenharia de Software UNINTER.
+# Acadêmica: Eralice de Moraes Baía | RU: 4144099
+# --------------------------------------------------------------------------
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from flask import current_app
+
+
+def local_now():
+    """
+    Data/hora atual no fuso da clínica (Config.TIMEZONE), sem tzinfo.
+    Os horários de agendamento são gravados como 'hora de parede' local,
+    então é com este valor que eles devem ser comparados.
+    """
+    tz = ZoneInfo(current_app.config.get('TIMEZONE') or 'America/Sao_Paulo')
+    return datetime.now(tz).replace(tzinfo=None)
+
+
+def local_today():
+    return local_now().date()
+
+
+def day_bounds(day):
+    """Intervalo semiaberto [00:00 do dia, 00:00 do dia seguinte)."""
+    day_start = datetime.combine(day, datetime.min.time())
+    return day_start, day_start + timedelta(days=1)
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------
+# Smart Agenda (Agendai Pro)
+# Copyright (c) 2026 Eralice de Moraes Baía. Todos os direitos reservados.
+#
+# Este código é PROPRIETÁRIO e CONFIDENCIAL. A reprodução,
+# distribuição ou modificação não autorizada é estritamente proibida.
+# Desenvolvido para fins acadêmicos - Curso de Engenharia de Software UNINTER.
+# Acadêmica: Eralice de Moraes Baía | RU: 4144099
+# --------------------------------------------------------------------------
+"""
+Compressão das respostas (gzip e, se o pacote `brotli` estiver instalado, br).
+
+Dinâmico (after_request): HTML/JSON/CSS/JS acima de COMPRESS_MIN_SIZE, conforme o
+Accept-Encoding. Ficam de fora streams (SSE do painel TV: comprimir seguraria os
+eventos no buffer), respostas em passthrough (arquivos) e quem já tem
+Content-Encoding. O ETag forte vira fraco, como no nginx: o conteúdo é o mesmo,
+só a codificação muda (a validação 304 usa comparação fraca).
+
+Estático: `flask assets compress` grava irmãos .gz/.br dos arquivos de texto em
+static/ no build; o static os entrega prontos, sem gastar CPU por requisição.
+"""
+import gzip
+import mimetypes
+import os
+from flask import current_app, request, send_from_directory
+
+try:
+    import brotli
+except ImportError:  # opcional: sem ele, só gzip
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = (
+    'text/html', 'text/css', 'text/plain', 'text/javascript', 'application/javascript',
+    'application/json', 'image/svg+xml',
+)
+STATIC_EXTENSIONS = ('.css', '.js', '.json', '.svg', '.html', '.txt')
+SUFIXOS = {'br': '.br', 'gzip': '.gz'}
+
+
+def available_encodings():
+    return ('br', 'gzip') if brotli else ('gzip',)
+
+
+def _negotiate():
+    """Melhor codificação aceita pelo cliente (q > 0), preferindo br."""
+    aceitas = request.accept_encodings
+    for encoding in available_encodings():
+        if aceitas[encoding] > 0:
+            return encoding
+    return None
+
+
+def _compress(data, encoding, cfg):
+    if encoding == 'br':
+        return brotli.compress(data, quality=cfg.get('COMPRESS_BROTLI_QUALITY', 5))
+    return gzip.compress(data, compresslevel=cfg.get('COMPRESS_LEVEL', 6), mtime=0)
+
+
+def compress_response(response):
+    cfg = current_app.config
+    if not cfg.get('COMPRESS_ENABLED', True):
+        return response
+    if response.direct_passthrough or response.is_streamed or request.method == 'HEAD':
+        return response
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return response
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES or 'Content-Encoding' in response.headers:
+        return response
+    if 'no-transform' in (response.headers.get('Cache-Control') or ''):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = _negotiate()
+    data = response.get_data()
+    if not encoding or len(data) < cfg.get('COMPRESS_MIN_SIZE', 500):
+        return response
+
+    response.set_data(_compress(data, encoding, cfg))
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def send_static(folder, filename, max_age):
+    """
+    send_from_directory que prefere o irmão pré-comprimido (.br/.gz) quando o
+    cliente aceita e ele está atualizado em relação ao original.
+    """
+    mimetype = mimetypes.guess_type(filename)[0]
+    original = os.path.join(folder, filename)
+    if mimetype in COMPRESSIBLE_MIMETYPES and os.path.isfile(original):
+        aceitas = request.accept_encodings
+        for encoding in ('br', 'gzip'):
+            irmao = original + SUFIXOS[encoding]
+            if aceitas[encoding] > 0 and os.path.isfile(irmao) and \
+                    os.path.getmtime(irmao) >= os.path.getmtime(original):
+                response = send_from_directory(folder, filename + SUFIXOS[encoding],
+                                               mimetype=mimetype, max_age=max_age)
+                response.headers['Content-Encoding'] = encoding
+                response.vary.add('Accept-Encoding')
+                return response
+
+    response = send_from_directory(folder, filename, max_age=max_age)
+    if mimetype in COMPRESSIBLE_MIMETYPES:
+        response.vary.add('Accept-Encoding')
+    return response
+
+
+def precompress_static(folder, encodings=None, log=print):
+    """Gera/atualiza os .gz/.br dos arquivos de texto. Retorna quantos foram gravados."""
+    encodings = encodings or available_encodings()
+    gravados = 0
+    for raiz, _dirs, arquivos in os.walk(folder):
+        for nome in arquivos:
+            if not nome.endswith(STATIC_EXTENSIONS):
+                continue
+            origem = os.path.join(raiz, nome)
+            with open(origem, 'rb') as f:
+                data = f.read()
+            for encoding in encodings:
+                destino = origem + SUFIXOS[encoding]
+                if os.path.isfile(destino) and os.path.getmtime(destino) >= os.path.getmtime(origem):
+                    continue
+                # Build: nível máximo, o custo é pago uma vez só
+                if encoding == 'br':
+                    comprimido = brotli.compress(data, quality=11)
+                else:
+                    comprimido = gzip.compress(data, compresslevel=9, mtime=0)
+                tmp = destino + '.tmp'
+                with open(tmp, 'wb') as f:
+                    f.write(comprimido)
+                os.replace(tmp, destino)
+                gravados += 1
+                log(f"  {os.path.relpath(destino, folder)}: {len(data)} -> {len(comprimido)} bytes")
+    return gravados
+
+
+def init_compression(app):
+    app.after_request(compress_response)
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------
+# Smart Agenda (Agendai Pro)
+# Copyright (c) 2026 Eralice de Moraes Baía. Todos os direitos reservados.
+#
+# Este código é PROPRIETÁRIO e CONFIDENCIAL. A reprodução,
+# distribuição ou modificação não autorizada é estritamente proibida.
+# Desenvolvido para fins acadêmicos - Curso de Engenharia de Software UNINTER.
+# Acadêmica: Eralice de Moraes Baía | RU: 4144099
+# --------------------------------------------------------------------------
+from datetime import datetime, timezone
+from sqlalchemy import select
+from app.extensions import db
+from app.models import Counter
+
+
+def bump_counter(name, connection=None):
+    """
+    Incrementa o contador dentro da transação atual (visível só após o commit).
+    Aceita a conexão da sessão para uso dentro de eventos de flush.
+
+    Upsert do dialeto (INSERT ... ON CONFLICT DO UPDATE) no PostgreSQL/SQLite: dois
+    workers criando o mesmo contador ao mesmo tempo não geram IntegrityError no flush.
+    """
+    table = Counter.__table__
+    connection = connection or db.session.connection()
+    agora = datetime.now(timezone.utc).replace(tzinfo=None)
+    dialect = connection.dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(table).values(name=name, value=1, updated_at=agora)
+        connection.execute(stmt.on_conflict_do_update(
+            index_elements=['name'], set_={'value': table.c.value + 1, 'updated_at': agora}
+        ))
+        return
+
+    # Outros bancos: UPDATE e, se a linha ainda não existir, INSERT
+    result = connection.execute(
+        table.update().where(table.c.name == name).values(value=table.c.value + 1, updated_at=agora)
+    )
+    if not result.rowcount:
+        connection.execute(table.insert().values(name=name, value=1, updated_at=agora))
+
+
+def read_counter(name):
+    """Valor atual (0 se o contador ainda não existe). Consulta por chave primária."""
+    return db.session.execute(select(Counter.value).where(Counter.name == name)).scalar() or 0
+
+
+def read_counter_state(name):
+    """(valor, updated_at) numa única consulta; (0, None) se o contador não existe."""
+    row = db.session.execute(
+        select(Counter.value, Counter.updated_at).where(Counter.name == name)
+    ).first()
+    return (row[0], row[1]) if row else (0, None)
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------
+# Smart Agenda (Agendai Pro)
+# Copyright (c) 2026 Eralice de Moraes Baía. Todos os direitos reservados.
+#
+# Este código é PROPRIETÁRIO e CONFIDENCIAL. A reprodução,
+# distribuição ou modificação não autorizada é estritamente proibida.
+# Desenvolvido para fins acadêmicos - Curso de Engenharia de Software UNINTER.
+# Acadêmica: Eralice de Moraes Baía | RU: 4144099
+# --------------------------------------------------------------------------
+"""
+Rollup diário (tabela daily_stats) para os KPIs do dashboard.
+
+Cada INSERT/UPDATE/DELETE de Appointment vira um delta (+1/-1 e receita) na linha
+(dia, serviço, status) correspondente, gravado na MESMA transação via upsert do
+dialeto. A receita é sempre o Appointment.price_cents (preço gravado na reserva),
+tanto nos deltas quanto na reconstrução. Assim o dashboard soma algumas linhas por dia em vez de carregar todos os
+agendamentos. UPDATE/DELETE em massa não passam pelo flush: nesses casos (ou para
+popular a tabela pela primeira vez) use `flask stats-rebuild`.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from sqlalchemy import event, inspect, func
+from app.extensions import db
+from app.models import Appointment, DailyStat
+
+# Status que entram no faturamento (mesmos critérios do dashboard antigo)
+REVENUE_STATUSES_TODAY = ('confirmed', 'completed', 'in_progress', 'arrived')
+REVENUE_STATUSES_TOTAL = ('confirmed', 'completed', 'in_progress')
+
+CAMPOS_ROLLUP = ('status', 'start_datetime', 'service_id', 'price_cents')
+
+
+def _old_value(state, campo):
+    history = state.attrs[campo].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(state.object, campo)
+
+
+def _upsert(connection, rows):
+    table = DailyStat.__table__
+    dialect = connection.dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['day', 'service_id', 'status'],
+            set_={
+                'appointment_count': table.c.appointment_count + stmt.excluded.appointment_count,
+                'revenue_cents': table.c.revenue_cents + stmt.excluded.revenue_cents,
+            }
+        )
+        connection.execute(stmt)
+        return
+
+    # Outros bancos: UPDATE e, se a linha ainda não existir, INSERT
+    for row in rows:
+        result = connection.execute(
+            table.update()
+            .where(table.c.day == row['day'], table.c.service_id == row['service_id'],
+                   table.c.status == row['status'])
+            .values(appointment_count=table.c.appointment_count + row['appointment_count'],
+                    revenue_cents=table.c.revenue_cents + row['revenue_cents'])
+        )
+        if not result.rowcount:
+            connection.execute(table.insert().values(**row))
+
+
+@event.listens_for(db.session, 'after_flush')
+def _apply_rollup_deltas(session, flush_context):
+    deltas = defaultdict(lambda: [0, 0])
+
+    def add(service_id, start_dt, status, price_cents, sign):
+        if service_id is None or start_dt is None:
+            return
+        delta = deltas[(start_dt.date(), service_id, status or 'pending')]
+        delta[0] += sign
+        delta[1] += sign * (price_cents or 0)
+
+    for obj in session.new:
+        if isinstance(obj, Appointment):
+            add(obj.service_id, obj.start_datetime, obj.status, obj.price_cents, 1)
+
+    for obj in session.deleted:
+        if isinstance(obj, Appointment):
+            add(obj.service_id, obj.start_datetime, obj.status, obj.price_cents, -1)
+
+    for obj in session.dirty:
+        if not isinstance(obj, Appointment):
+            continue
+        state = inspect(obj)
+        if not any(state.attrs[campo].history.has_changes() for campo in CAMPOS_ROLLUP):
+            continue
+        # Sai da linha antiga e entra na nova (status, dia, serviço ou preço mudaram)
+        add(*(_old_value(state, campo) for campo in ('service_id', 'start_datetime', 'status', 'price_cents')), -1)
+        add(obj.service_id, obj.start_datetime, obj.status, obj.price_cents, 1)
+
+    rows = [
+        {'day': day, 'service_id': service_id, 'status': status,
+         'appointment_count': count, 'revenue_cents': cents}
+        for (day, service_id, status), (count, cents) in deltas.items()
+        if count or cents
+    ]
+    if rows:
+        _upsert(session.connection(), rows)
+
+
+def rebuild_daily_stats(start_day=None, end_day=None):
+    """
+    Recalcula o rollup a partir dos agendamentos (backfill inicial ou correção após
+    operações em massa). Intervalo semiaberto [start_day, end_day); sem limites, tudo.
+    Retorna o número de linhas gravadas. Não faz commit.
+    """
+    table = DailyStat.__table__
+    delete = table.delete()
+    query = db.session.query(
+        func.date(Appointment.start_datetime),
+        Appointment.service_id,
+        Appointment.status,
+        func.count(Appointment.id),
+        func.coalesce(func.sum(func.coalesce(Appointment.price_cents, 0)), 0)
+    )
+
+    if start_day:
+        delete = delete.where(table.c.day >= start_day)
+        query = query.filter(Appointment.start_datetime >= datetime.combine(start_day, datetime.min.time()))
+    if end_day:
+        delete = delete.where(table.c.day < end_day)
+        query = query.filter(Appointment.start_datetime < datetime.combine(end_day, datetime.min.time()))
+
+    rows = []
+    for day, service_id, status, count, cents in query.group_by(
+            func.date(Appointment.start_datetime), Appointment.service_id, Appointment.status):
+        if isinstance(day, str):
+            day = datetime.strptime(day, '%Y-%m-%d').date()
+        rows.append({'day': day, 'service_id': service_id, 'status': status or 'pending',
+                     'appointment_count': count, 'revenue_cents': int(cents)})
+
+    # Core direto: não gera deltas no after_flush
+    connection = db.session.connection()
+    connection.execute(delete)
+    if rows:
+        connection.execute(table.insert(), rows)
+    return len(rows)
+
+
+# --- CONSULTAS DOS KPIs ---
+
+def revenue_cents(statuses, day=None):
+    query = db.session.query(func.coalesce(func.sum(DailyStat.revenue_cents), 0)).filter(
+        DailyStat.status.in_(statuses))
+    if day is not None:
+        query = query.filter(DailyStat.day == day)
+    return int(query.scalar())
+
+
+def appointment_count(status=None, day=None):
+    query = db.session.query(func.coalesce(func.sum(DailyStat.appointment_count), 0))
+    if status is not None:
+        query = query.filter(DailyStat.status == status)
+    if day is not None:
+        query = query.filter(DailyStat.day == day)
+    return int(query.scalar())
+
+
+def counts_by_day(since, until=None):
+    """[(dia, total)] em ordem cronológica para o gráfico do dashboard."""
+    query = db.session.query(DailyStat.day, func.sum(DailyStat.appointment_count)).filter(
+        DailyStat.day >= since)
+    if until is not None:
+        query = query.filter(DailyStat.day < until)
+    return [(day, int(total)) for day, total in
+            query.group_by(DailyStat.day).order_by(DailyStat.day).all() if total]
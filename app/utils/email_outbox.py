@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------
+# Smart Agenda (Agendai Pro)
+# Copyright (c) 2026 Eralice de Moraes Baía. Todos os direitos reservados.
+#
+# Este código é PROPRIETÁRIO e CONFIDENCIAL. A reprodução,
+# distribuição ou modificação não autorizada é estritamente proibida.
+# Desenvolvido para fins acadêmicos - Curso de Engenharia de Software UNINTER.
+# Acadêmica: Eralice de Moraes Baía | RU: 4144099
+# --------------------------------------------------------------------------
+"""
+Outbox de e-mails: as rotas só gravam na tabela email_outbox (enqueue_email) e o
+worker entrega em segundo plano. A latência da requisição deixa de depender do
+provedor (Resend).
+
+Entrega:
+  * uma requests.Session por processo, com pool de conexões HTTP keep-alive;
+  * limite de envios por segundo por provedor (token bucket);
+  * erro transitório (rede, 429, 5xx) -> nova tentativa com backoff exponencial;
+    erro definitivo (outros 4xx) ou EMAIL_MAX_ATTEMPTS esgotado -> 'failed'.
+
+O corpo de mensagens finalizadas ('sent'/'failed') é apagado na hora: o e-mail de
+redefinição leva o token válido no link. As linhas em si somem após
+EMAIL_RETENTION_DAYS (purge_outbox, chamado pelo próprio worker).
+
+Em produção o worker roda como thread em cada processo web
+(EMAIL_OUTBOX_THREAD_ENABLED, ligado por padrão no ProductionConfig; o SKIP LOCKED
+evita envio duplicado). Com um worker dedicado (`flask send-emails --loop`),
+desligue a thread.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+import requests
+from requests.adapters import HTTPAdapter
+from flask import current_app
+from app.extensions import db
+from app.models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+
+def _utc_now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def enqueue_email(to_email, subject, html, provider='resend'):
+    """Só grava na fila (o commit fica com a rota). Retorna o registro."""
+    msg = EmailOutbox(provider=provider, to_email=to_email, subject=subject, html=html,
+                      status='pending', attempts=0, next_attempt_at=_utc_now())
+    db.session.add(msg)
+    return msg
+
+
+class RateLimiter:
+    """Token bucket: no máximo `rate` envios/s, com rajada de até `burst`."""
+
+    def __init__(self, rate, burst=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = float(rate)
+        self.capacity = float(burst or max(1, rate))
+        self.tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        with self._lock:
+            while True:
+                now = self._clock()
+                self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                self._sleep((1 - self.tokens) / self.rate)
+
+
+class DeliveryError(Exception):
+    def __init__(self, message, retryable=True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class ResendProvider:
+    """Cliente HTTP do Resend com sessão e pool de conexões reaproveitados."""
+    name = 'resend'
+
+    def __init__(self, api_url, api_key, sender, timeout=10, pool_size=4):
+        self.api_url = api_url
+        self.sender = sender
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        })
+        # Retentativas ficam com o outbox (backoff persistente), não com o urllib3
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def send(self, msg):
+        try:
+            response = self.session.post(self.api_url, json={
+                "from": self.sender,
+                "to": msg.to_email,
+                "subject": msg.subject,
+                "html": msg.html,
+            }, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise DeliveryError(f"Erro de conexão: {e}") from e
+
+        if response.status_code in (200, 201, 202):
+            return
+        retryable = response.status_code == 429 or response.status_code >= 500
+        raise DeliveryError(f"HTTP {response.status_code}: {response.text[:500]}", retryable=retryable)
+
+
+_providers = {}
+_limiters = {}
+_state_lock = threading.Lock()
+
+
+def get_provider(name):
+    with _state_lock:
+        if name not in _providers:
+            if name != 'resend':
+                raise ValueError(f"Provedor de e-mail desconhecido: {name}")
+            cfg = current_app.config
+            _providers[name] = ResendProvider(
+                cfg.get('EMAIL_API_URL', 'https://api.resend.com/emails'),
+                cfg.get('EMAIL_API_KEY'),
+                cfg.get('EMAIL_SENDER', 'onboarding@resend.dev'),
+                timeout=cfg.get('EMAIL_HTTP_TIMEOUT', 10),
+                pool_size=cfg.get('EMAIL_HTTP_POOL_SIZE', 4),
+            )
+            _limiters[name] = RateLimiter(cfg.get('EMAIL_RATE_PER_SECOND', 2))
+        return _providers[name], _limiters[name]
+
+
+def reset_providers():
+    """Descarta sessões/limitadores (após mudar a configuração, ou nos testes)."""
+    with _state_lock:
+        for provider in _providers.values():
+            provider.session.close()
+        _providers.clear()
+        _limiters.clear()
+
+
+def _claim_batch(batch_size, now):
+    """
+    Reserva um lote de mensagens vencidas. No PostgreSQL, FOR UPDATE SKIP LOCKED deixa
+    vários workers dividirem a fila sem pegar a mesma mensagem; 'sending' antigo
+    (worker morto no meio do envio) volta a ser elegível após EMAIL_CLAIM_TIMEOUT.
+    """
+    stale = now - timedelta(seconds=current_app.config.get('EMAIL_CLAIM_TIMEOUT_SECONDS', 300))
+    lote = EmailOutbox.query.filter(
+        db.or_(
+            db.and_(EmailOutbox.status == 'pending', EmailOutbox.next_attempt_at <= now),
+            db.and_(EmailOutbox.status == 'sending', EmailOutbox.claimed_at <= stale)
+        )
+    ).order_by(EmailOutbox.next_attempt_at.asc(), EmailOutbox.id.asc()) \
+     .limit(batch_size).with_for_update(skip_locked=True).all()
+
+    for msg in lote:
+        msg.status = 'sending'
+        msg.claimed_at = now
+    db.session.commit()
+    return lote
+
+
+def _backoff(attempts):
+    base = current_app.config.get('EMAIL_RETRY_BASE_SECONDS', 30)
+    teto = current_app.config.get('EMAIL_RETRY_MAX_SECONDS', 3600)
+    return min(teto, base * (2 ** (attempts - 1)))
+
+
+def deliver_pending(batch_size=None, now=None):
+    """Entrega um lote da fila. Retorna (enviados, com_erro)."""
+    batch_size = batch_size or current_app.config.get('EMAIL_BATCH_SIZE', 20)
+    max_attempts = current_app.config.get('EMAIL_MAX_ATTEMPTS', 5)
+    enviados = erros = 0
+
+    for msg in _claim_batch(batch_size, now or _utc_now()):
+        msg.attempts = (msg.attempts or 0) + 1
+        try:
+            provider, limiter = get_provider(msg.provider)
+            limiter.acquire()
+            provider.send(msg)
+        except (DeliveryError, ValueError) as e:
+            erros += 1
+            msg.last_error = str(e)
+            retryable = getattr(e, 'retryable', False)
+            if retryable and msg.attempts < max_attempts:
+                msg.status = 'pending'
+                msg.next_attempt_at = _utc_now() + timedelta(seconds=_backoff(msg.attempts))
+            else:
+                msg.status = 'failed'
+                msg.html = ''
+                logger.error(f"E-mail {msg.id} para {msg.to_email} falhou: {e}")
+        else:
+            enviados += 1
+            msg.status = 'sent'
+            msg.sent_at = _utc_now()
+            msg.last_error = None
+            # Não guarda o corpo entregue (links com token de redefinição de senha)
+            msg.html = ''
+        # Um commit por mensagem: o resultado não se perde se o worker cair no meio do lote
+        db.session.commit()
+
+    return enviados, erros
+
+
+def purge_outbox(retention_days=None, now=None):
+    """Apaga mensagens finalizadas mais antigas que a retenção. Retorna quantas."""
+    if retention_days is None:
+        retention_days = current_app.config.get('EMAIL_RETENTION_DAYS', 7)
+    limite = (now or _utc_now()) - timedelta(days=retention_days)
+    total = EmailOutbox.query.filter(
+        EmailOutbox.status.in_(('sent', 'failed')),
+        EmailOutbox.created_at <= limite
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    return total
+
+
+PURGE_INTERVAL_SECONDS = 3600
+
+
+def run_outbox_loop(app, interval, stop_event, batch_size=None):
+    """Laço do worker (thread opcional e comando flask send-emails --loop)."""
+    ultima_limpeza = 0.0
+    while not stop_event.is_set():
+        enviados = erros = 0
+        with app.app_context():
+            try:
+                enviados, erros = deliver_pending(batch_size=batch_size)
+                if enviados or erros:
+                    logger.info(f"Outbox: {enviados} enviado(s), {erros} com erro.")
+                if time.monotonic() - ultima_limpeza >= PURGE_INTERVAL_SECONDS:
+                    ultima_limpeza = time.monotonic()
+                    removidas = purge_outbox()
+                    if removidas:
+                        logger.info(f"Outbox: {removidas} mensagem(ns) antiga(s) removida(s).")
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Erro no worker de e-mails: {str(e)}")
+            finally:
+                db.session.remove()
+        # Lote cheio: provavelmente há mais na fila, segue sem esperar
+        if enviados + erros < (batch_size or app.config.get('EMAIL_BATCH_SIZE', 20)):
+            stop_event.wait(interval)
+
+
+def start_outbox_thread(app):
+    """Thread opcional dentro do processo web (EMAIL_OUTBOX_THREAD_ENABLED=true)."""
+    stop_event = threading.Event()
+    interval = app.config.get('EMAIL_OUTBOX_INTERVAL_SECONDS', 5)
+    thread = threading.Thread(
+        target=run_outbox_loop, args=(app, interval, stop_event),
+        name='email-outbox', daemon=True
+    )
+    thread.start()
+    app.extensions['email_outbox'] = (thread, stop_event)
+    return thread
@@ -0,0 +1,405 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------
+# Smart Agenda (Agendai Pro)
+# Copyright (c) 2026 Eralice de Moraes Baía. Todos os direitos reservados.
+#
+# Este código é PROPRIETÁRIO e CONFIDENCIAL. A reprodução,
+# distribuição ou modificação não autorizada é estritamente proibida.
+# Desenvolvido para fins acadêmicos - Curso de Engenharia de Software UNINTER.
+# Acadêmica: Eralice de Moraes Baía | RU: 4144099
+# --------------------------------------------------------------------------
+"""
+Barramento interno de eventos de agendamento (publish/subscribe entre workers).
+
+Qualquer flush que cria, remove ou altera status/horário de um Appointment gera um
+AppointmentEvent, publicado só DEPOIS do commit (rollback descarta). Backends:
+
+    memory   -> apenas o processo atual (dev com um worker, testes)
+    postgres -> LISTEN/NOTIFY: todos os workers ligados ao mesmo banco. O NOTIFY é
+                emitido no flush, na própria transação: o PostgreSQL só o entrega
+                no commit (e o descarta no rollback), sem conexão extra por evento
+    file     -> arquivo de log compartilhado (SQLite com vários workers na mesma
+                máquina), rotacionado ao passar de EVENT_BUS_FILE_MAX_BYTES
+
+EVENT_BUS_BACKEND vazio escolhe 'postgres' para bancos PostgreSQL e 'memory' nos demais.
+Assinantes recebem o evento no processo que publicou (event.is_remote == False) e,
+nos backends entre processos, também nos demais workers (event.is_remote == True).
+"""
+import json
+import logging
+import os
+import select
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field, asdict
+from sqlalchemy import event, inspect, text
+from app.extensions import db
+from app.models import Appointment
+
+logger = logging.getLogger(__name__)
+
+_process = {}
+
+
+def process_id():
+    """
+    Identifica este processo: eventos de volta do backend com a mesma origem são
+    ignorados. Calculado por PID para continuar único após o fork (gunicorn --preload).
+    """
+    pid = os.getpid()
+    if pid not in _process:
+        _process.clear()
+        _process[pid] = f"{pid}-{uuid.uuid4().hex[:8]}"
+    return _process[pid]
+
+
+CAMPOS_EVENTO = ('status', 'start_datetime', 'end_datetime', 'resource_id', 'service_id')
+
+
+@dataclass
+class AppointmentEvent:
+    kind: str                  # 'created' | 'status_changed' | 'rescheduled' | 'deleted'
+    appointment_id: int
+    status: str = None
+    previous_status: str = None
+    # Posições na agenda tocadas pela mudança: [resource_id, service_id, início, fim] (ISO)
+    slots: list = field(default_factory=list)
+    origin: str = field(default_factory=process_id)
+
+    @property
+    def is_remote(self):
+        return self.origin != process_id()
+
+    def to_json(self):
+        return json.dumps(asdict(self), separators=(',', ':'))
+
+    @classmethod
+    def from_json(cls, raw):
+        return cls(**json.loads(raw))
+
+
+class EventBus:
+    """Lista de assinantes + backend de transporte. Callbacks devem ser rápidos."""
+
+    def __init__(self, backend=None):
+        self._subscribers = []
+        self.backend = backend or InProcessBackend()
+
+    def subscribe(self, callback):
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def set_backend(self, backend):
+        self.backend.stop()
+        self.backend = backend
+
+    def publish(self, evt):
+        # Entrega local imediata; o backend leva o evento aos outros workers
+        self.dispatch(evt)
+        try:
+            self.backend.publish(evt)
+        except Exception:
+            logger.exception("Falha ao propagar evento de agendamento")
+
+    def dispatch(self, evt):
+        for callback in list(self._subscribers):
+            try:
+                callback(evt)
+            except Exception:
+                logger.exception("Assinante do barramento falhou")
+
+    def receive(self, raw):
+        """Chamado pelos backends ao receber um evento de outro worker."""
+        try:
+            evt = AppointmentEvent.from_json(raw)
+        except (ValueError, TypeError):
+            logger.warning("Evento inválido ignorado: %r", raw)
+            return
+        if evt.is_remote:
+            self.dispatch(evt)
+
+
+class InProcessBackend:
+    name = 'memory'
+    # True: o backend envia o evento dentro da transação (notify), não depois do commit
+    transactional = False
+
+    def publish(self, evt):
+        pass
+
+    def start(self, bus):
+        pass
+
+    def stop(self):
+        pass
+
+
+class _ListenerBackend:
+    """Base dos backends com thread de escuta (uma por processo)."""
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self, bus):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._listen, args=(bus,),
+                                        name=f'event-bus-{self.name}', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _listen(self, bus):
+        while not self._stop.is_set():
+            try:
+                self.listen(bus)
+            except Exception:
+                logger.exception("Listener do barramento (%s) caiu; reconectando", self.name)
+                self._stop.wait(2)
+
+
+class PostgresNotifyBackend(_ListenerBackend):
+    """
+    NOTIFY no canal configurado; cada worker mantém UMA conexão dedicada em LISTEN.
+    O payload do NOTIFY tem limite de 8000 bytes, folgado para estes eventos.
+    """
+    name = 'postgres'
+    transactional = True
+    DRIVERS = ('psycopg2', 'psycopg')
+
+    def __init__(self, engine, channel='agendamentos'):
+        super().__init__()
+        self.engine = engine
+        self.channel = channel
+
+    def notify(self, connection, evt):
+        """pg_notify na transação da sessão: sai no commit, some no rollback."""
+        connection.execute(text("SELECT pg_notify(:canal, :payload)"),
+                           {'canal': self.channel, 'payload': evt.to_json()})
+
+    def publish(self, evt):
+        # Eventos publicados fora de uma sessão (bus.publish direto)
+        with self.engine.begin() as conn:
+            self.notify(conn, evt)
+
+    def listen(self, bus):
+        raw = self.engine.raw_connection()
+        try:
+            conn = raw.driver_connection
+            conn.autocommit = True
+            if self.engine.dialect.driver == 'psycopg':
+                conn.execute(f'LISTEN "{self.channel}"')
+                while not self._stop.is_set():
+                    # Gerador termina após o timeout, para checar o stop
+                    for notify in conn.notifies(timeout=5):
+                        bus.receive(notify.payload)
+            else:
+                conn.cursor().execute(f'LISTEN "{self.channel}"')
+                while not self._stop.is_set():
+                    # psycopg2: select() no socket + poll(); timeout para checar o stop
+                    if select.select([conn], [], [], 5) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        bus.receive(conn.notifies.pop(0).payload)
+        finally:
+            # Conexão em autocommit e com LISTEN ativo não volta para o pool
+            raw.invalidate()
+
+
+class FileBackend(_ListenerBackend):
+    """
+    Stand-in para SQLite/testes: cada evento vira uma linha anexada (O_APPEND) num
+    arquivo compartilhado, e cada worker acompanha o final do arquivo.
+
+    Passando de max_bytes, quem publicou renomeia o arquivo para '<path>.1' (o
+    anterior é descartado); os leitores percebem a troca pelo inode, terminam de
+    ler o '.1' e seguem no arquivo novo desde o início.
+    """
+    name = 'file'
+
+    def __init__(self, path, poll_interval=0.2, max_bytes=1 << 20):
+        super().__init__()
+        self.path = path
+        self.poll_interval = poll_interval
+        self.max_bytes = max_bytes
+        self._position = None
+        self._inode = None
+
+    def publish(self, evt):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(evt.to_json() + '\n')
+            f.flush()
+            tamanho = f.tell()
+            inode = os.fstat(f.fileno()).st_ino
+        if self.max_bytes and tamanho >= self.max_bytes:
+            self._rotate(inode)
+
+    def _rotate(self, inode):
+        try:
+            # Outro worker pode ter rotacionado primeiro: só renomeia o arquivo que encheu
+            if os.stat(self.path).st_ino == inode:
+                os.replace(self.path, self.path + '.1')
+        except FileNotFoundError:
+            pass
+
+    def _read(self, path, bus, inode=None):
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            if inode is not None and os.fstat(f.fileno()).st_ino != inode:
+                return
+            f.seek(self._position)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # linha ainda sendo escrita
+                self._position += len(line)
+                bus.receive(line.decode('utf-8').strip())
+
+    def poll(self, bus):
+        """Entrega as linhas novas desde a última leitura."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            # Ainda não criado (ou recém-rotacionado): tudo que aparecer depois é novo
+            if self._position is None:
+                self._position = 0
+            return
+        if self._position is None:
+            # Primeira leitura começa do fim
+            self._inode, self._position = stat.st_ino, stat.st_size
+            return
+        if stat.st_ino != self._inode:
+            if self._inode is not None:
+                self._read(self.path + '.1', bus, inode=self._inode)
+            self._inode, self._position = stat.st_ino, 0
+        elif stat.st_size < self._position:
+            self._position = 0  # truncado por fora
+        self._read(self.path, bus)
+
+    def listen(self, bus):
+        while not self._stop.is_set():
+            self.poll(bus)
+            time.sleep(self.poll_interval)
+
+
+bus = EventBus()
+
+
+def build_backend(app):
+    nome = (app.config.get('EVENT_BUS_BACKEND') or '').lower()
+    uri = app.config.get('SQLALCHEMY_DATABASE_URI') or ''
+    if not nome:
+        nome = 'postgres' if uri.startswith('postgresql') else 'memory'
+
+    if nome == 'postgres':
+        if db.engine.dialect.name != 'postgresql' or db.engine.dialect.driver not in PostgresNotifyBackend.DRIVERS:
+            logger.warning("EVENT_BUS_BACKEND=postgres exige PostgreSQL com psycopg2/psycopg "
+                           "(atual: %s+%s); usando só o processo atual",
+                           db.engine.dialect.name, db.engine.dialect.driver)
+            return InProcessBackend()
+        return PostgresNotifyBackend(db.engine, app.config.get('EVENT_BUS_CHANNEL', 'agendamentos'))
+    if nome == 'file':
+        path = app.config.get('EVENT_BUS_FILE') or os.path.join(app.instance_path, 'events.log')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return FileBackend(path, max_bytes=app.config.get('EVENT_BUS_FILE_MAX_BYTES', 1 << 20))
+    return InProcessBackend()
+
+
+def _restart_listener():
+    # Threads não sobrevivem ao fork: cada worker sobe o próprio listener
+    bus.backend.start(bus)
+
+
+def init_event_bus(app):
+    """Chamado no create_app(): escolhe o backend e sobe o listener (exceto em testes)."""
+    with app.app_context():
+        bus.set_backend(build_backend(app))
+    if app.config.get('TESTING'):
+        return
+    bus.backend.start(bus)
+    if hasattr(os, 'register_at_fork') and not app.extensions.get('event_bus_fork_hook'):
+        os.register_at_fork(after_in_child=_restart_listener)
+        app.extensions['event_bus_fork_hook'] = True
+
+
+# --- CAPTURA DOS EVENTOS NA SESSÃO ---
+
+def _iso(dt):
+    return dt.isoformat() if dt else None
+
+
+def _old_value(state, campo):
+    history = state.attrs[campo].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(state.object, campo)
+
+
+def _slot(resource_id, service_id, start, end):
+    return [resource_id, service_id, _iso(start), _iso(end)]
+
+
+def _current_slot(obj):
+    return _slot(obj.resource_id, obj.service_id, obj.start_datetime, obj.end_datetime)
+
+
+@event.listens_for(db.session, 'after_flush')
+def _collect_events(session, flush_context):
+    pending = session.info.setdefault('appointment_events', [])
+
+    for obj in session.new:
+        if isinstance(obj, Appointment):
+            pending.append(AppointmentEvent('created', obj.id, obj.status, None, [_current_slot(obj)]))
+
+    for obj in session.deleted:
+        if isinstance(obj, Appointment):
+            pending.append(AppointmentEvent('deleted', obj.id, None, obj.status, [_current_slot(obj)]))
+
+    for obj in session.dirty:
+        if not isinstance(obj, Appointment):
+            continue
+        state = inspect(obj)
+        if not any(state.attrs[campo].history.has_changes() for campo in CAMPOS_EVENTO):
+            continue
+        anterior = _old_value(state, 'status')
+        slots = [_current_slot(obj)]
+        antigo = _slot(*(_old_value(state, c) for c in ('resource_id', 'service_id', 'start_datetime', 'end_datetime')))
+        if antigo != slots[0]:
+            slots.append(antigo)
+        kind = 'status_changed' if anterior != obj.status else 'rescheduled'
+        pending.append(AppointmentEvent(kind, obj.id, obj.status, anterior, slots))
+
+    if bus.backend.transactional:
+        novos = pending[session.info.get('appointment_events_notified', 0):]
+        for evt in novos:
+            bus.backend.notify(session.connection(), evt)
+        session.info['appointment_events_notified'] = len(pending)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _publish_events(session):
+    notificados = session.info.pop('appointment_events_notified', 0)
+    for i, evt in enumerate(session.info.pop('appointment_events', ())):
+        if i < notificados:
+            # Já foi aos outros workers pelo NOTIFY da transação; falta a entrega local
+            bus.dispatch(evt)
+        else:
+            bus.publish(evt)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_events(session):
+    session.info.pop('appointment_events', None)
+    session.info.pop('appointment_events_notified', None)
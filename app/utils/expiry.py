@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------
+# Smart Agenda (Agendai Pro)
+# Copyright (c) 2026 Eralice de Moraes Baía. Todos os direitos reservados.
+# 
+# Este código é PROPRIETÁRIO e CONFIDENCIAL. A reprodução, 
+# distribuição ou modificação não autorizada é estritamente proibida.
+# Desenvolvido para fins acadêmicos - Curso de Engenharia de Software UNINTER.
+# Acadêmica: Eralice de Moraes Baía | RU: 4144099
+# --------------------------------------------------------------------------
+import logging
+import threading
+from app.extensions import db
+from app.models import Appointment
+
+logger = logging.getLogger(__name__)
+
+
+def _begin_write():
+    """
+    SQLite não tem FOR UPDATE: BEGIN IMMEDIATE pega o lock de escrita antes do
+    SELECT, então nenhum pagamento é gravado entre a leitura e o UPDATE do lote.
+    """
+    conn = db.session.connection()
+    if conn.dialect.name == 'sqlite' and not conn.connection.dbapi_connection.in_transaction:
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def expire_pending_holds(batch_size=None, now=None):
+    """
+    Cancela reservas 'pending' cujo prazo de pagamento venceu.
+
+    SÊNIOR: processa em lotes pequenos, dos mais antigos para os mais novos,
+    com um commit por lote. Assim o sweeper nunca segura locks da tabela inteira
+    e não disputa escrita com as requisições de agendamento.
+    """
+    from flask import current_app
+    batch_size = batch_size or current_app.config.get('EXPIRY_BATCH_SIZE', 100)
+    cutoff = Appointment.hold_cutoff(now)
+    total = 0
+
+    while True:
+        _begin_write()
+        # Linhas travadas (FOR UPDATE): um pagamento em andamento (confirm_hold) segura
+        # a linha e o sweeper pula ela (SKIP LOCKED) em vez de sobrescrevê-la depois
+        lote = Appointment.query.filter(
+            Appointment.status == 'pending',
+            Appointment.created_at <= cutoff
+        ).order_by(Appointment.created_at.asc(), Appointment.id.asc()) \
+         .limit(batch_size).with_for_update(skip_locked=True).populate_existing().all()
+
+        if not lote:
+            db.session.commit()
+            break
+
+        # Alteração via ORM para que os eventos da sessão (cache, rollup, barramento) sejam disparados
+        for appt in lote:
+            appt.status = 'cancelled'
+        db.session.commit()
+        total += len(lote)
+
+        if len(lote) < batch_size:
+            break
+
+    return total
+
+
+def run_expiry_loop(app, interval, stop_event, batch_size=None):
+    """
+    Laço do sweeper (thread opcional e comando flask expire-holds --loop).
+    Erros transitórios do banco são logados e a varredura segue no próximo ciclo.
+    """
+    while not stop_event.is_set():
+        with app.app_context():
+            try:
+                expiradas = expire_pending_holds(batch_size=batch_size)
+                if expiradas:
+                    logger.info(f"Sweeper: {expiradas} reserva(s) pendente(s) expirada(s).")
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Erro no sweeper de reservas: {str(e)}")
+            finally:
+                db.session.remove()
+        stop_event.wait(interval)
+
+
+def start_expiry_thread(app):
+    """
+    Thread opcional dentro do próprio processo (EXPIRY_THREAD_ENABLED=true).
+    Em produção o recomendado é o comando dedicado: flask expire-holds --loop
+    """
+    stop_event = threading.Event()
+    interval = app.config.get('EXPIRY_SWEEP_INTERVAL_SECONDS', 60)
+    thread = threading.Thread(
+        target=run_expiry_loop, args=(app, interval, stop_event),
+        name='expiry-sweeper', daemon=True
+    )
+    thread.start()
+    app.extensions['expiry_sweeper'] = (thread, stop_event)
+    return thread
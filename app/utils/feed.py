@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------
+# Smart Agenda (Agendai Pro)
+# Copyright (c) 2026 Eralice de Moraes Baía. Todos os direitos reservados.
+#
+# Este código é PROPRIETÁRIO e CONFIDENCIAL. A reprodução,
+# distribuição ou modificação não autorizada é estritamente proibida.
+# Desenvolvido para fins acadêmicos - Curso de Engenharia de Software UNINTER.
+# Acadêmica: Eralice de Moraes Baía | RU: 4144099
+# --------------------------------------------------------------------------
+"""
+Feed de agendamentos paginado por cursor (keyset) em (start_datetime, id), do mais
+recente para o mais antigo. Cada página é um range scan no índice a partir do último
+item visto: o custo não cresce com o número de páginas nem com o tamanho da tabela
+(ao contrário de OFFSET, que precisa percorrer e descartar as linhas anteriores).
+"""
+import base64
+from datetime import datetime
+from flask import current_app
+from sqlalchemy.orm import joinedload
+from app.extensions import db
+from app.models import Appointment
+from app.utils.clock import day_bounds
+
+FILTROS_INTEIROS = ('service_id', 'resource_id', 'user_id')
+
+
+def encode_cursor(appt):
+    raw = f"{appt.start_datetime.isoformat()}|{appt.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Retorna (start_datetime, id). ValueError para cursores inválidos."""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+        start, appt_id = raw.split('|')
+        return datetime.fromisoformat(start), int(appt_id)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError('Cursor inválido.') from exc
+
+
+def parse_feed_filters(args):
+    """Lê os filtros da query string. ValueError com mensagem amigável se algo for inválido."""
+    filtros = {}
+    status = (args.get('status') or '').strip()
+    if status:
+        filtros['status'] = status
+
+    for campo in FILTROS_INTEIROS:
+        valor = (args.get(campo) or '').strip()
+        if valor:
+            if not valor.isdigit():
+                raise ValueError(f'Filtro {campo} inválido.')
+            filtros[campo] = int(valor)
+
+    for campo in ('inicio', 'fim'):
+        valor = (args.get(campo) or '').strip()
+        if valor:
+            try:
+                filtros[campo] = datetime.strptime(valor, '%Y-%m-%d').date()
+            except ValueError:
+                raise ValueError('Use datas no formato AAAA-MM-DD.')
+    return filtros
+
+
+def page_size(requested=None):
+    maximo = current_app.config.get('FEED_MAX_PAGE_SIZE', 100)
+    padrao = current_app.config.get('FEED_PAGE_SIZE', 25)
+    try:
+        size = int(requested) if requested else padrao
+    except (TypeError, ValueError):
+        size = padrao
+    return max(1, min(size, maximo))
+
+
+def feed_query(filtros):
+    query = Appointment.query
+    if 'status' in filtros:
+        query = query.filter(Appointment.status == filtros['status'])
+    for campo in FILTROS_INTEIROS:
+        if campo in filtros:
+            query = query.filter(getattr(Appointment, campo) == filtros[campo])
+    if 'inicio' in filtros:
+        query = query.filter(Appointment.start_datetime >= day_bounds(filtros['inicio'])[0])
+    if 'fim' in filtros:
+        # Data final inclusiva: até o início do dia seguinte
+        query = query.filter(Appointment.start_datetime < day_bounds(filtros['fim'])[1])
+    return query
+
+
+def feed_page(filtros, cursor=None, limit=None):
+    """
+    Uma página do feed: (itens, próximo_cursor). próximo_cursor é None na última página.
+    Busca limit + 1 linhas só para saber se existe página seguinte, sem COUNT.
+    """
+    limit = page_size(limit)
+    query = feed_query(filtros)
+    if cursor:
+        start, appt_id = decode_cursor(cursor)
+        query = query.filter(db.or_(
+            Appointment.start_datetime < start,
+            db.and_(Appointment.start_datetime == start, Appointment.id < appt_id)
+        ))
+
+    rows = query.options(
+        joinedload(Appointment.user),
+        joinedload(Appointment.service)
+    ).order_by(Appointment.start_datetime.desc(), Appointment.id.desc()).limit(limit + 1).all()
+
+    items = rows[:limit]
+    next_cursor = encode_cursor(items[-1]) if len(rows) > limit else None
+    return items, next_cursor
+
+
+def serialize(appt):
+    return {
+        'id': appt.id,
+        'cliente': (appt.user.name if appt.user else None) or 'Removido',
+        'servico': appt.service.name if appt.service else None,
+        'status': appt.status,
+        'status_label': appt.get_display_status(),
+        'inicio': appt.start_datetime.isoformat(),
+        'inicio_fmt': appt.start_datetime.strftime('%d/%m/%Y • %H:%M'),
+    }
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------
+# Smart Agenda (Agendai Pro)
+# Copyright (c) 2026 Eralice de Moraes Baía. Todos os direitos reservados.
+#
+# Este código é PROPRIETÁRIO e CONFIDENCIAL. A reprodução,
+# distribuição ou modificação não autorizada é estritamente proibida.
+# Desenvolvido para fins acadêmicos - Curso de Engenharia de Software UNINTER.
+# Acadêmica: Eralice de Moraes Baía | RU: 4144099
+# --------------------------------------------------------------------------
+"""
+Cache HTTP: validadores nas páginas públicas e assets com impressão digital.
+
+Páginas (decorator `conditional_page`): ETag forte derivado da versão do catálogo
+(contador 'catalog', ver page_cache) + rota + parâmetros + usuário, e Last-Modified
+do último incremento do contador. Um If-None-Match/If-Modified-Since válido
+responde 304 ANTES de consultar o catálogo ou renderizar o template.
+
+Assets (`static_url` nos templates): 'assets/img/services/odonto.png' vira
+'assets/img/services/odonto.<hash12>.png'. A URL muda quando o conteúdo muda, então
+ela pode ser guardada pelo navegador/CDN por um ano com `immutable`; o arquivo
+original continua servido normalmente (sem impressão digital, cache curto).
+"""
+import hashlib
+import os
+import re
+import threading
+from datetime import timezone
+from functools import wraps
+from flask import current_app, make_response, request, session, url_for
+from flask_login import current_user
+from werkzeug.security import safe_join
+from app.utils.compression import send_static
+from app.utils.counters import read_counter_state
+from app.utils.page_cache import CATALOG_COUNTER
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+FINGERPRINT_RE = re.compile(r'^(?P<base>.+)\.(?P<hash>[0-9a-f]{12})(?P<ext>\.[A-Za-z0-9]+)$')
+
+
+# --- PÁGINAS: ETAG / LAST-MODIFIED / 304 ---
+
+def _page_validators(kwargs, query_args):
+    versao, atualizado_em = read_counter_state(CATALOG_COUNTER)
+    usuario = current_user.get_id() if current_user.is_authenticated else 'anon'
+    chave = '|'.join([
+        request.endpoint or '', repr(sorted(kwargs.items())),
+        repr([request.args.get(arg, '') for arg in query_args]), str(versao), usuario,
+    ])
+    return hashlib.sha1(chave.encode('utf-8')).hexdigest(), atualizado_em
+
+
+def _not_modified(etag, atualizado_em):
+    if request.if_none_match:
+        # If-None-Match tem precedência sobre If-Modified-Since e usa comparação fraca
+        # (RFC 9110): o ETag vira W/ quando a resposta sai comprimida
+        return request.if_none_match.contains_weak(etag)
+    if not (atualizado_em and request.if_modified_since):
+        return False
+    # HTTP-date tem resolução de segundos
+    return request.if_modified_since >= atualizado_em.replace(microsecond=0, tzinfo=timezone.utc)
+
+
+def _set_validators(response, etag, atualizado_em):
+    response.set_etag(etag)
+    if atualizado_em:
+        response.last_modified = atualizado_em
+    # Logado: a página tem menu/ações do usuário e não pode ir para cache compartilhado
+    response.headers['Cache-Control'] = 'private, no-cache' if current_user.is_authenticated \
+        else 'public, max-age=0, must-revalidate'
+    response.vary.add('Cookie')
+    return response
+
+
+def conditional_page(*query_args):
+    """ETag/Last-Modified pela versão do catálogo; 304 sem executar a view."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            # Mensagens flash pendentes precisam ser renderizadas (e consumidas)
+            if request.method != 'GET' or '_flashes' in session:
+                return view(*args, **kwargs)
+
+            etag, atualizado_em = _page_validators(kwargs, query_args)
+            if _not_modified(etag, atualizado_em):
+                return _set_validators(make_response('', 304), etag, atualizado_em)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                _set_validators(response, etag, atualizado_em)
+            return response
+        return wrapper
+    return decorator
+
+
+# --- ASSETS: IMPRESSÃO DIGITAL E CACHE IMUTÁVEL ---
+
+class _Fingerprints:
+    """Hash do conteúdo por arquivo, recalculado só quando o mtime/tamanho muda."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hashes = {}
+
+    def get(self, path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        assinatura = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._hashes.get(path)
+        if cached and cached[0] == assinatura:
+            return cached[1]
+
+        digest = hashlib.md5(usedforsecurity=False)
+        with open(path, 'rb') as f:
+            for bloco in iter(lambda: f.read(1 << 16), b''):
+                digest.update(bloco)
+        valor = digest.hexdigest()[:12]
+        with self._lock:
+            self._hashes[path] = (assinatura, valor)
+        return valor
+
+
+fingerprints = _Fingerprints()
+
+
+def static_url(filename):
+    """url_for('static') com o hash do conteúdo no nome do arquivo."""
+    if current_app.config.get('STATIC_FINGERPRINT_ENABLED', True):
+        path = safe_join(current_app.static_folder, filename)
+        valor = fingerprints.get(path) if path else None
+        if valor:
+            base, ext = os.path.splitext(filename)
+            filename = f"{base}.{valor}{ext}"
+    return url_for('static', filename=filename)
+
+
+def _immutable(folder, filename):
+    response = send_static(folder, filename, max_age=IMMUTABLE_MAX_AGE)
+    response.headers['Cache-Control'] = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    return response
+
+
+def serve_static(filename):
+    """
+    Substitui a view 'static' do Flask: nomes com impressão digital válida recebem
+    cache de um ano + immutable; os demais seguem o comportamento padrão. Em todos
+    os casos o irmão pré-comprimido (.br/.gz) é preferido quando existe.
+    """
+    folder = current_app.static_folder
+    match = FINGERPRINT_RE.match(filename)
+    if match and os.path.isfile(safe_join(folder, filename) or ''):
+        # Nome já gerado com hash no build (ex.: derivados WebP de `flask images build`)
+        return _immutable(folder, filename)
+    if match:
+        original = match.group('base') + match.group('ext')
+        path = safe_join(folder, original)
+        if path and os.path.isfile(path):
+            if fingerprints.get(path) == match.group('hash'):
+                return _immutable(folder, original)
+            # Hash antigo (deploy novo): entrega o conteúdo atual, sem cache longo
+            return send_static(folder, original, max_age=0)
+    return send_static(folder, filename, max_age=current_app.get_send_file_max_age(filename))
+
+
+def init_http_cache(app):
+    app.add_template_global(static_url)
+    if app.has_static_folder:
+        app.view_functions['static'] = serve_static
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------
+# Smart Agenda (Agendai Pro)
+# Copyright (c) 2026 Eralice de Moraes Baía. Todos os direitos reservados.
+#
+# Este código é PROPRIETÁRIO e CONFIDENCIAL. A reprodução,
+# distribuição ou modificação não autorizada é estritamente proibida.
+# Desenvolvido para fins acadêmicos - Curso de Engenharia de Software UNINTER.
+# Acadêmica: Eralice de Moraes Baía | RU: 4144099
+# --------------------------------------------------------------------------
+"""
+Derivados responsivos das fotos de serviços/profissionais (`flask images build`).
+
+Cada imagem de IMAGE_SOURCE_DIRS vira variantes WebP em IMAGE_WIDTHS (sem ampliar
+além do original), gravadas em IMAGE_OUTPUT_DIR com o hash do conteúdo no nome
+(ex.: derived/services/cardio-640.3f2a9c1b7d0e.webp). Como o nome muda junto com o
+conteúdo, o static as serve com cache imutável (ver http_cache).
+
+O manifest.json guarda, por origem, o hash do arquivo e os parâmetros usados: só o
+que mudou é reprocessado, em paralelo num ProcessPoolExecutor (um processo por
+núcleo). Os templates leem o manifesto via `image_srcset`.
+
+Requer Pillow (só no build; o site funciona sem ele, servindo os originais).
+"""
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from flask import current_app, url_for
+
+EXTENSOES = ('.png', '.jpg', '.jpeg', '.webp')
+MANIFEST_NAME = 'manifest.json'
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for bloco in iter(lambda: f.read(1 << 16), b''):
+            digest.update(bloco)
+    return digest.hexdigest()
+
+
+def _process_source(job):
+    """
+    Executado no pool de processos: gera as variantes de UMA imagem.
+    Retorna (origem, entrada_do_manifesto). Import tardio: o Pillow só é exigido aqui.
+    """
+    from PIL import Image
+
+    origem, source_path, output_dir, rel_output_dir, widths, quality, source_hash = job
+    base = os.path.splitext(os.path.basename(origem))[0]
+    variantes = []
+    with Image.open(source_path) as img:
+        img.load()
+        largura_original, altura_original = img.size
+        if img.mode not in ('RGB', 'RGBA'):
+            img = img.convert('RGBA' if 'transparency' in img.info else 'RGB')
+
+        alvos = sorted({w for w in widths if w < largura_original} | {min(max(widths), largura_original)})
+        os.makedirs(output_dir, exist_ok=True)
+        for largura in alvos:
+            altura = max(1, round(altura_original * largura / largura_original))
+            copia = img.resize((largura, altura), Image.LANCZOS) if largura != largura_original else img
+            tmp = os.path.join(output_dir, f".{base}-{largura}.{os.getpid()}.tmp")
+            copia.save(tmp, 'WEBP', quality=quality, method=6)
+            conteudo = _sha256(tmp)[:12]
+            nome = f"{base}-{largura}.{conteudo}.webp"
+            os.replace(tmp, os.path.join(output_dir, nome))
+            variantes.append({'width': largura, 'file': f"{rel_output_dir}/{nome}"})
+
+    return origem, {
+        'source_hash': source_hash,
+        'widths': list(widths),
+        'quality': quality,
+        'width': largura_original,
+        'height': altura_original,
+        'variants': variantes,
+    }
+
+
+def _load_manifest(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def build_images(app, force=False, workers=None, log=print):
+    """
+    Gera/atualiza os derivados. Retorna (processadas, inalteradas, removidas).
+    """
+    static = app.static_folder
+    widths = tuple(sorted(app.config.get('IMAGE_WIDTHS', (320, 640, 960, 1280))))
+    quality = app.config.get('IMAGE_WEBP_QUALITY', 80)
+    rel_output = app.config.get('IMAGE_OUTPUT_DIR', 'assets/img/derived').strip('/')
+    output_root = os.path.join(static, rel_output)
+    manifest_path = os.path.join(output_root, MANIFEST_NAME)
+    manifest = {} if force else _load_manifest(manifest_path)
+
+    origens = {}
+    for rel_dir in app.config.get('IMAGE_SOURCE_DIRS', ('assets/img/services',)):
+        pasta = os.path.join(static, rel_dir)
+        if not os.path.isdir(pasta):
+            continue
+        for nome in sorted(os.listdir(pasta)):
+            if nome.lower().endswith(EXTENSOES):
+                origens[f"{rel_dir.strip('/')}/{nome}"] = os.path.join(pasta, nome)
+
+    jobs, inalteradas = [], 0
+    for origem, source_path in origens.items():
+        source_hash = _sha256(source_path)
+        atual = manifest.get(origem)
+        if atual and atual.get('source_hash') == source_hash and tuple(atual.get('widths', ())) == widths \
+                and atual.get('quality') == quality \
+                and all(os.path.isfile(os.path.join(static, v['file'])) for v in atual.get('variants', ())):
+            inalteradas += 1
+            continue
+        subpasta = os.path.basename(os.path.dirname(origem))
+        jobs.append((origem, source_path, os.path.join(output_root, subpasta), f"{rel_output}/{subpasta}",
+                     widths, quality, source_hash))
+
+    novo = {origem: entrada for origem, entrada in manifest.items() if origem in origens}
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            for origem, entrada in pool.map(_process_source, jobs):
+                novo[origem] = entrada
+                log(f"  {origem}: {', '.join(str(v['width']) for v in entrada['variants'])}px")
+
+    # Variantes que não estão mais no manifesto (origem alterada ou apagada)
+    em_uso = {v['file'] for entrada in novo.values() for v in entrada['variants']}
+    removidas = 0
+    if os.path.isdir(output_root):
+        for raiz, _dirs, arquivos in os.walk(output_root):
+            for nome in arquivos:
+                if not nome.endswith('.webp'):
+                    continue
+                rel = os.path.relpath(os.path.join(raiz, nome), static).replace(os.sep, '/')
+                if rel not in em_uso:
+                    os.remove(os.path.join(raiz, nome))
+                    removidas += 1
+
+    os.makedirs(output_root, exist_ok=True)
+    tmp = manifest_path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(novo, f, indent=2, sort_keys=True)
+    os.replace(tmp, manifest_path)
+    images_manifest.invalidate()
+    return len(jobs), inalteradas, removidas
+
+
+class _ManifestCache:
+    """Manifesto lido do disco e recarregado quando o mtime muda (novo build)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._path = None
+        self._mtime = None
+        self._data = {}
+
+    def invalidate(self):
+        with self._lock:
+            self._mtime = None
+
+    def get(self):
+        path = os.path.join(current_app.static_folder,
+                            current_app.config.get('IMAGE_OUTPUT_DIR', 'assets/img/derived').strip('/'),
+                            MANIFEST_NAME)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return {}
+        with self._lock:
+            if path != self._path or mtime != self._mtime:
+                self._data = _load_manifest(path)
+                self._path, self._mtime = path, mtime
+            return self._data
+
+
+images_manifest = _ManifestCache()
+
+
+def image_srcset(filename):
+    """'url 320w, url 640w, ...' das variantes WebP; vazio se a imagem não foi processada."""
+    entrada = images_manifest.get().get(filename)
+    if not entrada:
+        return ''
+    return ', '.join(f"{url_for('static', filename=v['file'])} {v['width']}w" for v in entrada['variants'])
+
+
+def init_images(app):
+    app.add_template_global(image_srcset)
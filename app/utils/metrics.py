@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------
+# Smart Agenda (Agendai Pro)
+# Copyright (c) 2026 Eralice de Moraes Baía. Todos os direitos reservados.
+#
+# Este código é PROPRIETÁRIO e CONFIDENCIAL. A reprodução,
+# distribuição ou modificação não autorizada é estritamente proibida.
+# Desenvolvido para fins acadêmicos - Curso de Engenharia de Software UNINTER.
+# Acadêmica: Eralice de Moraes Baía | RU: 4144099
+# --------------------------------------------------------------------------
+"""
+Instrumentação por requisição: tempo total, nº de consultas SQL, tempo de SQL e
+tempo de renderização de templates.
+
+  * SQL: eventos before/after_cursor_execute do SQLAlchemy (todas as engines);
+  * templates: sinais before_render_template/template_rendered do Flask;
+  * resposta: header Server-Timing (app, db, tpl), visível no DevTools;
+  * agregação: histogramas por endpoint, expostos em texto Prometheus no
+    endpoint admin /admin/metrics.
+
+Os histogramas são por processo (cada worker do gunicorn tem os seus); um
+scrape mostra o worker que atendeu. Consultas feitas fora de requisição
+(threads de background, CLI) não entram nas contas.
+"""
+import bisect
+import threading
+import time
+from flask import before_render_template, g, has_request_context, request, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class Histogram:
+    """Histograma cumulativo no formato Prometheus, com rótulos."""
+
+    def __init__(self, name, help_text, buckets, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._series = {}  # rótulos -> [contagens por bucket..., +Inf], soma
+
+    def observe(self, value, *labels):
+        # bisect_left: valor igual ao limite conta no próprio bucket (le = "menor ou igual")
+        indice = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            serie = self._series.get(labels)
+            if serie is None:
+                serie = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            serie[0][indice] += 1
+            serie[1] += value
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def snapshot(self, *labels):
+        """(contagem, soma) de uma série; usado nos testes e no diagnóstico."""
+        with self._lock:
+            serie = self._series.get(labels)
+            return (sum(serie[0]), serie[1]) if serie else (0, 0.0)
+
+    def expose(self):
+        linhas = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((labels, (list(c), s)) for labels, (c, s) in self._series.items())
+        for labels, (contagens, soma) in series:
+            rotulos = ','.join(f'{n}="{_escape(v)}"' for n, v in zip(self.label_names, labels))
+            acumulado = 0
+            for limite, contagem in zip(self.buckets + (float('inf'),), contagens):
+                acumulado += contagem
+                le = '+Inf' if limite == float('inf') else f'{limite:g}'
+                linhas.append(f'{self.name}_bucket{{{rotulos},le="{le}"}} {acumulado}')
+            linhas.append(f'{self.name}_sum{{{rotulos}}} {soma:.6f}')
+            linhas.append(f'{self.name}_count{{{rotulos}}} {acumulado}')
+        return linhas
+
+
+def _escape(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+LABELS = ('endpoint', 'method')
+request_duration = Histogram('agendai_request_duration_seconds', 'Tempo total da requisição.',
+                             DURATION_BUCKETS, LABELS)
+sql_duration = Histogram('agendai_request_sql_duration_seconds', 'Tempo gasto em SQL por requisição.',
+                         DURATION_BUCKETS, LABELS)
+sql_queries = Histogram('agendai_request_sql_queries', 'Consultas SQL por requisição.',
+                        QUERY_COUNT_BUCKETS, LABELS)
+template_duration = Histogram('agendai_request_template_duration_seconds',
+                              'Tempo de renderização de templates por requisição.', DURATION_BUCKETS, LABELS)
+HISTOGRAMS = (request_duration, sql_duration, sql_queries, template_duration)
+
+_responses_lock = threading.Lock()
+_responses = {}  # (endpoint, method, status) -> total
+
+
+def _metrics():
+    # Só dentro de uma requisição instrumentada (threads com app_context ficam de fora)
+    if has_request_context():
+        return g.get('_metrics')
+    return None
+
+
+# --- SQL ---
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _metrics() is not None:
+        conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    dados = _metrics()
+    inicios = conn.info.get('metrics_query_start')
+    if dados is None or not inicios:
+        return
+    dados['sql_time'] += time.perf_counter() - inicios.pop()
+    dados['sql_count'] += 1
+
+
+# --- TEMPLATES ---
+
+def _before_render(sender, template, context, **extra):
+    dados = _metrics()
+    if dados is not None:
+        dados['tpl_stack'].append(time.perf_counter())
+
+
+def _rendered(sender, template, context, **extra):
+    dados = _metrics()
+    if dados is not None and dados['tpl_stack']:
+        inicio = dados['tpl_stack'].pop()
+        # Renderização aninhada já está contida na externa
+        if not dados['tpl_stack']:
+            dados['tpl_time'] += time.perf_counter() - inicio
+
+
+# --- REQUISIÇÃO ---
+
+def _start_request():
+    g._metrics = {'start': time.perf_counter(), 'sql_time': 0.0, 'sql_count': 0,
+                  'tpl_time': 0.0, 'tpl_stack': []}
+
+
+def _finish_request(response):
+    dados = g.pop('_metrics', None)
+    if dados is None:
+        return response
+    total = time.perf_counter() - dados['start']
+    labels = (request.endpoint or 'unmatched', request.method)
+
+    request_duration.observe(total, *labels)
+    sql_duration.observe(dados['sql_time'], *labels)
+    sql_queries.observe(dados['sql_count'], *labels)
+    template_duration.observe(dados['tpl_time'], *labels)
+    with _responses_lock:
+        chave = labels + (str(response.status_code),)
+        _responses[chave] = _responses.get(chave, 0) + 1
+
+    response.headers.add('Server-Timing', f'app;dur={total * 1000:.1f}')
+    response.headers.add('Server-Timing',
+                         f'db;dur={dados["sql_time"] * 1000:.1f};desc="{dados["sql_count"]} queries"')
+    response.headers.add('Server-Timing', f'tpl;dur={dados["tpl_time"] * 1000:.1f}')
+    return response
+
+
+def render_prometheus():
+    """Todas as métricas no formato texto do Prometheus (version 0.0.4)."""
+    linhas = ['# HELP agendai_requests_total Respostas por endpoint, método e status.',
+              '# TYPE agendai_requests_total counter']
+    with _responses_lock:
+        totais = sorted(_responses.items())
+    for (endpoint, method, status), total in totais:
+        linhas.append(f'agendai_requests_total{{endpoint="{_escape(endpoint)}",method="{method}",'
+                      f'status="{status}"}} {total}')
+    for histogram in HISTOGRAMS:
+        linhas.extend(histogram.expose())
+    return '\n'.join(linhas) + '\n'
+
+
+def reset_metrics():
+    for histogram in HISTOGRAMS:
+        histogram.clear()
+    with _responses_lock:
+        _responses.clear()
+
+
+def init_metrics(app):
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+    app.before_request(_start_request)
+    # Registrado por último: roda antes dos outros after_request (ex.: compressão)
+    app.after_request(_finish_request)
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_rendered, app)
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------
+# Smart Agenda (Agendai Pro)
+# Copyright (c) 2026 Eralice de Moraes Baía. Todos os direitos reservados.
+#
+# Este código é PROPRIETÁRIO e CONFIDENCIAL. A reprodução,
+# distribuição ou modificação não autorizada é estritamente proibida.
+# Desenvolvido para fins acadêmicos - Curso de Engenharia de Software UNINTER.
+# Acadêmica: Eralice de Moraes Baía | RU: 4144099
+# --------------------------------------------------------------------------
+"""
+Cache das páginas públicas do catálogo (home, serviços, categoria, especialistas).
+
+O catálogo só muda quando o admin salva um Service ou Resource. Todo flush que
+toca nesses modelos incrementa o contador 'catalog' (tabela counters) na mesma
+transação; esse número entra na chave de cada entrada. Como o contador mora no
+banco, todos os workers do gunicorn enxergam a nova versão no próximo request e
+as entradas antigas simplesmente deixam de ser usadas (e saem pelo LRU).
+
+Dois níveis:
+  * resultados de consulta (ex.: categorias ativas), para qualquer visitante;
+  * HTML renderizado da página, só para visitantes anônimos sem mensagens flash
+    (o menu e os botões de admin dependem do usuário logado).
+"""
+import threading
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, request, session
+from flask_login import current_user
+from sqlalchemy import event
+from app.extensions import db
+from app.models import Service, Resource
+from app.utils.counters import bump_counter, read_counter
+
+CATALOG_COUNTER = 'catalog'
+CATALOG_MODELS = (Service, Resource)
+
+
+def catalog_version():
+    """Versão atual do catálogo (consulta por chave primária na tabela counters)."""
+    return read_counter(CATALOG_COUNTER)
+
+
+@event.listens_for(db.session, 'after_flush')
+def _bump_catalog_version(session, flush_context):
+    def mudou(obj):
+        if not isinstance(obj, CATALOG_MODELS):
+            return False
+        return obj in session.new or obj in session.deleted or \
+            session.is_modified(obj, include_collections=False)
+
+    if any(mudou(obj) for obj in list(session.new) + list(session.dirty) + list(session.deleted)):
+        bump_counter(CATALOG_COUNTER, session.connection())
+
+
+class FragmentCache:
+    """LRU por processo; a versão do catálogo faz parte de toda chave."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            valor = self._entries.get(key)
+            if valor is not None:
+                self._entries.move_to_end(key)
+            return valor
+
+    def put(self, key, valor):
+        with self._lock:
+            self._entries[key] = valor
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self, max_entries=None):
+        with self._lock:
+            self._entries.clear()
+            if max_entries is not None:
+                self.max_entries = max_entries
+
+
+page_cache = FragmentCache()
+
+
+def init_page_cache(app):
+    page_cache.clear(app.config.get('PAGE_CACHE_MAX_ENTRIES', 256))
+
+
+def cached_query(nome, loader, *params):
+    """Resultado de consulta (valores simples, nunca objetos do ORM) por versão do catálogo."""
+    key = ('query', nome, params, catalog_version())
+    valor = page_cache.get(key)
+    if valor is None:
+        valor = loader()
+        page_cache.put(key, valor)
+    return valor
+
+
+def _cacheable():
+    if not current_app.config.get('PAGE_CACHE_ENABLED', True) or request.method != 'GET':
+        return False
+    return not current_user.is_authenticated and '_flashes' not in session
+
+
+def cached_page(*query_args):
+    """
+    Guarda o HTML da view para visitantes anônimos. A chave é (endpoint, argumentos
+    da rota, os parâmetros `query_args` da URL, versão do catálogo).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not _cacheable():
+                return view(*args, **kwargs)
+
+            key = ('page', request.endpoint, tuple(sorted(kwargs.items())),
+                   tuple(request.args.get(arg, '') for arg in query_args), catalog_version())
+            html = page_cache.get(key)
+            if html is None:
+                html = view(*args, **kwargs)
+                if not isinstance(html, str):
+                    return html
+                page_cache.put(key, html)
+            return html
+        return wrapper
+    return decorator
+
+
+def active_categories():
+    """Categorias com serviço ativo, em ordem alfabética."""
+    def carregar():
+        rows = db.session.query(Service.category).filter(Service.active == True).distinct().all()
+        return sorted(c[0] for c in rows)
+    return cached_query('active_categories', carregar)
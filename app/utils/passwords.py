@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------
+# Smart Agenda (Agendai Pro)
+# Copyright (c) 2026 Eralice de Moraes Baía. Todos os direitos reservados.
+#
+# Este código é PROPRIETÁRIO e CONFIDENCIAL. A reprodução,
+# distribuição ou modificação não autorizada é estritamente proibida.
+# Desenvolvido para fins acadêmicos - Curso de Engenharia de Software UNINTER.
+# Acadêmica: Eralice de Moraes Baía | RU: 4144099
+# --------------------------------------------------------------------------
+"""
+Política de hash de senhas (Config.PASSWORD_HASH_METHOD) e execução limitada.
+
+O hash (scrypt/pbkdf2) roda num pool pequeno de threads por processo
+(PASSWORD_HASH_WORKERS): uma rajada de logins fica na fila do pool em vez de ocupar
+todos os núcleos, e as demais threads do worker continuam atendendo. hashlib libera
+o GIL durante o cálculo, então o pool paraleliza de verdade até o limite configurado.
+
+Hashes gravados com parâmetros antigos são refeitos no próximo login bem-sucedido
+(User.check_password), sem exigir troca de senha.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+
+DEFAULT_METHOD = 'scrypt:32768:8:1'
+
+_pool = None
+_pool_lock = threading.Lock()
+_prefixes = {}
+
+
+def _config(chave, padrao):
+    try:
+        return current_app.config.get(chave, padrao)
+    except RuntimeError:
+        # Fora do app context (scripts/benchmark): usa o padrão
+        return padrao
+
+
+def _executor():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=max(1, _config('PASSWORD_HASH_WORKERS', 2)),
+                                           thread_name_prefix='password-hash')
+    return _pool
+
+
+def _reset_pool():
+    # Threads não sobrevivem ao fork (gunicorn --preload): cada worker cria o seu pool
+    global _pool, _pool_lock
+    _pool = None
+    _pool_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_pool)
+
+
+def configured_method():
+    return _config('PASSWORD_HASH_METHOD', DEFAULT_METHOD) or DEFAULT_METHOD
+
+
+def method_prefix(method):
+    """
+    Prefixo canônico gravado no hash (ex.: 'pbkdf2' vira 'pbkdf2:sha256:1000000').
+    Calculado uma vez por método com um hash descartável.
+    """
+    if method not in _prefixes:
+        _prefixes[method] = generate_password_hash('', method=method).split('$', 1)[0]
+    return _prefixes[method]
+
+
+def hash_password(password, method=None):
+    method = method or configured_method()
+    salt_length = _config('PASSWORD_SALT_LENGTH', 16)
+    return _executor().submit(generate_password_hash, password, method=method,
+                              salt_length=salt_length).result()
+
+
+def verify_password(stored_hash, password):
+    if not stored_hash:
+        return False
+    return _executor().submit(check_password_hash, stored_hash, password).result()
+
+
+def needs_rehash(stored_hash, method=None):
+    """True se o hash gravado não usa o algoritmo/custo da política atual."""
+    if not stored_hash or '$' not in stored_hash:
+        return True
+    return stored_hash.split('$', 1)[0] != method_prefix(method or configured_method())
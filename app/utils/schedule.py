@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------
+# Smart Agenda (Agendai Pro)
+# Copyright (c) 2026 Eralice de Moraes Baía. Todos os direitos reservados.
+# 
+# Este código é PROPRIETÁRIO e CONFIDENCIAL. A reprodução, 
+# distribuição ou modificação não autorizada é estritamente proibida.
+# Desenvolvido para fins acadêmicos - Curso de Engenharia de Software UNINTER.
+# Acadêmica: Eralice de Moraes Baía | RU: 4144099
+# --------------------------------------------------------------------------
+"""
+Compilador de horários de trabalho (StaffProfile.work_hours).
+
+Formato aceito (JSON):
+    {
+        "slot_minutes": 30,
+        "days": {
+            "seg": [["08:00", "12:00"], ["13:00", "18:00"]],
+            "sab": {"start": "08:00", "end": "12:00"},
+            "*":   {"start": "08:00", "end": "18:00", "breaks": [["12:00", "13:00"]]}
+        },
+        "breaks": [["10:00", "10:15"]]
+    }
+
+Dias: seg/ter/qua/qui/sex/sab/dom (ou mon..sun, ou 0..6). A chave "*" vale
+para os dias não listados; "breaks" na raiz vale para todos os dias.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import event
+from app.extensions import db
+from app.models import Resource, StaffProfile
+
+DIAS = {
+    'seg': 0, 'ter': 1, 'qua': 2, 'qui': 3, 'sex': 4, 'sab': 5, 'sáb': 5, 'dom': 6,
+    'mon': 0, 'tue': 1, 'wed': 2, 'thu': 3, 'fri': 4, 'sat': 5, 'sun': 6,
+}
+
+# Mesma grade histórica da página de agendamento: 24h, de hora em hora
+DEFAULT_WORK_HOURS = {'slot_minutes': 60, 'days': {'*': [['00:00', '23:59']]}}
+
+
+def _minutes(hhmm):
+    try:
+        hora, minuto = str(hhmm).split(':')
+        total = int(hora) * 60 + int(minuto)
+    except (ValueError, AttributeError):
+        raise ValueError(f"Horário inválido: {hhmm!r} (use HH:MM).")
+    if not 0 <= total <= 24 * 60:
+        raise ValueError(f"Horário fora do dia: {hhmm!r}.")
+    return total
+
+
+def _ranges(raw):
+    """Aceita [["08:00","12:00"], ...] ou {"start":..,"end":..,"breaks":[..]}."""
+    if isinstance(raw, dict):
+        periods = [(_minutes(raw['start']), _minutes(raw['end']))]
+        return periods, [(_minutes(a), _minutes(b)) for a, b in raw.get('breaks', [])]
+    return [(_minutes(a), _minutes(b)) for a, b in raw], []
+
+
+def _merge(periods):
+    """Ordena e funde períodos sobrepostos/encostados (evita slots duplicados ou fora de ordem)."""
+    merged = []
+    for start, end in sorted(periods):
+        if end <= start:
+            raise ValueError(f"Período com fim antes do início: {start // 60:02d}:{start % 60:02d}.")
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _subtract(periods, breaks):
+    """Remove as pausas dos períodos de trabalho (tudo em minutos desde 00:00)."""
+    result = []
+    for start, end in _merge(periods):
+        pedacos = [(start, end)]
+        for b_start, b_end in breaks:
+            novos = []
+            for p_start, p_end in pedacos:
+                if b_end <= p_start or b_start >= p_end:
+                    novos.append((p_start, p_end))
+                    continue
+                if b_start > p_start:
+                    novos.append((p_start, b_start))
+                if b_end < p_end:
+                    novos.append((b_end, p_end))
+            pedacos = novos
+        result.extend(pedacos)
+    return result
+
+
+def parse_work_hours(work_hours):
+    """
+    Valida o JSON e devolve (slot_minutes, janelas por dia da semana).
+    Levanta ValueError com mensagem amigável se o formato estiver errado.
+    """
+    if not isinstance(work_hours, dict) or not isinstance(work_hours.get('days'), dict):
+        raise ValueError('work_hours precisa ter a chave "days".')
+
+    step = int(work_hours.get('slot_minutes') or 60)
+    if step <= 0:
+        raise ValueError('slot_minutes precisa ser positivo.')
+    global_breaks = [(_minutes(a), _minutes(b)) for a, b in work_hours.get('breaks', [])]
+
+    padrao = None
+    por_dia = {}
+    for chave, raw in work_hours['days'].items():
+        chave = str(chave).strip().lower()
+        if chave == '*':
+            padrao = raw
+        elif chave.isdigit() and int(chave) in range(7):
+            por_dia[int(chave)] = raw
+        elif chave in DIAS:
+            por_dia[DIAS[chave]] = raw
+        else:
+            raise ValueError(f"Dia da semana desconhecido: {chave!r}.")
+
+    windows = []
+    for weekday in range(7):
+        raw = por_dia.get(weekday, padrao)
+        if not raw:
+            windows.append(())
+            continue
+        periods, breaks = _ranges(raw)
+        windows.append(tuple(_subtract(periods, breaks + global_breaks)))
+    return step, tuple(windows)
+
+
+def compile_weekly_template(work_hours, duration_minutes):
+    """
+    Template semanal pré-calculado: para cada dia da semana (0=segunda),
+    a tupla de inícios de slot em minutos desde 00:00. Um slot só entra se
+    couber inteiro numa janela de trabalho (não atravessa pausas).
+    """
+    step, windows = parse_work_hours(work_hours)
+    template = []
+    for janelas in windows:
+        starts = []
+        for start, end in janelas:
+            t = start
+            while t + duration_minutes <= end:
+                starts.append(t)
+                t += step
+        template.append(tuple(starts))
+    return tuple(template)
+
+
+# --- CACHE DE TEMPLATES POR RECURSO ---
+
+# chave -> (template, momento da compilação). A invalidação por eventos só alcança
+# o processo que fez o commit; SCHEDULE_CACHE_MAX_AGE limita a defasagem nos demais workers.
+_templates = {}
+_lock = threading.Lock()
+_clock = time.monotonic
+
+
+def _work_hours_for(resource_id):
+    if resource_id:
+        resource = db.session.get(Resource, resource_id)
+        if resource and resource.staff_profile and resource.staff_profile.work_hours:
+            return resource.staff_profile.work_hours
+    return current_app.config.get('DEFAULT_WORK_HOURS') or DEFAULT_WORK_HOURS
+
+
+def weekly_template(service):
+    """Template do recurso do serviço (cacheado por recurso + duração)."""
+    key = (service.resource_id, service.duration_minutes)
+    max_age = current_app.config.get('SCHEDULE_CACHE_MAX_AGE', 60)
+    with _lock:
+        if key in _templates:
+            template, compiled_at = _templates[key]
+            if not max_age or _clock() - compiled_at < max_age:
+                return template
+
+    try:
+        template = compile_weekly_template(_work_hours_for(service.resource_id), service.duration_minutes)
+    except (ValueError, KeyError, TypeError) as e:
+        # JSON inválido não pode derrubar a agenda: volta para o horário padrão
+        current_app.logger.error(f"work_hours inválido no recurso {service.resource_id}: {e}")
+        template = compile_weekly_template(DEFAULT_WORK_HOURS, service.duration_minutes)
+
+    with _lock:
+        _templates[key] = (template, _clock())
+    return template
+
+
+def day_slot_starts(service, day):
+    """Inícios de slot do dia: só aritmética sobre o template, sem strftime/strptime."""
+    meia_noite = datetime.combine(day, datetime.min.time())
+    return [meia_noite + timedelta(minutes=offset) for offset in weekly_template(service)[day.weekday()]]
+
+
+def clear_templates():
+    with _lock:
+        _templates.clear()
+
+
+# Invalidação: qualquer edição em Resource/StaffProfile descarta os templates
+# (são minúsculos e recompilados sob demanda na próxima consulta)
+@event.listens_for(db.session, 'after_flush')
+def _collect_schedule_changes(session, flush_context):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, (Resource, StaffProfile)):
+            session.info['schedule_dirty'] = True
+            return
+
+
+@event.listens_for(db.session, 'after_commit')
+def _apply_schedule_changes(session):
+    if session.info.pop('schedule_dirty', False):
+        clear_templates()
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_schedule_changes(session):
+    session.info.pop('schedule_dirty', None)
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------
+# Smart Agenda (Agendai Pro)
+# Copyright (c) 2026 Eralice de Moraes Baía. Todos os direitos reservados.
+#
+# Este código é PROPRIETÁRIO e CONFIDENCIAL. A reprodução,
+# distribuição ou modificação não autorizada é estritamente proibida.
+# Desenvolvido para fins acadêmicos - Curso de Engenharia de Software UNINTER.
+# Acadêmica: Eralice de Moraes Baía | RU: 4144099
+# --------------------------------------------------------------------------
+"""
+Busca textual no catálogo público de serviços.
+
+O índice cobre name, description, category, content, benefits e indications:
+
+    PostgreSQL -> tabela service_search (tsvector 'portuguese' + índice GIN),
+                  com pesos A (nome), B (categoria), C (textos)
+    SQLite     -> tabela virtual FTS5 service_fts (rowid = service.id), bm25
+
+Os textos são gravados e consultados já sem acento (normalize), então "estetica"
+encontra "Estética" nos dois bancos sem depender da extensão unaccent. O índice é
+atualizado no after_flush da MESMA transação que salva o serviço (manage_service,
+seed, etc.). UPDATE em massa não passa pelo flush: use `flask search-reindex`.
+
+O autocomplete de prefixo roda em memória (lista ordenada + bisect), reconstruída
+quando um serviço muda neste processo ou após SEARCH_AUTOCOMPLETE_TTL_SECONDS.
+"""
+import bisect
+import re
+import threading
+import time
+import unicodedata
+from sqlalchemy import DDL, event, inspect, text
+from app.extensions import db
+from app.models import Service
+
+SEARCH_FIELDS = ('name', 'description', 'category', 'content', 'benefits', 'indications')
+TEXT_FIELDS = ('description', 'content', 'benefits', 'indications')
+MAX_TERMS = 8
+
+# --- ESTRUTURA DO ÍNDICE (create_all/drop_all; em produção vem da migração) ---
+
+PG_CREATE = [
+    "CREATE TABLE IF NOT EXISTS service_search ("
+    "service_id INTEGER PRIMARY KEY REFERENCES service (id) ON DELETE CASCADE, "
+    "document TSVECTOR NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS ix_service_search_document ON service_search USING GIN (document)",
+]
+SQLITE_CREATE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS service_fts USING fts5("
+    "name, category, body, tokenize = 'unicode61 remove_diacritics 2')",
+]
+
+for _sql in PG_CREATE:
+    event.listen(Service.__table__, 'after_create', DDL(_sql).execute_if(dialect='postgresql'))
+for _sql in SQLITE_CREATE:
+    event.listen(Service.__table__, 'after_create', DDL(_sql).execute_if(dialect='sqlite'))
+event.listen(Service.__table__, 'before_drop',
+             DDL("DROP TABLE IF EXISTS service_search").execute_if(dialect='postgresql'))
+event.listen(Service.__table__, 'before_drop',
+             DDL("DROP TABLE IF EXISTS service_fts").execute_if(dialect='sqlite'))
+
+
+def normalize(valor):
+    """Minúsculas e sem acentos ("Estética Facial" -> "estetica facial")."""
+    decomposto = unicodedata.normalize('NFKD', valor or '')
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).lower()
+
+
+def terms(query):
+    return re.findall(r'[^\W_]+', normalize(query))[:MAX_TERMS]
+
+
+def _document(service):
+    return {
+        'id': service.id,
+        'name': normalize(service.name),
+        'category': normalize(service.category),
+        'body': normalize(' '.join(getattr(service, campo) or '' for campo in TEXT_FIELDS)),
+    }
+
+
+# --- SINCRONIZAÇÃO ---
+
+def _write(connection, docs, removidos):
+    dialect = connection.dialect.name
+    if dialect == 'postgresql':
+        if removidos:
+            connection.execute(text("DELETE FROM service_search WHERE service_id = ANY(:ids)"),
+                               {'ids': list(removidos)})
+        if docs:
+            connection.execute(text(
+                "INSERT INTO service_search (service_id, document) VALUES (:id, "
+                "setweight(to_tsvector('portuguese', :name), 'A') || "
+                "setweight(to_tsvector('portuguese', :category), 'B') || "
+                "setweight(to_tsvector('portuguese', :body), 'C')) "
+                "ON CONFLICT (service_id) DO UPDATE SET document = EXCLUDED.document"
+            ), docs)
+    elif dialect == 'sqlite':
+        ids = [{'id': i} for i in removidos | {d['id'] for d in docs}]
+        if ids:
+            connection.execute(text("DELETE FROM service_fts WHERE rowid = :id"), ids)
+        if docs:
+            connection.execute(text(
+                "INSERT INTO service_fts (rowid, name, category, body) VALUES (:id, :name, :category, :body)"
+            ), docs)
+
+
+@event.listens_for(db.session, 'after_flush')
+def _sync_search_index(session, flush_context):
+    docs, removidos = [], set()
+    for obj in session.new:
+        if isinstance(obj, Service):
+            docs.append(_document(obj))
+    for obj in session.dirty:
+        if isinstance(obj, Service):
+            state = inspect(obj)
+            if any(state.attrs[campo].history.has_changes() for campo in SEARCH_FIELDS):
+                docs.append(_document(obj))
+    for obj in session.deleted:
+        if isinstance(obj, Service):
+            removidos.add(obj.id)
+
+    if docs or removidos:
+        _write(session.connection(), docs, removidos)
+        session.info['search_catalog_changed'] = True
+
+
+@event.listens_for(db.session, 'after_commit')
+def _refresh_autocomplete(session):
+    if session.info.pop('search_catalog_changed', False):
+        autocomplete.invalidate()
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_autocomplete_flag(session):
+    session.info.pop('search_catalog_changed', None)
+
+
+def rebuild_search_index():
+    """Reconstrói o índice inteiro a partir da tabela service. Retorna o total indexado."""
+    connection = db.session.connection()
+    dialect = connection.dialect.name
+    if dialect == 'postgresql':
+        for sql in PG_CREATE:
+            connection.execute(text(sql))
+        connection.execute(text("DELETE FROM service_search"))
+    elif dialect == 'sqlite':
+        for sql in SQLITE_CREATE:
+            connection.execute(text(sql))
+        connection.execute(text("DELETE FROM service_fts"))
+    else:
+        return 0
+
+    docs = [_document(s) for s in Service.query.all()]
+    _write(connection, docs, set())
+    autocomplete.invalidate()
+    return len(docs)
+
+
+# --- CONSULTA ---
+
+def _ranked_ids(connection, palavras, limit, category=None):
+    """
+    Ids dos serviços ATIVOS (e da categoria, se informada) por relevância. Os
+    filtros ficam dentro da consulta ranqueada: o LIMIT vale sobre o que será
+    exibido, e não sobre candidatos que depois seriam descartados.
+    """
+    filtros = " AND s.active"
+    params = {'limit': limit}
+    if category:
+        filtros += " AND s.category = :category"
+        params['category'] = category
+
+    dialect = connection.dialect.name
+    if dialect == 'postgresql':
+        params['q'] = ' & '.join(f"{p}:*" for p in palavras)
+        rows = connection.execute(text(
+            "SELECT ss.service_id FROM service_search ss JOIN service s ON s.id = ss.service_id, "
+            "to_tsquery('portuguese', :q) AS query "
+            f"WHERE ss.document @@ query{filtros} "
+            "ORDER BY ts_rank_cd(ss.document, query) DESC, ss.service_id LIMIT :limit"
+        ), params)
+    elif dialect == 'sqlite':
+        # bm25: menor = mais relevante; pesos por coluna (name, category, body)
+        params['q'] = ' '.join(f'"{p}"*' for p in palavras)
+        rows = connection.execute(text(
+            "SELECT service_fts.rowid FROM service_fts JOIN service s ON s.id = service_fts.rowid "
+            f"WHERE service_fts MATCH :q{filtros} "
+            "ORDER BY bm25(service_fts, 10.0, 4.0, 1.0), service_fts.rowid LIMIT :limit"
+        ), params)
+    else:
+        return None
+    return [row[0] for row in rows]
+
+
+def search_services(query, category=None, limit=50):
+    """Serviços ativos que casam com `query`, do mais para o menos relevante."""
+    palavras = terms(query)
+    base = Service.query.filter_by(active=True)
+    if category:
+        base = base.filter_by(category=category)
+    if not palavras:
+        return base.order_by(Service.id.asc()).limit(limit).all()
+
+    ids = _ranked_ids(db.session.connection(), palavras, limit, category)
+    if ids is None:
+        # Banco sem índice textual: varredura com ILIKE em todos os campos
+        for palavra in palavras:
+            base = base.filter(db.or_(*(getattr(Service, campo).ilike(f'%{palavra}%')
+                                        for campo in SEARCH_FIELDS)))
+        return base.limit(limit).all()
+    if not ids:
+        return []
+
+    posicao = {service_id: i for i, service_id in enumerate(ids)}
+    # Releitura pelo ORM com os mesmos filtros (o índice pode estar um commit atrasado)
+    services = base.filter(Service.id.in_(ids)).all()
+    return sorted(services, key=lambda s: posicao[s.id])
+
+
+# --- AUTOCOMPLETE (MEMÓRIA) ---
+
+class AutocompleteIndex:
+    """
+    Lista ordenada de (termo, nome, id, categoria). Cada palavra do nome vira um
+    termo que aponta para o restante do nome, então "pele" sugere "Limpeza de Pele".
+    Busca por prefixo com bisect: O(log n + k), sem tocar no banco.
+    """
+
+    def __init__(self, ttl=60, clock=time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = None
+        self._built_at = 0
+
+    def invalidate(self):
+        with self._lock:
+            self._entries = None
+
+    def build(self, rows):
+        entries = []
+        for service_id, name, category in rows:
+            palavras = normalize(name).split()
+            for i in range(len(palavras)):
+                entries.append((' '.join(palavras[i:]), i, name, service_id, category))
+        entries.sort()
+        with self._lock:
+            self._entries = entries
+            self._built_at = self._clock()
+
+    def _current(self):
+        with self._lock:
+            if self._entries is not None and not (self.ttl and self._clock() - self._built_at > self.ttl):
+                return self._entries
+        rows = db.session.query(Service.id, Service.name, Service.category) \
+            .filter(Service.active == True).all()
+        self.build(rows)
+        return self._entries
+
+    def suggest(self, prefix, limit=8):
+        prefixo = ' '.join(normalize(prefix).split())
+        if not prefixo:
+            return []
+        entries = self._current()
+        vistos, resultado = set(), []
+        i = bisect.bisect_left(entries, (prefixo,))
+        while i < len(entries) and entries[i][0].startswith(prefixo) and len(resultado) < limit:
+            _termo, _pos, name, service_id, category = entries[i]
+            if service_id not in vistos:
+                vistos.add(service_id)
+                resultado.append({'id': service_id, 'name': name, 'category': category})
+            i += 1
+        return resultado
+
+
+autocomplete = AutocompleteIndex()
+
+
+def init_search(app):
+    autocomplete.ttl = app.config.get('SEARCH_AUTOCOMPLETE_TTL_SECONDS', 60)
+    autocomplete.invalidate()
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------
+# Smart Agenda (Agendai Pro)
+# Copyright (c) 2026 Eralice de Moraes Baía. Todos os direitos reservados.
+#
+# Este código é PROPRIETÁRIO e CONFIDENCIAL. A reprodução,
+# distribuição ou modificação não autorizada é estritamente proibida.
+# Desenvolvido para fins acadêmicos - Curso de Engenharia de Software UNINTER.
+# Acadêmica: Eralice de Moraes Baía | RU: 4144099
+# --------------------------------------------------------------------------
+"""
+Limitador de tentativas de login (janela deslizante) por IP e por e-mail.
+
+Roda ANTES da consulta ao usuário e do hash da senha: uma rajada de credential
+stuffing é recusada sem escrita no banco principal e sem gastar CPU com scrypt. O
+bloqueio por conta (failed_login_attempts/is_locked) continua valendo por trás dele.
+
+Janela deslizante aproximada com dois contadores (janela atual + anterior ponderada),
+uma linha por chave. Backends (LOGIN_THROTTLE_BACKEND):
+
+    memory   -> dicionário do processo (testes / um único worker)
+    sqlite   -> arquivo SQLite local compartilhado pelos workers da máquina
+    postgres -> tabela login_throttle no banco principal (vários servidores)
+"""
+import math
+import os
+import random
+import sqlite3
+import threading
+import time
+from sqlalchemy import text
+from app.extensions import db
+
+
+def _decide(state, limit, window, now):
+    """
+    Aplica uma tentativa ao estado (início_janela, atual, anterior).
+    Retorna (novo_estado, permitido, segundos_para_tentar_de_novo).
+    """
+    inicio = int(now // window) * window
+    if state is None:
+        state = (inicio, 0, 0)
+    start, atual, anterior = state
+    if start != inicio:
+        anterior = atual if inicio - start == window else 0
+        atual, start = 0, inicio
+
+    decorrido = now - inicio
+    estimativa = anterior * (1 - decorrido / window) + atual
+    if estimativa + 1 > limit:
+        if atual + 1 > limit or not anterior:
+            espera = window - decorrido
+        else:
+            # Momento em que o peso da janela anterior cai o suficiente
+            espera = window * (1 - (limit - 1 - atual) / anterior) - decorrido
+        return (start, atual, anterior), False, max(1, math.ceil(espera))
+    return (start, atual + 1, anterior), True, 0
+
+
+class MemoryBackend:
+    name = 'memory'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._states = {}
+
+    def hit(self, key, limit, window, now):
+        with self._lock:
+            state, permitido, espera = _decide(self._states.get(key), limit, window, now)
+            self._states[key] = state
+            if random.random() < 0.01:
+                self._purge(now - 2 * window)
+            return permitido, espera
+
+    def _purge(self, antes_de):
+        for key in [k for k, s in self._states.items() if s[0] < antes_de]:
+            del self._states[key]
+
+
+class SQLiteFileBackend:
+    """Arquivo SQLite separado do banco da aplicação; BEGIN IMMEDIATE serializa entre processos."""
+    name = 'sqlite'
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS login_throttle ("
+                     "key TEXT PRIMARY KEY, window_start INTEGER NOT NULL, "
+                     "curr INTEGER NOT NULL, prev INTEGER NOT NULL)")
+
+    def _conn(self):
+        # Uma conexão por thread (e por processo: o PID entra na checagem)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def hit(self, key, limit, window, now):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT window_start, curr, prev FROM login_throttle WHERE key = ?",
+                               (key,)).fetchone()
+            state, permitido, espera = _decide(row, limit, window, now)
+            conn.execute("INSERT OR REPLACE INTO login_throttle (key, window_start, curr, prev) "
+                         "VALUES (?, ?, ?, ?)", (key, *state))
+            if random.random() < 0.01:
+                conn.execute("DELETE FROM login_throttle WHERE window_start < ?", (now - 2 * window,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return permitido, espera
+
+
+class PostgresBackend:
+    """Linha por chave travada com FOR UPDATE numa transação curta e própria."""
+    name = 'postgres'
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def hit(self, key, limit, window, now):
+        with self.engine.begin() as conn:
+            conn.execute(text(
+                "INSERT INTO login_throttle (key, window_start, curr, prev) "
+                "VALUES (:key, :inicio, 0, 0) ON CONFLICT (key) DO NOTHING"
+            ), {'key': key, 'inicio': int(now // window) * window})
+            row = conn.execute(text(
+                "SELECT window_start, curr, prev FROM login_throttle WHERE key = :key FOR UPDATE"
+            ), {'key': key}).fetchone()
+            state, permitido, espera = _decide(tuple(row), limit, window, now)
+            conn.execute(text(
+                "UPDATE login_throttle SET window_start = :inicio, curr = :curr, prev = :prev WHERE key = :key"
+            ), {'key': key, 'inicio': state[0], 'curr': state[1], 'prev': state[2]})
+            if random.random() < 0.01:
+                conn.execute(text("DELETE FROM login_throttle WHERE window_start < :limite"),
+                             {'limite': now - 2 * window})
+        return permitido, espera
+
+
+class LoginThrottle:
+
+    def __init__(self, backend, window=300, ip_limit=20, email_limit=10, clock=time.time):
+        self.backend = backend
+        self.window = window
+        self.ip_limit = ip_limit
+        self.email_limit = email_limit
+        self._clock = clock
+
+    def check(self, ip, email):
+        """
+        Registra a tentativa. Retorna 0 se pode seguir, ou os segundos de espera.
+        O IP é checado primeiro: se ele estourou, a cota do e-mail não é consumida.
+        """
+        now = self._clock()
+        permitido, espera = self.backend.hit(f"ip:{ip or '-'}", self.ip_limit, self.window, now)
+        if not permitido:
+            return espera
+        permitido, espera = self.backend.hit(f"email:{(email or '').lower().strip()}",
+                                             self.email_limit, self.window, now)
+        return 0 if permitido else espera
+
+
+def build_backend(app):
+    nome = (app.config.get('LOGIN_THROTTLE_BACKEND') or '').lower()
+    if not nome:
+        uri = app.config.get('SQLALCHEMY_DATABASE_URI') or ''
+        if app.config.get('TESTING'):
+            nome = 'memory'
+        elif uri.startswith('postgresql'):
+            nome = 'postgres'
+        else:
+            nome = 'sqlite'
+
+    if nome == 'postgres':
+        with app.app_context():
+            return PostgresBackend(db.engine)
+    if nome == 'sqlite':
+        path = app.config.get('LOGIN_THROTTLE_FILE') or os.path.join(app.instance_path, 'login_throttle.db')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return SQLiteFileBackend(path)
+    return MemoryBackend()
+
+
+def get_login_throttle(app):
+    """
+    Limitador da aplicação, criado no primeiro uso (assim a configuração final,
+    inclusive TESTING, já está aplicada). None se LOGIN_THROTTLE_ENABLED=false.
+    """
+    if not app.config.get('LOGIN_THROTTLE_ENABLED', True):
+        return None
+    throttle = app.extensions.get('login_throttle')
+    if throttle is None:
+        throttle = LoginThrottle(
+            build_backend(app),
+            window=app.config.get('LOGIN_THROTTLE_WINDOW_SECONDS', 300),
+            ip_limit=app.config.get('LOGIN_THROTTLE_IP_LIMIT', 20),
+            email_limit=app.config.get('LOGIN_THROTTLE_EMAIL_LIMIT', 10),
+        )
+        app.extensions['login_throttle'] = throttle
+    return throttle
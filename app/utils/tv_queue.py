@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------
+# Smart Agenda (Agendai Pro)
+# Copyright (c) 2026 Eralice de Moraes Baía. Todos os direitos reservados.
+#
+# Este código é PROPRIETÁRIO e CONFIDENCIAL. A reprodução,
+# distribuição ou modificação não autorizada é estritamente proibida.
+# Desenvolvido para fins acadêmicos - Curso de Engenharia de Software UNINTER.
+# Acadêmica: Eralice de Moraes Baía | RU: 4144099
+# --------------------------------------------------------------------------
+"""
+Fila do painel TV (sala de espera): snapshot do dia e contador de mudanças.
+
+Todo flush que coloca ou tira um agendamento de 'confirmed'/'arrived'/'in_progress'
+incrementa o contador 'tv_queue' na mesma transação. O painel só precisa
+reconsultar a fila quando esse número (ou o dia) muda.
+"""
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import joinedload
+from app.extensions import db
+from app.models import Appointment, Service
+from app.utils.clock import local_today
+from app.utils.counters import bump_counter, read_counter
+
+TV_COUNTER = 'tv_queue'
+TV_STATUSES = ('confirmed', 'arrived', 'in_progress')
+CAMPOS_FILA = ('status', 'start_datetime', 'service_id')
+
+
+def queue_version():
+    """Versão da fila de hoje: muda a cada alteração relevante e na virada do dia."""
+    return f"{local_today().isoformat()}-{read_counter(TV_COUNTER)}"
+
+
+def _fila_de_hoje(query, today):
+    return query.filter(Appointment.on_day(today), Appointment.status.in_(TV_STATUSES))
+
+
+def queue_etag(today=None):
+    """
+    Versão de conteúdo barata para GET condicional: COUNT + MAX(updated_at) dos
+    agendamentos ativos de hoje (uma agregação no índice, sem joins nem serialização).
+    """
+    today = today or local_today()
+    total, ultimo = _fila_de_hoje(
+        db.session.query(db.func.count(Appointment.id), db.func.max(Appointment.updated_at)), today
+    ).one()
+    return f"tv-{today.isoformat()}-{total}-{ultimo or 0}".replace(' ', 'T')
+
+
+def queue_payload(today=None):
+    """
+    Snapshot da fila numa única consulta e numa única passada: quem está em
+    atendimento ganha a sala pela posição (mapa pré-calculado, sem list.index).
+    """
+    today = today or local_today()
+    rows = Appointment.query.filter(
+        Appointment.on_day(today),
+        Appointment.status.in_(('in_progress', 'confirmed'))
+    ).options(
+        joinedload(Appointment.user),
+        joinedload(Appointment.service).joinedload(Service.resource)
+    ).order_by(Appointment.start_datetime.asc(), Appointment.id.asc()).all()
+
+    atendimentos, espera = [], []
+    for a in rows:
+        if a.status == 'in_progress':
+            atendimentos.append({
+                'paciente': (a.user.name or a.user.username) if a.user else "Sem Nome",
+                'sala': f"SALA {len(atendimentos) + 1}",
+                'especialista': a.service.resource.name if (a.service and a.service.resource) else 'Equipe'
+            })
+        else:
+            espera.append({
+                'paciente': (a.user.name or a.user.username) if a.user else "Paciente Externo",
+                'servico': a.service.name if a.service else 'Consulta',
+                'horario': a.start_datetime.strftime('%H:%M') if a.start_datetime else '--:--'
+            })
+    return {'atendimentos': atendimentos, 'espera': espera}
+
+
+def _afeta_fila(obj):
+    state = inspect(obj)
+    if not any(state.attrs[campo].history.has_changes() for campo in CAMPOS_FILA):
+        return False
+    history = state.attrs['status'].history
+    antigos = history.deleted or history.unchanged or ()
+    return obj.status in TV_STATUSES or any(s in TV_STATUSES for s in antigos)
+
+
+@event.listens_for(db.session, 'after_flush')
+def _bump_tv_counter(session, flush_context):
+    mudou = any(isinstance(obj, Appointment) and obj.status in TV_STATUSES
+                for obj in list(session.new) + list(session.deleted))
+    mudou = mudou or any(isinstance(obj, Appointment) and _afeta_fila(obj) for obj in session.dirty)
+    if mudou:
+        bump_counter(TV_COUNTER, session.connection())
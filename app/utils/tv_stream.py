@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------
+# Smart Agenda (Agendai Pro)
+# Copyright (c) 2026 Eralice de Moraes Baía. Todos os direitos reservados.
+#
+# Este código é PROPRIETÁRIO e CONFIDENCIAL. A reprodução,
+# distribuição ou modificação não autorizada é estritamente proibida.
+# Desenvolvido para fins acadêmicos - Curso de Engenharia de Software UNINTER.
+# Acadêmica: Eralice de Moraes Baía | RU: 4144099
+# --------------------------------------------------------------------------
+"""
+Canal SSE (Server-Sent Events) do painel TV.
+
+Um único observador por processo lê o contador 'tv_queue' (uma consulta por chave
+primária) e só monta o snapshot da fila quando a versão muda. Ele acorda na hora
+com os eventos do barramento (app/utils/events.py, inclusive de outros workers) e,
+como rede de segurança, a cada TV_WATCH_INTERVAL_SECONDS. As conexões SSE apenas
+esperam numa Condition: a carga no banco não cresce com o número de telas.
+
+Cada tela conectada ocupa uma thread do worker enquanto a conexão durar: o
+gunicorn roda com worker gthread (gunicorn.conf.py) e SSE_MAX_STREAMS limita as
+conexões por processo, deixando threads livres para as demais páginas. Acima do
+limite a rota responde 503 e o painel cai para o polling do endpoint JSON.
+"""
+import json
+import logging
+import threading
+from app.extensions import db
+from app.utils.events import bus
+from app.utils.tv_queue import queue_version, queue_payload
+
+logger = logging.getLogger(__name__)
+
+
+class TvQueueBroadcaster:
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._version = None
+        self._data = None
+        self._thread = None
+        self._wake = threading.Event()
+        self._streams = 0
+        self._streams_lock = threading.Lock()
+
+    def open_stream(self, limit):
+        """Reserva uma vaga de conexão SSE neste processo; False se já está no limite."""
+        with self._streams_lock:
+            if limit and self._streams >= limit:
+                return False
+            self._streams += 1
+            return True
+
+    def close_stream(self):
+        """Libera a vaga (chamado quando o servidor fecha a resposta)."""
+        with self._streams_lock:
+            self._streams = max(0, self._streams - 1)
+
+    def open_streams(self):
+        with self._streams_lock:
+            return self._streams
+
+    def notify(self, evt=None):
+        """Assinante do barramento: antecipa a próxima verificação do observador."""
+        self._wake.set()
+
+    def current(self):
+        with self._cond:
+            return self._version, self._data
+
+    def publish(self, version, payload):
+        data = json.dumps(payload, ensure_ascii=False)
+        with self._cond:
+            self._version, self._data = version, data
+            self._cond.notify_all()
+
+    def refresh(self):
+        """Uma verificação: remonta e publica o snapshot se a versão mudou. Requer app context."""
+        version = queue_version()
+        if version != self._version:
+            self.publish(version, queue_payload())
+        return version
+
+    def wait(self, last_version, timeout):
+        """Bloqueia até surgir uma versão diferente de last_version (ou até o timeout)."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._version is not None and self._version != last_version,
+                                timeout)
+            return self._version, self._data
+
+    def start(self, app):
+        """Sobe o observador deste processo (idempotente)."""
+        with self._cond:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, args=(app,),
+                                            name='tv-queue-watcher', daemon=True)
+            self._thread.start()
+
+    def _run(self, app):
+        interval = app.config.get('TV_WATCH_INTERVAL_SECONDS', 5)
+        while True:
+            # Limpa ANTES de consultar: um evento durante o refresh garante nova rodada
+            self._wake.clear()
+            with app.app_context():
+                try:
+                    self.refresh()
+                except Exception:
+                    db.session.rollback()
+                    logger.exception("Falha ao atualizar a fila do painel TV")
+                finally:
+                    db.session.remove()
+            self._wake.wait(interval)
+
+
+broadcaster = TvQueueBroadcaster()
+bus.subscribe(broadcaster.notify)
+
+
+def event_stream(last_event_id, heartbeat):
+    """
+    Gerador SSE. Reenvia o snapshot só se o cliente não tem a versão atual
+    (Last-Event-ID) e manda um comentário de heartbeat a cada `heartbeat` segundos
+    para manter proxies abertos e detectar telas desconectadas.
+    """
+    yield "retry: 3000\n\n"
+    last = last_event_id
+    while True:
+        version, data = broadcaster.wait(last, heartbeat)
+        if version is not None and version != last:
+            last = version
+            yield f"id: {version}\nevent: fila\ndata: {data}\n\n"
+        else:
+            yield ": ping\n\n"
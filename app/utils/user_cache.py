@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------
+# Smart Agenda (Agendai Pro)
+# Copyright (c) 2026 Eralice de Moraes Baía. Todos os direitos reservados.
+#
+# Este código é PROPRIETÁRIO e CONFIDENCIAL. A reprodução,
+# distribuição ou modificação não autorizada é estritamente proibida.
+# Desenvolvido para fins acadêmicos - Curso de Engenharia de Software UNINTER.
+# Acadêmica: Eralice de Moraes Baía | RU: 4144099
+# --------------------------------------------------------------------------
+"""
+Cache de identidade para o user_loader do Flask-Login.
+
+Cada requisição autenticada (painel TV, ações do admin) recarregava o User do banco.
+Aqui guardamos um snapshot compacto (id, name, email, role, is_admin, is_locked,
+deleted_at) por USER_CACHE_TTL_SECONDS. Commits que alteram um User incrementam a
+versão dele neste processo e o snapshot é descartado na hora; em outros workers a
+mudança vale no máximo após o TTL.
+
+current_user passa a ser um CachedUser: os campos do snapshot não custam consulta.
+Qualquer outro atributo (patient_profile, appointments...) ou escrita carrega o User
+de verdade na sessão, uma vez por requisição, e a partir daí tudo é lido dele.
+"""
+import threading
+import time
+from flask_login import UserMixin
+from sqlalchemy import event
+from app.extensions import db
+from app.models import User
+
+SNAPSHOT_FIELDS = ('id', 'name', 'email', 'role', 'is_admin', 'is_locked', 'deleted_at')
+
+
+class CachedUser(UserMixin):
+    """Proxy somente-leitura do snapshot; cai para o User do ORM quando preciso."""
+
+    def __init__(self, snapshot, orm_user=None):
+        object.__setattr__(self, '_snapshot', snapshot)
+        object.__setattr__(self, '_orm', orm_user)
+
+    def _load(self):
+        if self._orm is None:
+            object.__setattr__(self, '_orm', db.session.get(User, self._snapshot['id']))
+        return self._orm
+
+    def __getattr__(self, nome):
+        # Só é chamado quando o atributo não existe no proxy
+        if nome.startswith('_'):
+            raise AttributeError(nome)
+        if self._orm is None and nome in self._snapshot:
+            return self._snapshot[nome]
+        return getattr(self._load(), nome)
+
+    def __setattr__(self, nome, valor):
+        setattr(self._load(), nome, valor)
+
+    def get_id(self):
+        return str(self._snapshot['id'])
+
+    @property
+    def username(self):
+        return self.email
+
+    @property
+    def is_staff(self):
+        return self.role in ['admin', 'staff'] or self.is_admin
+
+    def __repr__(self):
+        return f'<CachedUser {self._snapshot["id"]}>'
+
+
+class UserIdentityCache:
+
+    def __init__(self, ttl=30, clock=time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = {}    # id -> (snapshot, versão, gravado_em)
+        self._versions = {}   # id -> versão local (incrementada a cada commit no User)
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            snapshot, version, stored_at = entry
+            if version != self._versions.get(user_id, 0) or \
+                    (self.ttl and self._clock() - stored_at > self.ttl):
+                del self._entries[user_id]
+                return None
+            return snapshot
+
+    def version(self, user_id):
+        with self._lock:
+            return self._versions.get(user_id, 0)
+
+    def put(self, user_id, snapshot, version):
+        # Versão lida ANTES da consulta: um commit no meio descarta este snapshot
+        with self._lock:
+            self._entries[user_id] = (snapshot, version, self._clock())
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+            self._entries.pop(user_id, None)
+
+    def clear(self, ttl=None):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            if ttl is not None:
+                self.ttl = ttl
+
+
+user_cache = UserIdentityCache()
+
+
+def init_user_cache(app):
+    user_cache.clear(app.config.get('USER_CACHE_TTL_SECONDS', 30))
+
+
+def load_cached_user(user_id):
+    """user_loader: zero consultas enquanto o snapshot for válido."""
+    snapshot = user_cache.get(user_id)
+    if snapshot is not None:
+        return CachedUser(snapshot)
+
+    version = user_cache.version(user_id)
+    user = db.session.get(User, user_id)
+    if user is None:
+        return None
+    snapshot = {campo: getattr(user, campo) for campo in SNAPSHOT_FIELDS}
+    user_cache.put(user_id, snapshot, version)
+    # Nesta requisição o User já está carregado: o proxy usa ele direto
+    return CachedUser(snapshot, user)
+
+
+# --- INVALIDAÇÃO: QUALQUER ESCRITA EM USER (edição, exclusão lógica, bloqueio, senha) ---
+
+@event.listens_for(db.session, 'after_flush')
+def _collect_user_changes(session, flush_context):
+    ids = session.info.setdefault('user_cache_ids', set())
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User) and obj.id is not None:
+            ids.add(obj.id)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _apply_user_invalidations(session):
+    for user_id in session.info.pop('user_cache_ids', ()):
+        user_cache.invalidate(user_id)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_user_invalidations(session):
+    session.info.pop('user_cache_ids', None)
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------
+# Smart Agenda (Agendai Pro)
+# Copyright (c) 2026 Eralice de Moraes Baía. Todos os direitos reservados.
+# 
+# Este código é PROPRIETÁRIO e CONFIDENCIAL. A reprodução, 
+# distribuição ou modificação não autorizada é estritamente proibida.
+# Desenvolvido para fins acadêmicos - Curso de Engenharia de Software UNINTER.
+# Acadêmica: Eralice de Moraes Baía | RU: 4144099
+# --------------------------------------------------------------------------
+"""
+Benchmark: func.date(start_datetime) == dia  x  Appointment.on_day(dia)
+
+Uso:
+    python benchmarks/bench_day_filter.py [--rows 1000000] [--db /tmp/bench_agenda.db]
+
+Cria (uma vez) um SQLite com N agendamentos espalhados em ~3 anos e compara
+o plano de execução e o tempo médio das duas formas de filtrar "hoje".
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.config import config_dict
+from app.extensions import db
+from app.models import Appointment
+
+
+FORMATO = '%Y-%m-%d %H:%M:%S.%f'
+
+
+def popular(total):
+    """Insere os registros direto pelo driver, em lotes (o ORM seria lento demais aqui)."""
+    conn = db.session.connection()
+    conn.exec_driver_sql("INSERT INTO user (id, name, email, password_hash) VALUES (1, 'Bench', 'bench@bench', 'x')")
+    conn.exec_driver_sql("INSERT INTO service (id, name, duration_minutes, price_cents, category) VALUES (1, 'Bench', 30, 100, 'Geral')")
+    inicio = datetime(2024, 1, 1)
+    status = ['pending', 'confirmed', 'completed', 'cancelled', 'in_progress']
+    lote = []
+    for i in range(total):
+        start = inicio + timedelta(minutes=30 * random.randrange(3 * 365 * 48))
+        # Mesmo formato de texto que o SQLAlchemy grava no SQLite
+        lote.append((1, 1, start.strftime(FORMATO), (start + timedelta(minutes=30)).strftime(FORMATO), random.choice(status)))
+        if len(lote) == 50000:
+            conn.exec_driver_sql("INSERT INTO appointment (user_id, service_id, start_datetime, end_datetime, status) VALUES (?, ?, ?, ?, ?)", lote)
+            lote = []
+    if lote:
+        conn.exec_driver_sql("INSERT INTO appointment (user_id, service_id, start_datetime, end_datetime, status) VALUES (?, ?, ?, ?, ?)", lote)
+    db.session.commit()
+
+
+def plano(query):
+    conn = db.session.connection()
+    compiled = query.statement.compile(dialect=conn.dialect, compile_kwargs={"render_postcompile": True})
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    return " | ".join(row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + str(compiled), params))
+
+
+def cronometrar(query, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        query.all()
+    return (time.perf_counter() - inicio) / repeticoes * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--db', default='/tmp/bench_agenda.db')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    config_dict['testing'].SQLALCHEMY_DATABASE_URI = 'sqlite:///' + args.db
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        atual = db.session.query(db.func.count(Appointment.id)).scalar()
+        if atual < args.rows:
+            print(f"Populando {args.rows - atual} agendamentos em {args.db} ...")
+            popular(args.rows - atual)
+
+        dia = datetime(2025, 6, 16).date()
+        por_funcao = Appointment.query.filter(db.func.date(Appointment.start_datetime) == dia)
+        sargavel = Appointment.query.filter(Appointment.on_day(dia))
+
+        assert por_funcao.count() == sargavel.count()
+
+        for nome, query in (("func.date(start_datetime) == dia", por_funcao),
+                            ("Appointment.on_day(dia)", sargavel)):
+            print(f"\n{nome}")
+            print(f"  plano : {plano(query)}")
+            print(f"  tempo : {cronometrar(query, args.repeat):.2f} ms/consulta")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------
+# Smart Agenda (Agendai Pro)
+# Copyright (c) 2026 Eralice de Moraes Baía. Todos os direitos reservados.
+#
+# Este código é PROPRIETÁRIO e CONFIDENCIAL. A reprodução,
+# distribuição ou modificação não autorizada é estritamente proibida.
+# Desenvolvido para fins acadêmicos - Curso de Engenharia de Software UNINTER.
+# Acadêmica: Eralice de Moraes Baía | RU: 4144099
+# --------------------------------------------------------------------------
+"""
+Benchmark: logins/s (verificações de senha) por política de hash.
+
+Uso:
+    python benchmarks/bench_password_hash.py [--threads 2] [--seconds 3]
+        [--policy scrypt:32768:8:1 --policy pbkdf2:sha256:600000 ...]
+
+Para cada política mede a latência de UMA verificação e a vazão com o mesmo número
+de threads do pool (PASSWORD_HASH_WORKERS). Rode no hardware de produção: a vazão
+por worker x número de workers é o teto de logins/s antes de saturar a CPU.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from werkzeug.security import generate_password_hash, check_password_hash
+from app.utils.passwords import method_prefix
+
+POLITICAS_PADRAO = [
+    'scrypt:32768:8:1',
+    'scrypt:16384:8:1',
+    'pbkdf2:sha256:1000000',
+    'pbkdf2:sha256:600000',
+    'pbkdf2:sha256:260000',
+]
+
+
+def medir(policy, threads, seconds):
+    stored = generate_password_hash('senha-de-benchmark', method=policy)
+
+    inicio = time.perf_counter()
+    check_password_hash(stored, 'senha-de-benchmark')
+    latencia = time.perf_counter() - inicio
+
+    total = 0
+    fim = time.perf_counter() + seconds
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        while time.perf_counter() < fim:
+            lote = [pool.submit(check_password_hash, stored, 'senha-de-benchmark') for _ in range(threads)]
+            total += sum(1 for f in lote if f.result())
+        decorrido = seconds + (time.perf_counter() - fim)
+    return latencia, total / decorrido
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--policy', action='append', help='Política werkzeug (pode repetir).')
+    parser.add_argument('--threads', type=int, default=2, help='Threads do pool (PASSWORD_HASH_WORKERS).')
+    parser.add_argument('--seconds', type=float, default=3.0, help='Duração da medição por política.')
+    args = parser.parse_args()
+
+    print(f"CPUs: {os.cpu_count()} | threads no pool: {args.threads}\n")
+    print(f"{'política':<28}{'latência (ms)':>15}{'logins/s':>12}")
+    for policy in args.policy or POLITICAS_PADRAO:
+        latencia, vazao = medir(policy, args.threads, args.seconds)
+        print(f"{method_prefix(policy):<28}{latencia * 1000:>15.1f}{vazao:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+# --------------------------------------------------------------------------
+# Smart Agenda (Agendai Pro)
+# Copyright (c) 2026 Eralice de Moraes Baía. Todos os direitos reservados.
+#
+# Este código é PROPRIETÁRIO e CONFIDENCIAL. A reprodução,
+# distribuição ou modificação não autorizada é estritamente proibida.
+# Desenvolvido para fins acadêmicos - Curso de Engenharia de Software UNINTER.
+# Acadêmica: Eralice de Moraes Baía | RU: 4144099
+# --------------------------------------------------------------------------
+"""
+Configuração do gunicorn (lida automaticamente do diretório atual: `gunicorn run:app`).
+
+O painel TV mantém uma conexão SSE aberta por tela. Com o worker síncrono padrão
+cada tela prenderia um processo inteiro; com gthread ela prende só uma thread, e
+SSE_MAX_STREAMS (config.py) reserva threads para as demais páginas.
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+worker_class = 'gthread'
+workers = int(os.environ.get('WEB_CONCURRENCY') or 2)
+threads = int(os.environ.get('GUNICORN_THREADS') or 8)
+
+# gthread: o timeout vale para o heartbeat do worker, não para a duração da
+# requisição, então streams longos não são mortos
+timeout = int(os.environ.get('GUNICORN_TIMEOUT') or 60)
+graceful_timeout = 30
+keepalive = 5
+
+if int(os.environ.get('SSE_MAX_STREAMS') or 4) >= threads:
+    raise RuntimeError("SSE_MAX_STREAMS precisa ser menor que GUNICORN_THREADS.")
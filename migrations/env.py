@@ -45,6 +45,25 @@ target_db = current_app.extensions['migrate'].db
 # ... etc.
 
 
+# Objetos que existem só em um dialeto: o autogenerate não deve propor criá-los
+# (ou apagá-los) no banco onde eles não se aplicam.
+PG_ONLY_INDEXES = {'ix_appointment_active_start_datetime'}
+# Índice de busca (app/utils/search.py): criado por DDL próprio, fora dos modelos.
+# O FTS5 ainda cria tabelas-sombra service_fts_data, _idx, _content, _docsize, _config
+SEARCH_TABLES = ('service_search', 'service_fts')
+SEARCH_INDEXES = {'ix_service_search_document'}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == 'table' and name.startswith(SEARCH_TABLES):
+        return False
+    if type_ == 'index' and name in SEARCH_INDEXES:
+        return False
+    if type_ == 'index' and name in PG_ONLY_INDEXES and get_engine().dialect.name != 'postgresql':
+        return False
+    return True
+
+
 def get_metadata():
     if hasattr(target_db, 'metadatas'):
         return target_db.metadatas[None]
@@ -65,7 +84,8 @@ def run_migrations_offline():
     """
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url, target_metadata=get_metadata(), literal_binds=True
+        url=url, target_metadata=get_metadata(), literal_binds=True,
+        include_object=include_object
     )
 
     with context.begin_transaction():
@@ -93,6 +113,7 @@ def run_migrations_online():
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    conf_args.setdefault("include_object", include_object)
 
     connectable = get_engine()
 
@@ -0,0 +1,41 @@
+"""Índices compostos e parcial para os caminhos quentes de agendamentos
+
+Revision ID: 6d2f8a4c91b3
+Revises: 1447b1216cdf
+Create Date: 2026-10-18 10:12:44.201337
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6d2f8a4c91b3'
+down_revision = '1447b1216cdf'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('appointment', schema=None) as batch_op:
+        batch_op.create_index('ix_appointment_resource_id_start_datetime', ['resource_id', 'start_datetime'], unique=False)
+        batch_op.create_index('ix_appointment_service_id_start_datetime', ['service_id', 'start_datetime'], unique=False)
+        batch_op.create_index('ix_appointment_user_id_start_datetime', ['user_id', 'start_datetime'], unique=False)
+
+    # Índice parcial: apenas no PostgreSQL (somente agendamentos ativos)
+    if op.get_bind().dialect.name == 'postgresql':
+        op.create_index(
+            'ix_appointment_active_start_datetime', 'appointment',
+            ['start_datetime', 'resource_id'], unique=False,
+            postgresql_where=sa.text("status NOT IN ('cancelled', 'completed')")
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_appointment_active_start_datetime', table_name='appointment')
+
+    with op.batch_alter_table('appointment', schema=None) as batch_op:
+        batch_op.drop_index('ix_appointment_user_id_start_datetime')
+        batch_op.drop_index('ix_appointment_service_id_start_datetime')
+        batch_op.drop_index('ix_appointment_resource_id_start_datetime')
@@ -0,0 +1,28 @@
+"""Recurso vinculado ao profissional (horário de trabalho)
+
+Revision ID: 9b7e3f1d5a20
+Revises: 6d2f8a4c91b3
+Create Date: 2026-10-18 11:02:17.834512
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b7e3f1d5a20'
+down_revision = '6d2f8a4c91b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('resource', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('staff_profile_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(batch_op.f('fk_resource_staff_profile_id_staff_profile'), 'staff_profile', ['staff_profile_id'], ['id'])
+
+
+def downgrade():
+    with op.batch_alter_table('resource', schema=None) as batch_op:
+        batch_op.drop_constraint(batch_op.f('fk_resource_staff_profile_id_staff_profile'), type_='foreignkey')
+        batch_op.drop_column('staff_profile_id')
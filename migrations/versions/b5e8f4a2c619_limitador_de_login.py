@@ -0,0 +1,30 @@
+"""Limitador de tentativas de login (login_throttle)
+
+Revision ID: b5e8f4a2c619
+Revises: a7c3e91b5d24
+Create Date: 2026-10-18 17:26:44.019381
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5e8f4a2c619'
+down_revision = 'a7c3e91b5d24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('login_throttle',
+    sa.Column('key', sa.String(length=200), nullable=False),
+    sa.Column('window_start', sa.Integer(), nullable=False),
+    sa.Column('curr', sa.Integer(), nullable=False),
+    sa.Column('prev', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+
+
+def downgrade():
+    op.drop_table('login_throttle')
@@ -0,0 +1,44 @@
+"""Preço gravado no agendamento (fonte única da receita do rollup)
+
+Revision ID: b8e4c7a1f305
+Revises: c9b2e6d4f013
+Create Date: 2026-10-18 21:12:44.630152
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8e4c7a1f305'
+down_revision = 'c9b2e6d4f013'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('appointment', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('price_cents', sa.Integer(), nullable=True))
+
+    # Histórico: o preço da época não foi guardado; usa o preço atual do serviço
+    op.execute(
+        "UPDATE appointment SET price_cents = "
+        "(SELECT s.price_cents FROM service s WHERE s.id = appointment.service_id)"
+    )
+
+    # Receita do rollup recalculada pela mesma regra dos deltas (soma de price_cents)
+    day = "CAST(a.start_datetime AS DATE)" if op.get_bind().dialect.name == 'postgresql' \
+        else "date(a.start_datetime)"
+    op.execute("DELETE FROM daily_stats")
+    op.execute(
+        "INSERT INTO daily_stats (day, service_id, status, appointment_count, revenue_cents) "
+        f"SELECT {day}, a.service_id, COALESCE(a.status, 'pending'), "
+        "COUNT(a.id), COALESCE(SUM(COALESCE(a.price_cents, 0)), 0) "
+        "FROM appointment a "
+        f"GROUP BY {day}, a.service_id, COALESCE(a.status, 'pending')"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('appointment', schema=None) as batch_op:
+        batch_op.drop_column('price_cents')
@@ -0,0 +1,28 @@
+"""Pacotes de sessões recorrentes (series_id)
+
+Revision ID: c41a7e2b8d63
+Revises: 9b7e3f1d5a20
+Create Date: 2026-10-18 11:48:53.120904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41a7e2b8d63'
+down_revision = '9b7e3f1d5a20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('appointment', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('series_id', sa.String(length=32), nullable=True))
+        batch_op.create_index(batch_op.f('ix_appointment_series_id'), ['series_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('appointment', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_appointment_series_id'))
+        batch_op.drop_column('series_id')
@@ -0,0 +1,26 @@
+"""Momento do último incremento dos contadores (Last-Modified do catálogo)
+
+Revision ID: c9b2e6d4f013
+Revises: d4f1a8c2e937
+Create Date: 2026-10-18 18:31:05.512874
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c9b2e6d4f013'
+down_revision = 'd4f1a8c2e937'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('counters', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('counters', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
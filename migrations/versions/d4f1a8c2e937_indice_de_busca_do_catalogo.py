@@ -0,0 +1,63 @@
+"""Índice de busca do catálogo (tsvector/GIN no PostgreSQL, FTS5 no SQLite)
+
+Revision ID: d4f1a8c2e937
+Revises: b5e8f4a2c619
+Create Date: 2026-10-18 17:58:12.604213
+
+"""
+import unicodedata
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4f1a8c2e937'
+down_revision = 'b5e8f4a2c619'
+branch_labels = None
+depends_on = None
+
+
+def _normalize(valor):
+    decomposto = unicodedata.normalize('NFKD', valor or '')
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).lower()
+
+
+def upgrade():
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+    if dialect == 'postgresql':
+        op.execute("CREATE TABLE service_search ("
+                   "service_id INTEGER PRIMARY KEY REFERENCES service (id) ON DELETE CASCADE, "
+                   "document TSVECTOR NOT NULL)")
+        op.execute("CREATE INDEX ix_service_search_document ON service_search USING GIN (document)")
+        insert = ("INSERT INTO service_search (service_id, document) VALUES (:id, "
+                  "setweight(to_tsvector('portuguese', :name), 'A') || "
+                  "setweight(to_tsvector('portuguese', :category), 'B') || "
+                  "setweight(to_tsvector('portuguese', :body), 'C'))")
+    elif dialect == 'sqlite':
+        op.execute("CREATE VIRTUAL TABLE service_fts USING fts5("
+                   "name, category, body, tokenize = 'unicode61 remove_diacritics 2')")
+        insert = "INSERT INTO service_fts (rowid, name, category, body) VALUES (:id, :name, :category, :body)"
+    else:
+        return
+
+    # Backfill com os serviços existentes
+    rows = bind.execute(sa.text(
+        "SELECT id, name, category, description, content, benefits, indications FROM service"
+    )).fetchall()
+    docs = [{
+        'id': row[0],
+        'name': _normalize(row[1]),
+        'category': _normalize(row[2]),
+        'body': _normalize(' '.join(v or '' for v in row[3:])),
+    } for row in rows]
+    if docs:
+        bind.execute(sa.text(insert), docs)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("DROP TABLE IF EXISTS service_search")
+    elif dialect == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS service_fts")
@@ -0,0 +1,54 @@
+"""Rollup diário dos KPIs (daily_stats)
+
+Revision ID: e83b5c0f2a17
+Revises: c41a7e2b8d63
+Create Date: 2026-10-18 14:02:11.407215
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e83b5c0f2a17'
+down_revision = 'c41a7e2b8d63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('daily_stats',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('service_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('appointment_count', sa.Integer(), nullable=False),
+    sa.Column('revenue_cents', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['service_id'], ['service.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('day', 'service_id', 'status', name='uq_daily_stats_day_service_status')
+    )
+    with op.batch_alter_table('daily_stats', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_daily_stats_day'), ['day'], unique=False)
+
+    # Backfill do histórico existente
+    op.execute(
+        "INSERT INTO daily_stats (day, service_id, status, appointment_count, revenue_cents) "
+        "SELECT CAST(a.start_datetime AS DATE), a.service_id, COALESCE(a.status, 'pending'), "
+        "COUNT(a.id), COALESCE(SUM(s.price_cents), 0) "
+        "FROM appointment a JOIN service s ON s.id = a.service_id "
+        "GROUP BY CAST(a.start_datetime AS DATE), a.service_id, COALESCE(a.status, 'pending')"
+        if op.get_bind().dialect.name == 'postgresql' else
+        "INSERT INTO daily_stats (day, service_id, status, appointment_count, revenue_cents) "
+        "SELECT date(a.start_datetime), a.service_id, COALESCE(a.status, 'pending'), "
+        "COUNT(a.id), COALESCE(SUM(s.price_cents), 0) "
+        "FROM appointment a JOIN service s ON s.id = a.service_id "
+        "GROUP BY date(a.start_datetime), a.service_id, COALESCE(a.status, 'pending')"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('daily_stats', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_daily_stats_day'))
+
+    op.drop_table('daily_stats')
@@ -0,0 +1,29 @@
+"""Contadores de mudança (painel TV via SSE)
+
+Revision ID: f2a6d9c31e48
+Revises: e83b5c0f2a17
+Create Date: 2026-10-18 15:20:37.118604
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a6d9c31e48'
+down_revision = 'e83b5c0f2a17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    counters = op.create_table('counters',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('value', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.bulk_insert(counters, [{'name': 'tv_queue', 'value': 0}])
+
+
+def downgrade():
+    op.drop_table('counters')
@@ -0,0 +1,219 @@
+# Testes do motor de disponibilidade (intervalos em memória)
+import time
+import pytest
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.models import User, Resource, Service, Appointment, StaffProfile
+from app.utils.availability import BusyIntervals, day_busy_intervals, month_availability, earliest_available
+from app.utils.availability_cache import availability_cache
+from app.utils.schedule import day_slot_starts, parse_work_hours, compile_weekly_template
+
+
+def _setup_agenda():
+    res = Resource(name="Consultório 1", category="Geral")
+    db.session.add(res)
+    db.session.flush()
+
+    srv = Service(name="Consulta", duration_minutes=30, price_cents=10000,
+                  resource_id=res.id, category="Saúde")
+    user = User(name="Paciente Teste", email="paciente@teste.com")
+    user.set_password("senha_teste_123")
+    db.session.add_all([srv, user])
+    db.session.commit()
+    return res, srv, user
+
+
+# TESTE 1: O ÍNDICE EM MEMÓRIA RESPONDE IGUAL À QUERY POR SLOT
+def test_busy_intervals_match_conflict_query(app):
+    with app.app_context():
+        res, srv, user = _setup_agenda()
+        day = datetime(2026, 1, 20)
+        for hour, status in [(9, 'confirmed'), (11, 'cancelled'), (14, 'completed'), (16, 'pending')]:
+            start = day.replace(hour=hour)
+            db.session.add(Appointment(user_id=user.id, service_id=srv.id, resource_id=res.id,
+                                       start_datetime=start, end_datetime=start + timedelta(minutes=90),
+                                       status=status))
+        db.session.commit()
+
+        busy = day_busy_intervals(srv, day.date())
+        assert len(busy) == 2  # cancelled e completed não ocupam a agenda
+
+        slot = day
+        while slot < day + timedelta(days=1):
+            slot_end = slot + timedelta(minutes=30)
+            assert busy.overlaps(slot, slot_end) == Appointment.check_resource_conflict(srv.id, slot, slot_end)
+            slot += timedelta(minutes=15)
+
+
+# TESTE 2: INTERVALOS ANINHADOS NÃO ESCONDEM CONFLITOS
+def test_busy_intervals_nested():
+    base = datetime(2026, 1, 20, 8, 0)
+    busy = BusyIntervals([
+        (base, base + timedelta(hours=8)),
+        (base + timedelta(hours=1), base + timedelta(hours=2)),
+    ])
+    assert busy.overlaps(base + timedelta(hours=5), base + timedelta(hours=6)) is True
+    assert busy.is_free(base + timedelta(hours=8), base + timedelta(hours=9)) is True
+    assert busy.is_free(base - timedelta(hours=1), base) is True
+
+
+# TESTE 3: CALENDÁRIO DO MÊS BATE COM A GRADE DIÁRIA
+def test_month_availability_counts(app):
+    with app.app_context():
+        res, srv, user = _setup_agenda()
+        busy_day = datetime(2026, 3, 10, 9, 0)
+        db.session.add(Appointment(user_id=user.id, service_id=srv.id, resource_id=res.id,
+                                   start_datetime=busy_day, end_datetime=busy_day + timedelta(hours=3),
+                                   status='confirmed'))
+        db.session.commit()
+
+        days = month_availability(srv, 2026, 3, now=datetime(2026, 1, 1))
+        assert len(days) == 31
+        livre = next(d for d in days if d['date'] == '2026-03-09')
+        ocupado = next(d for d in days if d['date'] == '2026-03-10')
+        assert livre['free_slots'] == 24 and livre['first_free'] == '00:00'
+        assert ocupado['free_slots'] == 21  # 09h, 10h e 11h bloqueados
+
+
+# TESTE 3b: INTERVALO QUE ATRAVESSA A MEIA-NOITE ENXERGA O DIA SEGUINTE
+def test_late_slot_sees_appointment_after_midnight(app):
+    with app.app_context():
+        res, srv, user = _setup_agenda()
+        srv.duration_minutes = 90
+        db.session.commit()
+        encaixe = datetime(2026, 3, 31, 23, 30)
+
+        availability_cache.reset()
+        assert day_busy_intervals(srv, encaixe.date()).is_free(encaixe, encaixe + timedelta(minutes=90))
+
+        madrugada = datetime(2026, 4, 1, 0, 0)
+        db.session.add(Appointment(user_id=user.id, service_id=srv.id, resource_id=res.id,
+                                   start_datetime=madrugada, end_datetime=madrugada + timedelta(hours=1),
+                                   status='confirmed'))
+        db.session.commit()
+
+        # A escrita no dia seguinte invalida também o dia anterior
+        assert day_busy_intervals(srv, encaixe.date()).overlaps(encaixe, encaixe + timedelta(minutes=90))
+
+
+# TESTE 4: CACHE É INVALIDADO POR INSERT, MUDANÇA DE STATUS E DELETE
+def test_availability_cache_invalidation(app):
+    with app.app_context():
+        res, srv, user = _setup_agenda()
+        day = datetime(2026, 4, 15)
+        availability_cache.reset()
+
+        assert len(day_busy_intervals(srv, day.date())) == 0
+        assert len(day_busy_intervals(srv, day.date())) == 0
+        assert availability_cache.stats()['hits'] == 1
+
+        appt = Appointment(user_id=user.id, service_id=srv.id, resource_id=res.id,
+                           start_datetime=day.replace(hour=10), end_datetime=day.replace(hour=11),
+                           status='confirmed')
+        db.session.add(appt)
+        db.session.commit()
+        assert len(day_busy_intervals(srv, day.date())) == 1
+
+        appt.status = 'cancelled'
+        db.session.commit()
+        assert len(day_busy_intervals(srv, day.date())) == 0
+
+        appt.status = 'confirmed'
+        db.session.commit()
+        assert len(day_busy_intervals(srv, day.date())) == 1
+
+        db.session.delete(appt)
+        db.session.commit()
+        assert len(day_busy_intervals(srv, day.date())) == 0
+        assert availability_cache.stats()['misses'] == 5
+
+
+# TESTE 5: TEMPLATE SEMANAL RESPEITA PAUSAS E É INVALIDADO NA EDIÇÃO
+def test_weekly_template_from_work_hours(app):
+    with app.app_context():
+        res, srv, user = _setup_agenda()
+        segunda = datetime(2026, 5, 4).date()
+        domingo = datetime(2026, 5, 10).date()
+
+        # Sem work_hours: grade histórica (24h, de hora em hora)
+        assert len(day_slot_starts(srv, segunda)) == 24
+
+        staff = StaffProfile(user_id=user.id, work_hours={
+            'slot_minutes': 30,
+            'days': {'*': {'start': '08:00', 'end': '12:00', 'breaks': [['10:00', '10:30']]}, 'dom': []}
+        })
+        db.session.add(staff)
+        db.session.flush()
+        res.staff_profile_id = staff.id
+        db.session.commit()
+
+        horarios = [s.strftime('%H:%M') for s in day_slot_starts(srv, segunda)]
+        assert horarios == ['08:00', '08:30', '09:00', '09:30', '10:30', '11:00', '11:30']
+        assert day_slot_starts(srv, domingo) == []
+
+        staff.work_hours = {'days': {'seg': [['14:00', '16:00']]}}
+        db.session.commit()
+        assert [s.strftime('%H:%M') for s in day_slot_starts(srv, segunda)] == ['14:00', '15:00']
+
+
+def test_parse_work_hours_rejects_garbage():
+    with pytest.raises(ValueError):
+        parse_work_hours({'days': {'feriado': [['08:00', '12:00']]}})
+    with pytest.raises(ValueError):
+        parse_work_hours({'days': {'seg': [['8h', '12h']]}})
+
+
+# TESTE 6: BUSCA DO PRIMEIRO HORÁRIO LIVRE ENTRE VÁRIOS PROFISSIONAIS
+def test_earliest_available_across_resources(app):
+    with app.app_context():
+        res, srv, user = _setup_agenda()
+        outro = Resource(name="Consultório 2", category="Geral")
+        db.session.add(outro)
+        db.session.flush()
+        srv2 = Service(name="Consulta 2", duration_minutes=30, price_cents=10000,
+                       resource_id=outro.id, category="Saúde")
+        db.session.add(srv2)
+        now = datetime(2026, 6, 1, 7, 30)
+        # Consultório 1 ocupado das 08h às 10h; o 2 livre
+        db.session.add(Appointment(user_id=user.id, service_id=srv.id, resource_id=res.id,
+                                   start_datetime=now.replace(hour=8, minute=0),
+                                   end_datetime=now.replace(hour=10, minute=0), status='confirmed'))
+        db.session.commit()
+
+        results = earliest_available([srv, srv2], limit=3, now=now)
+        assert [(slot.strftime('%H:%M'), service.id) for slot, service in results] == \
+               [('08:00', srv2.id), ('09:00', srv2.id), ('10:00', srv.id)]
+
+
+# TESTE 7: ESCRITA FEITA POR OUTRO PROCESSO EXPIRA PELO MAX_AGE
+def test_availability_cache_max_age_covers_foreign_writes(app):
+    with app.app_context():
+        res, srv, user = _setup_agenda()
+        day = datetime(2026, 4, 16)
+        relogio = [1000.0]
+        availability_cache.reset(max_age=15)
+        availability_cache._clock = lambda: relogio[0]
+        try:
+            assert len(day_busy_intervals(srv, day.date())) == 0
+
+            # Outro worker grava direto no banco: nenhum evento de sessão neste processo
+            with db.engine.begin() as conn:
+                conn.execute(Appointment.__table__.insert().values(
+                    user_id=user.id, service_id=srv.id, resource_id=res.id,
+                    start_datetime=day.replace(hour=9), end_datetime=day.replace(hour=10),
+                    status='confirmed'))
+
+            relogio[0] += 5
+            assert len(day_busy_intervals(srv, day.date())) == 0  # ainda dentro do max_age
+            relogio[0] += 11
+            assert len(day_busy_intervals(srv, day.date())) == 1
+        finally:
+            availability_cache._clock = time.monotonic
+
+
+# TESTE 8: PERÍODOS SOBREPOSTOS SÃO FUNDIDOS (SEM SLOT DUPLICADO OU FORA DE ORDEM)
+def test_overlapping_work_periods_are_merged():
+    template = compile_weekly_template({'days': {'*': [['10:00', '14:00'], ['08:00', '12:00']]}}, 60)
+    assert template[0] == (480, 540, 600, 660, 720, 780)
+    with pytest.raises(ValueError):
+        parse_work_hours({'days': {'seg': [['12:00', '08:00']]}})
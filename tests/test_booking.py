@@ -0,0 +1,156 @@
+# Testes do fluxo de reserva (expiração, pacotes recorrentes, concorrência)
+import threading
+from datetime import datetime, timedelta, timezone
+from app import create_app
+from app.config import TestingConfig
+from app.extensions import db
+from app.models import User, Resource, Service, Appointment
+from app.utils.expiry import expire_pending_holds
+from app.utils.booking import book_series, confirm_hold, reserve_slot, SlotConflictError
+
+
+def _setup_agenda():
+    res = Resource(name="Sala Fisio", category="Fisioterapia")
+    db.session.add(res)
+    db.session.flush()
+
+    srv = Service(name="Fisioterapia", duration_minutes=50, price_cents=15000,
+                  resource_id=res.id, category="Fisioterapia")
+    user = User(name="Paciente", email="paciente@teste.com")
+    user.set_password("senha_teste_123")
+    db.session.add_all([srv, user])
+    db.session.commit()
+    return res, srv, user
+
+
+def _utc_now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+# TESTE 1: RESERVA VENCIDA LIBERA O HORÁRIO E O SWEEPER CANCELA EM LOTES
+def test_stale_holds_are_free_and_swept(app):
+    with app.app_context():
+        res, srv, user = _setup_agenda()
+        start = datetime(2026, 5, 4, 10, 0)
+        end = start + timedelta(minutes=50)
+
+        for minutes_ago in (40, 30, 20, 5):
+            db.session.add(Appointment(user_id=user.id, service_id=srv.id, resource_id=res.id,
+                                       start_datetime=start, end_datetime=end, status='pending',
+                                       created_at=_utc_now() - timedelta(minutes=minutes_ago)))
+        db.session.commit()
+
+        # A reserva de 5 minutos atrás ainda vale
+        assert Appointment.check_resource_conflict(srv.id, start, end) is True
+
+        assert expire_pending_holds(batch_size=2) == 3
+        statuses = sorted(a.status for a in Appointment.query.all())
+        assert statuses == ['cancelled', 'cancelled', 'cancelled', 'pending']
+
+        # Simulando o futuro: a última reserva também vence, sem nenhuma escrita
+        later = _utc_now() + timedelta(minutes=30)
+        assert Appointment.blocking_query(srv, now=later).count() == 0
+
+
+# TESTE 1b: PAGAMENTO DE RESERVA VENCIDA NÃO CONFIRMA (NEM SOBREPÕE QUEM PEGOU O HORÁRIO)
+def test_payment_of_expired_hold_is_refused(app):
+    with app.app_context():
+        res, srv, user = _setup_agenda()
+        start = datetime(2026, 5, 4, 10, 0)
+        vencida = Appointment(user_id=user.id, service_id=srv.id, resource_id=res.id,
+                              start_datetime=start, end_datetime=start + timedelta(minutes=50),
+                              status='pending', created_at=_utc_now() - timedelta(minutes=40))
+        db.session.add(vencida)
+        db.session.commit()
+
+        outro = User(name="Outro", email="outro@teste.com", password_hash="x")
+        db.session.add(outro)
+        db.session.commit()
+        novo = reserve_slot(srv, outro.id, start)
+
+        assert confirm_hold(vencida) is False
+        assert db.session.get(Appointment, vencida.id).status == 'cancelled'
+        # A reserva nova (ainda no prazo) é confirmada normalmente
+        assert confirm_hold(novo) is True
+        assert db.session.get(Appointment, novo.id).status == 'confirmed'
+        # O sweeper não mexe mais em nada
+        assert expire_pending_holds() == 0
+
+
+# TESTE 2: PACOTE RECORRENTE VALIDA TUDO DE UMA VEZ E GRAVA COM SERIES_ID COMUM
+def test_series_booking_reports_all_clashes(app):
+    with app.app_context():
+        res, srv, user = _setup_agenda()
+        first = datetime(2026, 6, 1, 10, 0)
+        # 3ª semana ocupada no recurso; 5ª semana ocupada na agenda do próprio paciente
+        outro = User(name="Outro", email="outro@teste.com")
+        outro.set_password("x")
+        db.session.add(outro)
+        db.session.flush()
+        db.session.add(Appointment(user_id=outro.id, service_id=srv.id, resource_id=res.id,
+                                   start_datetime=first + timedelta(weeks=2),
+                                   end_datetime=first + timedelta(weeks=2, minutes=50), status='confirmed'))
+        outro_srv = Service(name="Outro", duration_minutes=30, price_cents=100, category="Geral")
+        db.session.add(outro_srv)
+        db.session.flush()
+        db.session.add(Appointment(user_id=user.id, service_id=outro_srv.id,
+                                   start_datetime=first + timedelta(weeks=4, minutes=30),
+                                   end_datetime=first + timedelta(weeks=4, minutes=60), status='confirmed'))
+        db.session.commit()
+
+        created, clashes = book_series(srv, user.id, first, occurrences=6)
+        assert created == []
+        assert sorted(clashes) == [first + timedelta(weeks=2), first + timedelta(weeks=4)]
+
+        created, clashes = book_series(srv, user.id, first, occurrences=6, skip_conflicts=True)
+        assert len(created) == 4 and len(clashes) == 2
+        assert len({appt.series_id for appt in created}) == 1
+        assert Appointment.query.filter_by(series_id=created[0].series_id).count() == 4
+
+
+# TESTE 3: ESTRESSE MULTI-THREAD - NENHUMA RESERVA DUPLICADA
+def test_concurrent_booking_never_double_books(tmp_path, monkeypatch):
+    """Várias threads (como workers do gunicorn) disputando o MESMO horário num SQLite em arquivo."""
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'stress.db'}", raising=False)
+    workers = 24
+    # Uma conexão por thread (o pool padrão tem 5 + 10 de overflow)
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_ENGINE_OPTIONS',
+                        {'connect_args': {'timeout': 30}, 'pool_size': workers + 2}, raising=False)
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        res, srv, _ = _setup_agenda()
+        users = [User(name=f"P{i}", email=f"p{i}@teste.com", password_hash="x") for i in range(workers)]
+        db.session.add_all(users)
+        db.session.commit()
+        service_id, user_ids = srv.id, [u.id for u in users]
+        db.session.remove()
+
+    start = datetime(2026, 7, 1, 9, 0)
+    barrier = threading.Barrier(workers)
+    results = []
+
+    def tentar(user_id):
+        with app.app_context():
+            service = db.session.get(Service, service_id)
+            barrier.wait()
+            try:
+                reserve_slot(service, user_id, start, phone='5511999999999')
+                results.append('ok')
+            except SlotConflictError:
+                results.append('conflict')
+            finally:
+                db.session.remove()
+
+    threads = [threading.Thread(target=tentar, args=(uid,)) for uid in user_ids]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results.count('ok') == 1
+    assert results.count('conflict') == workers - 1
+    with app.app_context():
+        assert Appointment.query.filter_by(start_datetime=start).count() == 1
+        db.drop_all()
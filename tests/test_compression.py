@@ -0,0 +1,58 @@
+# Testes da compressão das respostas e dos estáticos pré-comprimidos
+import gzip
+from flask import Response
+from app.extensions import db
+from app.models import Service
+from app.utils.compression import precompress_static
+
+
+def test_html_comprimido_conforme_accept_encoding(app, client):
+    service = Service(name='Limpeza de Pele', category='Estética', duration_minutes=30, price_cents=10000)
+    db.session.add(service)
+    db.session.commit()
+
+    simples = client.get(f'/servico/{service.id}')
+    assert 'Content-Encoding' not in simples.headers
+
+    resposta = client.get(f'/servico/{service.id}', headers={'Accept-Encoding': 'gzip'})
+    assert resposta.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in resposta.headers['Vary']
+    assert gzip.decompress(resposta.data) == simples.data
+    assert int(resposta.headers['Content-Length']) < len(simples.data)
+
+    # O ETag vira fraco e continua validando o 304
+    etag = resposta.headers['ETag']
+    assert etag.startswith('W/')
+    assert client.get(f'/servico/{service.id}', headers={'If-None-Match': etag}).status_code == 304
+
+    # JSON pequeno fica abaixo do limite
+    pequeno = client.get('/api/servicos/sugestoes?q=li', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in pequeno.headers
+
+
+def test_stream_sse_nao_e_comprimido(app, client):
+    def eventos():
+        yield 'data: ' + 'x' * 2000 + '\n\n'
+
+    app.add_url_rule('/_teste/sse', 'teste_sse',
+                     lambda: Response(eventos(), mimetype='text/event-stream'))
+    resposta = client.get('/_teste/sse', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in resposta.headers
+    assert resposta.get_data(as_text=True).startswith('data: xxx')
+
+
+def test_estatico_pre_comprimido(app, client, tmp_path):
+    css = tmp_path / 'css' / 'site.css'
+    css.parent.mkdir()
+    css.write_text('.card { color: red; }\n' * 200)
+    app.static_folder = str(tmp_path)
+
+    assert precompress_static(str(tmp_path), encodings=('gzip',), log=lambda *_: None) == 1
+    assert precompress_static(str(tmp_path), encodings=('gzip',), log=lambda *_: None) == 0
+
+    resposta = client.get('/static/css/site.css', headers={'Accept-Encoding': 'gzip, deflate'})
+    assert resposta.headers['Content-Encoding'] == 'gzip'
+    assert resposta.mimetype == 'text/css'
+    assert gzip.decompress(resposta.data) == css.read_bytes()
+
+    assert client.get('/static/css/site.css').data == css.read_bytes()
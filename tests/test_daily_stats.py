@@ -0,0 +1,84 @@
+# Testes do rollup diário (daily_stats) usado pelos KPIs do dashboard
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.models import User, Service, Appointment, DailyStat
+from app.utils import daily_stats
+
+
+def _snapshot():
+    return sorted((s.day, s.service_id, s.status, s.appointment_count, s.revenue_cents)
+                  for s in DailyStat.query.all() if s.appointment_count or s.revenue_cents)
+
+
+def _setup():
+    srv = Service(name="Massagem", duration_minutes=60, price_cents=10000, category="Estética")
+    user = User(name="Paciente", email="rollup@teste.com")
+    user.set_password("senha_teste_123")
+    db.session.add_all([srv, user])
+    db.session.commit()
+    return srv, user
+
+
+def _appt(srv, user, start, status):
+    return Appointment(user_id=user.id, service_id=srv.id, start_datetime=start,
+                       end_datetime=start + timedelta(minutes=60), status=status)
+
+
+# TESTE 1: INSERT/UPDATE/DELETE MANTÊM O ROLLUP IGUAL À RECONSTRUÇÃO COMPLETA
+def test_rollup_tracks_changes_and_matches_rebuild(app):
+    with app.app_context():
+        srv, user = _setup()
+        dia = datetime(2026, 3, 10, 9, 0)
+        a1 = _appt(srv, user, dia, 'confirmed')
+        a2 = _appt(srv, user, dia + timedelta(hours=2), 'pending')
+        a3 = _appt(srv, user, dia + timedelta(days=1), 'completed')
+        db.session.add_all([a1, a2, a3])
+        db.session.commit()
+
+        assert daily_stats.revenue_cents(daily_stats.REVENUE_STATUSES_TOTAL) == 20000
+        assert daily_stats.appointment_count(status='pending') == 1
+
+        # Mudança de status e de dia, e exclusão
+        a2.status = 'confirmed'
+        a3.start_datetime = dia + timedelta(days=3)
+        db.session.commit()
+        db.session.delete(a1)
+        db.session.commit()
+
+        assert daily_stats.revenue_cents(daily_stats.REVENUE_STATUSES_TODAY, day=dia.date()) == 10000
+        assert daily_stats.appointment_count() == 2
+        assert daily_stats.appointment_count(status='pending') == 0
+
+        # Reajuste do serviço não muda a receita já registrada (nem na reconstrução)
+        srv.price_cents = 15000
+        db.session.commit()
+        a4 = _appt(srv, user, dia, 'confirmed')
+        db.session.add(a4)
+        db.session.commit()
+        assert a4.price_cents == 15000
+        assert daily_stats.revenue_cents(daily_stats.REVENUE_STATUSES_TODAY, day=dia.date()) == 25000
+
+        incremental = _snapshot()
+        daily_stats.rebuild_daily_stats()
+        db.session.commit()
+        assert _snapshot() == incremental
+
+
+# TESTE 2: DASHBOARD LÊ OS KPIs DO ROLLUP
+def test_dashboard_uses_rollup(app, client):
+    with app.app_context():
+        srv, user = _setup()
+        admin = User(name="Admin", email="admin-rollup@teste.com", is_admin=True, role='admin')
+        admin.set_password("senha_teste_123")
+        db.session.add(admin)
+        db.session.add(_appt(srv, user, datetime(2026, 1, 5, 10, 0), 'completed'))
+        db.session.commit()
+        admin_id = admin.id
+
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(admin_id)
+        sess['_fresh'] = True
+
+    response = client.get('/admin/dashboard')
+    assert response.status_code == 200
+    assert 'R$ 100' in response.get_data(as_text=True)
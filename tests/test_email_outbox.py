@@ -0,0 +1,112 @@
+# Testes do outbox de e-mails contra um servidor HTTP falso local
+import json
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from app.extensions import db
+from app.models import User, EmailOutbox
+from app.utils.email_outbox import enqueue_email, deliver_pending, purge_outbox, reset_providers, RateLimiter
+
+
+class FakeProvider(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive: permite verificar o pool de conexões
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.recebidos.append((self.client_address[1], self.headers['Authorization'], body))
+        status = self.server.respostas.pop(0) if self.server.respostas else 202
+        payload = b'{"id": "fake"}'
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_provider(app):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeProvider)
+    server.recebidos, server.respostas = [], []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    app.config.update(EMAIL_API_URL=f'http://127.0.0.1:{server.server_port}/emails',
+                      EMAIL_API_KEY='re_teste', EMAIL_RATE_PER_SECOND=1000)
+    reset_providers()
+    yield server
+    reset_providers()
+    server.shutdown()
+    server.server_close()
+
+
+# TESTE 1: ERRO 5XX VOLTA PARA A FILA COM BACKOFF; ENVIOS REAPROVEITAM A CONEXÃO
+def test_outbox_retries_with_backoff_over_pooled_session(app, fake_provider):
+    with app.app_context():
+        fake_provider.respostas = [503]
+        primeiro = enqueue_email('a@teste.com', 'Assunto A', '<p>A</p>')
+        segundo = enqueue_email('b@teste.com', 'Assunto B', '<p>B</p>')
+        db.session.commit()
+
+        assert deliver_pending() == (1, 1)
+        assert primeiro.status == 'pending' and primeiro.attempts == 1
+        assert primeiro.next_attempt_at > datetime.utcnow()
+        assert segundo.status == 'sent'
+
+        # Antes do backoff vencer nada é reenviado; depois, sim
+        assert deliver_pending() == (0, 0)
+        assert deliver_pending(now=datetime.utcnow() + timedelta(hours=1)) == (1, 0)
+        assert db.session.get(EmailOutbox, primeiro.id).status == 'sent'
+        assert primeiro.html == ''
+
+    portas = {porta for porta, _, _ in fake_provider.recebidos}
+    assert len(fake_provider.recebidos) == 3 and len(portas) == 1
+    assert all(auth == 'Bearer re_teste' for _, auth, _ in fake_provider.recebidos)
+
+
+# TESTE 2: 4XX É DEFINITIVO; A ROTA DE RECUPERAÇÃO SÓ ENFILEIRA
+def test_outbox_permanent_failure_and_view_only_enqueues(app, client, fake_provider):
+    with app.app_context():
+        user = User(name="Esquecido", email="esquecido@teste.com")
+        user.set_password("senha_teste_123")
+        db.session.add(user)
+        db.session.commit()
+
+    response = client.post('/auth/reset_password_request', data={'email': 'esquecido@teste.com'})
+    assert response.status_code == 302
+    assert fake_provider.recebidos == []
+
+    with app.app_context():
+        msg = EmailOutbox.query.filter_by(to_email='esquecido@teste.com').one()
+        assert msg.status == 'pending' and 'reset_password' in msg.html
+
+        fake_provider.respostas = [422]
+        assert deliver_pending() == (0, 1)
+        msg = db.session.get(EmailOutbox, msg.id)
+        assert msg.status == 'failed'
+        # O link com o token não fica guardado depois de finalizada a mensagem
+        assert msg.html == ''
+
+        # Retenção: só linhas finalizadas e antigas são apagadas
+        pendente = enqueue_email('outro@teste.com', 'Assunto', '<p>X</p>')
+        db.session.commit()
+        assert purge_outbox() == 0
+        assert purge_outbox(now=datetime.utcnow() + timedelta(days=8)) == 1
+        assert EmailOutbox.query.one().id == pendente.id
+
+
+# TESTE 3: LIMITADOR RESPEITA A TAXA CONFIGURADA
+def test_rate_limiter_spaces_sends():
+    relogio = [0.0]
+    esperas = []
+
+    def dormir(segundos):
+        esperas.append(segundos)
+        relogio[0] += segundos
+
+    limiter = RateLimiter(2, burst=1, clock=lambda: relogio[0], sleep=dormir)
+    for _ in range(3):
+        limiter.acquire()
+    assert esperas == [0.5, 0.5]
@@ -0,0 +1,119 @@
+# Testes do barramento de eventos de agendamento
+import os
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.models import User, Service, Appointment
+from app.utils.events import bus, AppointmentEvent, EventBus, FileBackend, InProcessBackend
+
+
+def _setup():
+    srv = Service(name="Consulta", duration_minutes=30, price_cents=5000, category="Geral")
+    user = User(name="Paciente", email="eventos@teste.com")
+    user.set_password("senha_teste_123")
+    db.session.add_all([srv, user])
+    db.session.commit()
+    return srv, user
+
+
+# TESTE 1: EVENTOS SÓ SAEM DEPOIS DO COMMIT, COM TIPO E STATUS ANTERIOR
+def test_events_published_after_commit_only(app):
+    recebidos = []
+    bus.subscribe(recebidos.append)
+    try:
+        with app.app_context():
+            srv, user = _setup()
+            start = datetime(2026, 5, 4, 10, 0)
+            appt = Appointment(user_id=user.id, service_id=srv.id, start_datetime=start,
+                               end_datetime=start + timedelta(minutes=30), status='pending')
+            db.session.add(appt)
+            db.session.commit()
+
+            appt.status = 'confirmed'
+            db.session.flush()
+            db.session.rollback()
+            assert [e.kind for e in recebidos] == ['created']
+
+            appt.status = 'cancelled'
+            db.session.commit()
+            evt = recebidos[-1]
+            assert (evt.kind, evt.status, evt.previous_status) == ('status_changed', 'cancelled', 'pending')
+            assert evt.slots[0][1] == srv.id and not evt.is_remote
+    finally:
+        bus.unsubscribe(recebidos.append)
+
+
+# TESTE 2: BACKEND DE ARQUIVO ENTREGA SÓ EVENTOS DE OUTROS WORKERS
+def test_file_backend_delivers_remote_events(tmp_path):
+    path = str(tmp_path / 'events.log')
+    recebidos = []
+    worker = EventBus(FileBackend(path))
+    worker.subscribe(recebidos.append)
+    worker.backend.poll(worker)  # posiciona a leitura
+
+    outro = FileBackend(path)
+    outro.publish(AppointmentEvent('status_changed', 7, 'arrived', 'confirmed', origin='outro-worker'))
+    worker.publish(AppointmentEvent('created', 8, 'pending'))  # local: entregue uma vez só
+    worker.backend.poll(worker)
+
+    assert [(e.appointment_id, e.is_remote) for e in recebidos] == [(8, False), (7, True)]
+
+
+# TESTE 3: ROTAÇÃO DO ARQUIVO NÃO PERDE EVENTOS NEM DEIXA O LOG CRESCER
+def test_file_backend_rotates_without_losing_events(tmp_path):
+    path = str(tmp_path / 'events.log')
+    recebidos = []
+    worker = EventBus(FileBackend(path))
+    worker.subscribe(recebidos.append)
+    worker.backend.poll(worker)
+
+    outro = FileBackend(path, max_bytes=300)
+    for i in range(10):
+        outro.publish(AppointmentEvent('created', i, 'pending', origin='outro-worker'))
+        if i % 3 == 0:
+            worker.backend.poll(worker)
+    worker.backend.poll(worker)
+
+    assert [e.appointment_id for e in recebidos] == list(range(10))
+    assert os.path.getsize(path) < 300 and os.path.exists(path + '.1')
+
+
+class NotifyBackend(InProcessBackend):
+    """Backend transacional de mentira: registra os NOTIFY e os publish."""
+    transactional = True
+
+    def __init__(self):
+        self.notificados, self.publicados = [], []
+
+    def notify(self, connection, evt):
+        self.notificados.append(evt.kind)
+
+    def publish(self, evt):
+        self.publicados.append(evt.kind)
+
+
+# TESTE 4: BACKEND TRANSACIONAL NOTIFICA NO FLUSH E NÃO PUBLICA DE NOVO NO COMMIT
+def test_transactional_backend_notifies_inside_transaction(app):
+    recebidos = []
+    backend = NotifyBackend()
+    bus.set_backend(backend)
+    bus.subscribe(recebidos.append)
+    try:
+        with app.app_context():
+            srv, user = _setup()
+            start = datetime(2026, 5, 4, 10, 0)
+            appt = Appointment(user_id=user.id, service_id=srv.id, start_datetime=start,
+                               end_datetime=start + timedelta(minutes=30), status='pending')
+            db.session.add(appt)
+            db.session.flush()
+            assert backend.notificados == ['created'] and recebidos == []
+            db.session.commit()
+            assert [e.kind for e in recebidos] == ['created'] and backend.publicados == []
+
+            appt.status = 'confirmed'
+            db.session.flush()
+            db.session.rollback()
+            assert backend.notificados == ['created', 'status_changed']
+            assert len(recebidos) == 1
+    finally:
+        bus.unsubscribe(recebidos.append)
+        bus.set_backend(InProcessBackend())
@@ -0,0 +1,70 @@
+# Testes do feed de agendamentos paginado por cursor (keyset)
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.models import User, Service, Appointment
+from app.utils.feed import feed_page, parse_feed_filters
+
+
+def _popular(total=23):
+    srv = Service(name="Avaliação", duration_minutes=30, price_cents=5000, category="Geral")
+    outro = Service(name="Retorno", duration_minutes=30, price_cents=3000, category="Geral")
+    user = User(name="Paciente", email="feed@teste.com")
+    user.set_password("senha_teste_123")
+    db.session.add_all([srv, outro, user])
+    db.session.flush()
+
+    base = datetime(2026, 4, 1, 8, 0)
+    for i in range(total):
+        # Pares com o mesmo horário: o desempate por id não pode perder nem repetir linhas
+        start = base + timedelta(hours=i // 2)
+        db.session.add(Appointment(user_id=user.id, service_id=(srv.id if i % 3 else outro.id),
+                                   start_datetime=start, end_datetime=start + timedelta(minutes=30),
+                                   status='confirmed' if i % 2 else 'pending'))
+    db.session.commit()
+    return srv, outro, user
+
+
+# TESTE 1: PERCORRER TODAS AS PÁGINAS DEVOLVE CADA AGENDAMENTO UMA ÚNICA VEZ, EM ORDEM
+def test_keyset_pages_cover_everything_once(app):
+    with app.app_context():
+        _popular()
+        vistos, cursor = [], None
+        while True:
+            items, cursor = feed_page({}, cursor, limit=5)
+            vistos.extend(items)
+            if not cursor:
+                break
+
+        assert len(vistos) == 23
+        assert len({a.id for a in vistos}) == 23
+        chaves = [(a.start_datetime, a.id) for a in vistos]
+        assert chaves == sorted(chaves, reverse=True)
+
+
+# TESTE 2: FILTROS, LIMITE MÁXIMO E API
+def test_feed_filters_and_api(app, client):
+    with app.app_context():
+        srv, outro, _ = _popular()
+        filtros = parse_feed_filters({'status': 'pending', 'service_id': str(outro.id),
+                                      'inicio': '2026-04-01', 'fim': '2026-04-01'})
+        items, _ = feed_page(filtros, limit=100)
+        assert items and all(a.status == 'pending' and a.service_id == outro.id for a in items)
+
+        app.config['FEED_MAX_PAGE_SIZE'] = 4
+        items, cursor = feed_page({}, limit=1000)
+        assert len(items) == 4 and cursor
+
+        admin = User(name="Admin", email="admin-feed@teste.com", is_admin=True, role='admin')
+        admin.set_password("senha_teste_123")
+        db.session.add(admin)
+        db.session.commit()
+        admin_id = admin.id
+
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(admin_id)
+        sess['_fresh'] = True
+
+    data = client.get(f'/admin/api/agendamentos?cursor={cursor}').get_json()
+    assert len(data['items']) == 4 and '<tr' in data['html']
+    assert client.get('/admin/api/agendamentos?cursor=lixo').status_code == 400
+    assert client.get('/admin/all-appointments?status=pending').status_code == 200
@@ -0,0 +1,43 @@
+# Testes de ETag/304 nas páginas públicas e dos assets com impressão digital
+import re
+from app.extensions import db
+from app.models import Service
+
+
+def test_etag_e_304_nas_paginas_publicas(app, client):
+    service = Service(name='Limpeza de Pele', category='Estética', duration_minutes=30, price_cents=10000)
+    db.session.add(service)
+    db.session.commit()
+
+    primeira = client.get(f'/servico/{service.id}')
+    assert primeira.status_code == 200
+    etag = primeira.headers['ETag']
+    assert primeira.headers['Last-Modified']
+    assert 'must-revalidate' in primeira.headers['Cache-Control']
+
+    repetida = client.get(f'/servico/{service.id}', headers={'If-None-Match': etag})
+    assert repetida.status_code == 304 and repetida.data == b''
+    data = client.get('/servicos', headers={'If-Modified-Since': primeira.headers['Last-Modified']})
+    assert data.status_code == 304
+
+    # Mudou o catálogo: o ETag antigo não vale mais
+    service.price_cents = 12000
+    db.session.commit()
+    depois = client.get(f'/servico/{service.id}', headers={'If-None-Match': etag})
+    assert depois.status_code == 200 and depois.headers['ETag'] != etag
+
+
+def test_static_url_com_impressao_digital_e_cache_imutavel(app, client):
+    with app.test_request_context():
+        url = app.jinja_env.globals['static_url']('css/main.css')
+    assert re.match(r'^/static/css/main\.[0-9a-f]{12}\.css$', url)
+
+    resposta = client.get(url)
+    assert resposta.status_code == 200
+    assert 'immutable' in resposta.headers['Cache-Control']
+    assert 'max-age=31536000' in resposta.headers['Cache-Control']
+
+    # Hash desatualizado ainda entrega o arquivo, mas sem cache longo
+    antiga = client.get('/static/css/main.000000000000.css')
+    assert antiga.status_code == 200 and 'immutable' not in antiga.headers.get('Cache-Control', '')
+    assert client.get('/static/css/main.css').status_code == 200
@@ -0,0 +1,54 @@
+# Testes do pipeline de derivados WebP (flask images build) e do srcset
+import json
+import os
+import pytest
+from app.utils.images import build_images, image_srcset
+
+Image = pytest.importorskip('PIL.Image')
+
+
+@pytest.fixture
+def static_dir(app, tmp_path):
+    pasta = tmp_path / 'assets' / 'img' / 'services'
+    pasta.mkdir(parents=True)
+    Image.new('RGB', (1000, 500), (200, 40, 40)).save(pasta / 'cardio.png')
+    Image.new('RGB', (400, 400), (40, 200, 40)).save(pasta / 'fisio.png')
+    app.static_folder = str(tmp_path)
+    app.config.update(IMAGE_WIDTHS=(320, 640, 1280), IMAGE_SOURCE_DIRS=('assets/img/services',))
+    return tmp_path
+
+
+def test_build_incremental_com_manifesto(app, static_dir):
+    assert build_images(app, workers=2, log=lambda *_: None) == (2, 0, 0)
+
+    manifest = json.loads((static_dir / 'assets/img/derived/manifest.json').read_text())
+    cardio = manifest['assets/img/services/cardio.png']
+    # Nunca amplia: 1000px vira 320/640/1000, 400px vira 320/400
+    assert [v['width'] for v in cardio['variants']] == [320, 640, 1000]
+    assert [v['width'] for v in manifest['assets/img/services/fisio.png']['variants']] == [320, 400]
+    arquivo = static_dir / cardio['variants'][0]['file']
+    with Image.open(arquivo) as img:
+        assert img.format == 'WEBP' and img.size == (320, 160)
+
+    # Nada mudou: nada é reprocessado
+    assert build_images(app, log=lambda *_: None) == (0, 2, 0)
+
+    # Só a origem alterada é refeita; as variantes antigas dela são apagadas
+    Image.new('RGB', (1000, 500), (10, 10, 200)).save(static_dir / 'assets/img/services/cardio.png')
+    assert build_images(app, workers=1, log=lambda *_: None) == (1, 1, 3)
+    assert not arquivo.exists()
+
+
+def test_srcset_e_cache_imutavel_das_variantes(app, client, static_dir):
+    assert image_srcset('assets/img/services/cardio.png') == ''
+    build_images(app, workers=1, log=lambda *_: None)
+
+    with app.test_request_context():
+        srcset = image_srcset('assets/img/services/cardio.png')
+    partes = [p.strip().split(' ') for p in srcset.split(',')]
+    assert [largura for _url, largura in partes] == ['320w', '640w', '1000w']
+
+    resposta = client.get(partes[0][0])
+    assert resposta.status_code == 200 and resposta.mimetype == 'image/webp'
+    assert 'immutable' in resposta.headers['Cache-Control']
+    assert os.path.basename(partes[0][0]).startswith('cardio-320.')
@@ -0,0 +1,85 @@
+# Testes do limitador de login (janela deslizante por IP/e-mail)
+from flask import request
+from app import create_app
+from app.config import TestingConfig
+from app.extensions import db
+from app.models import User
+from app.utils.throttle import LoginThrottle, MemoryBackend, SQLiteFileBackend, get_login_throttle
+
+
+class Relogio:
+    def __init__(self, agora=1000.0):
+        self.agora = agora
+
+    def __call__(self):
+        return self.agora
+
+
+def test_janela_deslizante_por_email_e_por_ip():
+    relogio = Relogio(1200.0)  # início exato de uma janela de 300s
+    throttle = LoginThrottle(MemoryBackend(), window=300, ip_limit=5, email_limit=3, clock=relogio)
+
+    assert [throttle.check('10.0.0.1', 'a@x.com') for _ in range(3)] == [0, 0, 0]
+    assert throttle.check('10.0.0.1', 'A@x.com ') > 0      # e-mail normalizado
+    assert throttle.check('10.0.0.1', 'b@x.com') == 0      # outro e-mail, mesmo IP
+    assert throttle.check('10.0.0.1', 'c@x.com') > 0       # IP estourou (5 tentativas)
+    assert throttle.check('10.0.0.2', 'c@x.com') == 0      # ...e a cota de c@ não foi gasta
+
+    # Janela seguinte: a anterior ainda pesa, e some por completo depois de 2 janelas
+    relogio.agora = 1500.0
+    assert throttle.check('10.0.0.3', 'a@x.com') > 0
+    relogio.agora = 2100.0
+    assert throttle.check('10.0.0.3', 'a@x.com') == 0
+
+
+def test_backend_sqlite_compartilhado_entre_processos(tmp_path):
+    path = str(tmp_path / 'throttle.db')
+    relogio = Relogio(1200.0)
+    # Duas instâncias no mesmo arquivo simulam dois workers do gunicorn
+    worker_a = LoginThrottle(SQLiteFileBackend(path), ip_limit=100, email_limit=2, clock=relogio)
+    worker_b = LoginThrottle(SQLiteFileBackend(path), ip_limit=100, email_limit=2, clock=relogio)
+
+    assert worker_a.check('10.0.0.1', 'a@x.com') == 0
+    assert worker_b.check('10.0.0.1', 'a@x.com') == 0
+    assert worker_a.check('10.0.0.1', 'a@x.com') > 0
+
+
+def test_login_recusado_com_429_sem_tocar_no_lockout(app, client):
+    app.config.update(LOGIN_THROTTLE_EMAIL_LIMIT=2)
+    app.extensions.pop('login_throttle', None)
+    user = User(name='Cliente', email='cliente@teste.com', role='client')
+    user.set_password('Senha@123')
+    db.session.add(user)
+    db.session.commit()
+
+    dados = {'email': 'cliente@teste.com', 'password': 'errada'}
+    assert client.post('/auth/login', data=dados).status_code == 302
+    assert client.post('/auth/login', data=dados).status_code == 302
+
+    resposta = client.post('/auth/login', data=dados)
+    assert resposta.status_code == 429
+    assert 'Muitas tentativas' in resposta.get_data(as_text=True)
+    assert isinstance(get_login_throttle(app).backend, MemoryBackend)
+
+    db.session.refresh(user)
+    assert user.failed_login_attempts == 2
+    assert not user.is_locked
+
+
+def test_ip_do_cliente_atras_do_proxy(monkeypatch):
+    """O limitador usa request.remote_addr: atrás do balanceador ele precisa ser o cliente."""
+    monkeypatch.setattr(TestingConfig, 'TRUSTED_PROXY_HOPS', 1, raising=False)
+    app = create_app('testing')
+    app.add_url_rule('/_ip', 'ip', lambda: request.remote_addr)
+    client = app.test_client()
+    proxy = {'REMOTE_ADDR': '10.0.0.1'}
+
+    # Só o salto adicionado pelo proxy confiável vale; o primeiro foi forjado pelo cliente
+    resposta = client.get('/_ip', headers={'X-Forwarded-For': '6.6.6.6, 203.0.113.9'}, environ_base=proxy)
+    assert resposta.get_data(as_text=True) == '203.0.113.9'
+
+    monkeypatch.setattr(TestingConfig, 'TRUSTED_PROXY_HOPS', 0, raising=False)
+    app = create_app('testing')
+    app.add_url_rule('/_ip', 'ip', lambda: request.remote_addr)
+    resposta = app.test_client().get('/_ip', headers={'X-Forwarded-For': '6.6.6.6'}, environ_base=proxy)
+    assert resposta.get_data(as_text=True) == '10.0.0.1'
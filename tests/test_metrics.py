@@ -0,0 +1,43 @@
+# Testes da instrumentação por requisição (Server-Timing e /admin/metrics)
+from app.extensions import db
+from app.models import Service, User
+from app.utils.metrics import request_duration, sql_queries, reset_metrics
+
+
+def test_server_timing_e_histogramas(app, client):
+    reset_metrics()
+    db.session.add(Service(name='Limpeza de Pele', category='Estética', duration_minutes=30, price_cents=10000))
+    db.session.commit()
+
+    resposta = client.get('/servicos')
+    timing = resposta.headers.getlist('Server-Timing')
+    assert [t.split(';')[0] for t in timing] == ['app', 'db', 'tpl']
+    consultas = int(timing[1].split('desc="')[1].split(' ')[0])
+    assert consultas >= 2
+
+    assert request_duration.snapshot('main.list_services', 'GET')[0] == 1
+    assert sql_queries.snapshot('main.list_services', 'GET') == (1, consultas)
+
+    # Página em cache (anônimo): nenhuma consulta de catálogo, só a versão
+    client.get('/servicos')
+    total, soma = sql_queries.snapshot('main.list_services', 'GET')
+    assert total == 2 and soma - consultas < consultas
+
+
+def test_endpoint_prometheus_somente_admin(app, client):
+    admin = User(name='Admin', email='admin@teste.com', role='admin', is_admin=True)
+    admin.set_password('Senha@123')
+    db.session.add(admin)
+    db.session.commit()
+
+    assert client.get('/admin/metrics').status_code == 302
+
+    client.post('/auth/login', data={'email': 'admin@teste.com', 'password': 'Senha@123'})
+    client.get('/')
+    resposta = client.get('/admin/metrics')
+    assert resposta.status_code == 200
+    assert resposta.mimetype == 'text/plain'
+    corpo = resposta.get_data(as_text=True)
+    assert '# TYPE agendai_request_duration_seconds histogram' in corpo
+    assert 'agendai_request_duration_seconds_bucket{endpoint="main.index",method="GET",le="+Inf"}' in corpo
+    assert 'agendai_requests_total{endpoint="auth.login",method="POST",status="302"}' in corpo
@@ -63,4 +63,23 @@ def test_appointment_conflict(app):
         # Tentamos verificar o MESMO horário que acabamos de ocupar
         has_conflict = Appointment.check_resource_conflict(srv.id, start, end)
         
-        assert has_conflict is True # Se for True, o teste passa!
\ No newline at end of file
+        assert has_conflict is True # Se for True, o teste passa!
+# TESTE 3: HASH COM POLÍTICA ANTIGA É REFEITO NO LOGIN
+def test_password_rehash_on_login(app):
+    """Troca de PASSWORD_HASH_METHOD vale para usuários antigos no próximo login"""
+    with app.app_context():
+        app.config['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:1000'
+        user = User(name="Antigo", email="antigo@teste.com")
+        user.set_password("senha123")
+        db.session.add(user)
+        db.session.commit()
+        assert user.password_hash.startswith('pbkdf2:sha256:1000$')
+
+        app.config['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:2000'
+        # Senha errada não mexe no hash
+        assert user.check_password("errada") is False
+        assert user.password_hash.startswith('pbkdf2:sha256:1000$')
+
+        assert user.check_password("senha123") is True
+        assert user.password_hash.startswith('pbkdf2:sha256:2000$')
+        assert user.check_password("senha123") is True
@@ -0,0 +1,52 @@
+# Testes do cache das páginas públicas do catálogo
+from app.extensions import db
+from app.models import Service, Resource, User
+from app.utils.page_cache import catalog_version, CATALOG_COUNTER
+from app.utils.counters import bump_counter, read_counter, read_counter_state
+
+
+def test_pagina_publica_em_cache_ate_o_catalogo_mudar(app, client):
+    service = Service(name='Limpeza de Pele', category='Estética', duration_minutes=30, price_cents=10000)
+    db.session.add(service)
+    db.session.commit()
+    versao = read_counter(CATALOG_COUNTER)
+    assert versao >= 1
+
+    assert 'Limpeza de Pele' in client.get('/servicos').get_data(as_text=True)
+
+    # Escrita fora do ORM não muda a versão: a página continua vindo do cache
+    db.session.execute(Service.__table__.update().values(name='Nome Direto no Banco'))
+    db.session.commit()
+    assert 'Limpeza de Pele' in client.get('/servicos').get_data(as_text=True)
+
+    # Edição pelo ORM (manage_service/new_resource/edit_resource) sobe a versão
+    db.session.add(Resource(name='Dra. Ana', category='Dermatologia'))
+    db.session.commit()
+    assert read_counter(CATALOG_COUNTER) == versao + 1
+    html = client.get('/servicos').get_data(as_text=True)
+    assert 'Nome Direto no Banco' in html and 'Limpeza de Pele' not in html
+
+
+def test_usuario_logado_nao_recebe_pagina_em_cache(app, client):
+    db.session.add(Service(name='Peeling', category='Estética', duration_minutes=30, price_cents=10000))
+    admin = User(name='Admin', email='admin@teste.com', role='admin', is_admin=True)
+    admin.set_password('Senha@123')
+    db.session.add(admin)
+    db.session.commit()
+
+    assert 'Peeling' in client.get('/').get_data(as_text=True)
+    client.post('/auth/login', data={'email': 'admin@teste.com', 'password': 'Senha@123'})
+    html = client.get('/').get_data(as_text=True)
+    assert 'Dashboard' in html
+
+    with app.test_request_context():
+        assert catalog_version() == read_counter(CATALOG_COUNTER)
+
+
+def test_contador_criado_e_incrementado_por_upsert(app):
+    assert read_counter_state('teste') == (0, None)
+    bump_counter('teste')
+    bump_counter('teste')
+    db.session.commit()
+    valor, atualizado_em = read_counter_state('teste')
+    assert valor == 2 and atualizado_em is not None
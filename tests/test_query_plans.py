@@ -0,0 +1,71 @@
+# Testes de plano de execução: as queries quentes precisam usar os índices compostos
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.models import Resource, Service, Appointment
+
+
+def explain(query):
+    """EXPLAIN no dialeto atual (SQLite: EXPLAIN QUERY PLAN | PostgreSQL: EXPLAIN)."""
+    conn = db.session.connection()
+    compiled = query.statement.compile(dialect=conn.dialect, compile_kwargs={"render_postcompile": True})
+    if conn.dialect.name == 'postgresql':
+        # Tabelas de teste são minúsculas: sem isso o planner sempre prefere seq scan
+        conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        rows = conn.exec_driver_sql("EXPLAIN " + str(compiled), compiled.params).fetchall()
+    else:
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + str(compiled), params).fetchall()
+    return "\n".join(str(row[-1]) for row in rows)
+
+
+def _services():
+    res = Resource(name="Consultório Plano", category="Geral")
+    db.session.add(res)
+    db.session.flush()
+    com_recurso = Service(name="Com Recurso", duration_minutes=30, price_cents=100,
+                          resource_id=res.id, category="Geral")
+    sem_recurso = Service(name="Sem Recurso", duration_minutes=30, price_cents=100, category="Geral")
+    db.session.add_all([com_recurso, sem_recurso])
+    db.session.commit()
+    return com_recurso, sem_recurso
+
+
+def _overlap(query):
+    start = datetime(2026, 2, 2, 10, 0)
+    return query.filter(Appointment.start_datetime < start + timedelta(minutes=30),
+                        Appointment.end_datetime > start)
+
+
+def test_resource_conflict_uses_composite_index(app):
+    with app.app_context():
+        com_recurso, _ = _services()
+        plan = explain(_overlap(Appointment.blocking_query(com_recurso)))
+        assert 'ix_appointment_resource_id_start_datetime' in plan or \
+               'ix_appointment_active_start_datetime' in plan
+
+
+def test_service_conflict_uses_composite_index(app):
+    with app.app_context():
+        _, sem_recurso = _services()
+        plan = explain(_overlap(Appointment.blocking_query(sem_recurso)))
+        assert 'ix_appointment_service_id_start_datetime' in plan
+
+
+def test_my_appointments_uses_user_index(app):
+    with app.app_context():
+        query = Appointment.query.filter_by(user_id=1).order_by(Appointment.start_datetime.desc())
+        plan = explain(query)
+        assert 'ix_appointment_user_id_start_datetime' in plan
+        # O índice já entrega a ordenação: nada de ordenar em memória
+        assert 'TEMP B-TREE' not in plan and 'Sort' not in plan
+
+
+def test_dashboard_today_filter_is_sargable(app):
+    with app.app_context():
+        query = Appointment.query.filter(
+            Appointment.on_day(datetime(2026, 2, 2).date()),
+            Appointment.status != 'cancelled'
+        ).order_by(Appointment.start_datetime.asc())
+        plan = explain(query)
+        assert 'ix_appointment_start_datetime' in plan or 'ix_appointment_active_start_datetime' in plan
+        assert 'SCAN appointment' not in plan and 'Seq Scan' not in plan
@@ -0,0 +1,72 @@
+# Testes da busca do catálogo (índice FTS) e do autocomplete
+from app.extensions import db
+from app.models import Service
+from app.utils.search import search_services, autocomplete, rebuild_search_index
+
+
+def _service(name, category='Estética', **campos):
+    service = Service(name=name, category=category, duration_minutes=30, price_cents=10000, **campos)
+    db.session.add(service)
+    return service
+
+
+def test_busca_ranqueada_sem_acento_em_todos_os_campos(app):
+    limpeza = _service('Limpeza de Pele', description='Remove impurezas e cravos.')
+    peeling = _service('Peeling Químico', content='Renova a pele com ácidos.')
+    cardio = _service('Eletrocardiograma', category='Cardiologia', indications='Arritmia e palpitações.')
+    db.session.commit()
+
+    # Acento, caixa e prefixo; o nome pesa mais que o texto
+    assert search_services('PELE') == [limpeza, peeling]
+    assert search_services('quimic') == [peeling]
+    assert search_services('palpitacoes') == [cardio]
+    assert search_services('cardiologia') == [cardio]
+    assert search_services('pele', category='Cardiologia') == []
+
+    # manage_service salva pelo ORM: o índice acompanha edições e exclusões
+    cardio.content = 'Exame rápido e indolor.'
+    peeling.active = False
+    db.session.commit()
+    assert search_services('indolor') == [cardio]
+    assert search_services('pele') == [limpeza]
+
+    db.session.delete(limpeza)
+    db.session.commit()
+    assert search_services('pele') == []
+    assert rebuild_search_index() == 2
+    db.session.commit()
+    assert search_services('indolor') == [cardio]
+
+
+def test_limite_aplicado_depois_dos_filtros(app):
+    # Inativos/de outra categoria mais relevantes não podem ocupar as vagas do LIMIT
+    for i in range(3):
+        _service(f'Pele Especial {i}', active=False)
+    _service('Pele Cardio', category='Cardiologia')
+    ativo = _service('Hidratação', description='Cuida da pele.')
+    db.session.commit()
+
+    assert search_services('pele', category='Estética', limit=1) == [ativo]
+    assert len(search_services('', limit=1)) == 1
+
+
+def test_autocomplete_por_prefixo(app, client):
+    _service('Limpeza de Pele')
+    _service('Laser Lavieen')
+    _service('Toxina Botulínica')
+    db.session.commit()
+
+    nomes = [s['name'] for s in autocomplete.suggest('la')]
+    assert nomes == ['Laser Lavieen']
+    assert [s['name'] for s in autocomplete.suggest('pel')] == ['Limpeza de Pele']
+    assert [s['name'] for s in autocomplete.suggest('botulinica')] == ['Toxina Botulínica']
+
+    # Serviço novo invalida o índice em memória no commit
+    _service('Lavagem Capilar')
+    db.session.commit()
+    resposta = client.get('/api/servicos/sugestoes?q=LA')
+    assert resposta.status_code == 200
+    assert [s['name'] for s in resposta.get_json()['suggestions']] == ['Laser Lavieen', 'Lavagem Capilar']
+
+    html = client.get('/?q=pele').get_data(as_text=True)
+    assert 'Limpeza de Pele' in html and 'Toxina' not in html
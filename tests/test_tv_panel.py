@@ -0,0 +1,155 @@
+# Testes do painel TV: contador de mudanças e canal SSE
+from datetime import timedelta
+from app.extensions import db
+from app.models import User, Service, Appointment
+from app.utils.clock import local_now
+from app.utils.counters import read_counter
+from app.utils.tv_queue import TV_COUNTER
+
+
+def _setup():
+    srv = Service(name="Consulta", duration_minutes=30, price_cents=5000, category="Geral")
+    paciente = User(name="Maria TV", email="tv@teste.com")
+    admin = User(name="Admin", email="admin-tv@teste.com", is_admin=True, role='admin')
+    for u in (paciente, admin):
+        u.set_password("senha_teste_123")
+    db.session.add_all([srv, paciente, admin])
+    db.session.commit()
+    return srv, paciente, admin
+
+
+# TESTE 1: SÓ MUDANÇAS QUE ENTRAM/SAEM DA FILA INCREMENTAM O CONTADOR
+def test_tv_counter_tracks_queue_changes(app):
+    with app.app_context():
+        srv, paciente, _ = _setup()
+        start = local_now().replace(second=0, microsecond=0)
+        appt = Appointment(user_id=paciente.id, service_id=srv.id, start_datetime=start,
+                           end_datetime=start + timedelta(minutes=30), status='pending')
+        db.session.add(appt)
+        db.session.commit()
+        assert read_counter(TV_COUNTER) == 0
+
+        appt.status = 'confirmed'
+        db.session.commit()
+        appt.status = 'in_progress'
+        db.session.commit()
+        appt.status = 'completed'
+        db.session.commit()
+        assert read_counter(TV_COUNTER) == 3
+
+        appt.phone = '11999999999'
+        db.session.commit()
+        assert read_counter(TV_COUNTER) == 3
+
+
+# TESTE 2: SSE ENVIA O SNAPSHOT E, COM LAST-EVENT-ID ATUAL, SÓ HEARTBEAT
+def test_tv_stream_sends_snapshot_then_heartbeat(app, client):
+    with app.app_context():
+        srv, paciente, admin = _setup()
+        start = local_now().replace(second=0, microsecond=0)
+        db.session.add(Appointment(user_id=paciente.id, service_id=srv.id, start_datetime=start,
+                                   end_datetime=start + timedelta(minutes=30), status='in_progress'))
+        db.session.commit()
+        admin_id = admin.id
+    app.config['SSE_HEARTBEAT_SECONDS'] = 0.05
+
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(admin_id)
+        sess['_fresh'] = True
+
+    resp = client.get('/admin/api/atendimentos_tv/stream', buffered=False)
+    assert resp.mimetype == 'text/event-stream'
+    chunks = (c.decode() for c in resp.response)
+    assert next(chunks).startswith('retry:')
+    evento = next(chunks)
+    assert 'event: fila' in evento and 'Maria TV' in evento
+    versao = evento.split('\n')[0][len('id: '):]
+    resp.close()
+
+    resp = client.get('/admin/api/atendimentos_tv/stream', buffered=False,
+                      headers={'Last-Event-ID': versao})
+    chunks = (c.decode() for c in resp.response)
+    next(chunks)
+    assert next(chunks) == ": ping\n\n"
+    resp.close()
+
+
+# TESTE 3: GET CONDICIONAL DEVOLVE 304 ATÉ A FILA MUDAR
+def test_tv_api_etag_and_rooms(app, client):
+    with app.app_context():
+        srv, paciente, admin = _setup()
+        start = local_now().replace(second=0, microsecond=0)
+        appts = [Appointment(user_id=paciente.id, service_id=srv.id,
+                             start_datetime=start + timedelta(minutes=i),
+                             end_datetime=start + timedelta(minutes=30 + i), status='in_progress')
+                 for i in range(3)]
+        db.session.add_all(appts)
+        db.session.commit()
+        admin_id, appt_id = admin.id, appts[0].id
+
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(admin_id)
+        sess['_fresh'] = True
+
+    resp = client.get('/admin/api/atendimentos_tv')
+    assert [a['sala'] for a in resp.get_json()['atendimentos']] == ['SALA 1', 'SALA 2', 'SALA 3']
+    etag = resp.headers['ETag']
+
+    assert client.get('/admin/api/atendimentos_tv', headers={'If-None-Match': etag}).status_code == 304
+
+    with app.app_context():
+        db.session.get(Appointment, appt_id).status = 'confirmed'
+        db.session.commit()
+
+    resp = client.get('/admin/api/atendimentos_tv', headers={'If-None-Match': etag})
+    assert resp.status_code == 200 and len(resp.get_json()['espera']) == 1
+
+
+# TESTE 4: 304 CONTINUA FUNCIONANDO QUANDO A RESPOSTA SAI COMPRIMIDA (ETAG FRACO)
+def test_tv_api_304_com_gzip(app, client):
+    app.config['COMPRESS_MIN_SIZE'] = 0
+    with app.app_context():
+        srv, paciente, admin = _setup()
+        start = local_now().replace(second=0, microsecond=0)
+        db.session.add(Appointment(user_id=paciente.id, service_id=srv.id, start_datetime=start,
+                                   end_datetime=start + timedelta(minutes=30), status='in_progress'))
+        db.session.commit()
+        admin_id = admin.id
+
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(admin_id)
+        sess['_fresh'] = True
+
+    gzip = {'Accept-Encoding': 'gzip'}
+    resp = client.get('/admin/api/atendimentos_tv', headers=gzip)
+    assert resp.headers['Content-Encoding'] == 'gzip'
+    etag = resp.headers['ETag']
+    assert etag.startswith('W/')
+
+    resp = client.get('/admin/api/atendimentos_tv', headers={**gzip, 'If-None-Match': etag})
+    assert resp.status_code == 304
+
+
+# TESTE 5: LIMITE DE CONEXÕES SSE POR PROCESSO (503 -> PAINEL CAI PARA O POLLING)
+def test_tv_stream_limite_de_conexoes(app, client):
+    app.config.update(SSE_MAX_STREAMS=1, SSE_HEARTBEAT_SECONDS=0.05)
+    with app.app_context():
+        _, _, admin = _setup()
+        admin_id = admin.id
+
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(admin_id)
+        sess['_fresh'] = True
+
+    url = '/admin/api/atendimentos_tv/stream'
+    primeira = client.get(url, buffered=False)
+    assert primeira.status_code == 200
+
+    recusada = client.get(url, buffered=False)
+    assert recusada.status_code == 503 and recusada.headers['Retry-After']
+
+    # Fechar a conexão libera a vaga, mesmo sem o gerador ter começado
+    primeira.close()
+    segunda = client.get(url, buffered=False)
+    assert segunda.status_code == 200
+    segunda.close()
@@ -0,0 +1,57 @@
+# Testes do cache de identidade do user_loader
+from sqlalchemy import event
+from app.extensions import db
+from app.models import User
+from app.utils.user_cache import load_cached_user, CachedUser
+
+
+def _contar_consultas(fn):
+    total = []
+    listener = lambda *args: total.append(1)
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        resultado = fn()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    return resultado, len(total)
+
+
+# TESTE 1: SEGUNDO CARREGAMENTO NÃO VAI AO BANCO; COMMIT NO USER INVALIDA
+def test_user_loader_cache_and_invalidation(app):
+    with app.app_context():
+        user = User(name="Recepção", email="recepcao@teste.com", role='staff')
+        user.set_password("senha_teste_123")
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+        db.session.remove()
+
+        load_cached_user(user_id)
+        cached, consultas = _contar_consultas(lambda: load_cached_user(user_id))
+        assert consultas == 0
+        assert isinstance(cached, CachedUser) and cached.is_staff and cached.get_id() == str(user_id)
+
+        # Bloqueio (como no login/unlock_user) precisa aparecer na próxima requisição
+        db.session.get(User, user_id).is_locked = True
+        db.session.commit()
+        db.session.remove()
+        assert load_cached_user(user_id).is_locked is True
+
+
+# TESTE 2: ESCRITA PELO PROXY VAI PARA O USER DO ORM (ex.: editar o próprio perfil)
+def test_cached_user_writes_go_to_orm(app):
+    with app.app_context():
+        user = User(name="Antes", email="perfil@teste.com")
+        user.set_password("senha_teste_123")
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+        db.session.remove()
+
+        load_cached_user(user_id)
+        proxy = load_cached_user(user_id)
+        proxy.name = "Depois"
+        assert proxy.name == "Depois"
+        db.session.commit()
+        db.session.remove()
+        assert load_cached_user(user_id).name == "Depois"